@@ -0,0 +1,381 @@
+import os
+import asyncio
+import base64
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Any, List, Union, BinaryIO, AsyncIterator, Iterable
+import requests
+
+from .client import (
+    DOWNLOAD_CHUNK_SIZE,
+    EVENTS_TIMEOUT,
+    LIST_PAGE_SIZE,
+    _auth_headers,
+    _get_defaults,
+    _header_meta,
+    _MultipartBody,
+    _iter_rows,
+    _needs_archive,
+)
+from .zipstream import SpooledZip, expand_inputs
+
+# archives spill to disk beyond this, so many concurrent uploads stay small in memory
+UPLOAD_SPOOL_MAX_BYTES = 1024 * 1024
+
+
+async def _astream_to(resp, dest: Union[str, os.PathLike, BinaryIO], chunk_size: int) -> int:
+    """Async counterpart of `client._stream_to` for an httpx streaming response.
+
+    Disk writes run on the default executor, so a slow disk does not stall
+    the event loop (and every other transfer on it).
+    """
+    written = 0
+    if hasattr(dest, "write"):
+        async for chunk in resp.aiter_bytes(chunk_size):
+            await asyncio.to_thread(dest.write, chunk)
+            written += len(chunk)
+        return written
+
+    target = Path(dest)
+    tmp = target.with_name(target.name + ".part")
+    await asyncio.to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+    f = await asyncio.to_thread(open, tmp, "wb")
+    try:
+        try:
+            async for chunk in resp.aiter_bytes(chunk_size):
+                await asyncio.to_thread(f.write, chunk)
+                written += len(chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return written
+
+
+async def _aiter_chunks(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Pull each chunk of a blocking iterable (e.g. a spooled file) on the default executor."""
+    it = iter(chunks)
+    while True:
+        chunk = await asyncio.to_thread(next, it, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class AsyncQiboDBClient:
+    """asyncio client for a QiboDB server, mirroring `QiboDBClient`.
+
+    All calls share one pooled `httpx.AsyncClient`, and at most
+    `max_concurrency` requests are in flight at once, so large fan-outs can be
+    started with `asyncio.gather` without opening a connection (or a thread)
+    per call. ZIP creation for uploads runs in the default executor to keep
+    the event loop responsive; archives are spooled (to disk beyond
+    `UPLOAD_SPOOL_MAX_BYTES`) and streamed, never held in memory whole. Requires the optional `httpx` dependency.
+
+    Example::
+
+        async with AsyncQiboDBClient(max_concurrency=8) as db:
+            await asyncio.gather(*(
+                db.results_upload(hash_id, name, "sweep", files)
+                for name, files in bundles.items()
+            ))
+
+    Args:
+        server_url: Base URL of the server; defaults to the saved config.
+        api_token: Bearer token; defaults to the saved config.
+        max_concurrency: Maximum number of simultaneous requests.
+        http2: Multiplex requests over a single HTTP/2 connection (needs `h2`).
+        dedup_uploads: Send only an archive's SHA-256 first and skip the body
+            when the server already stores identical content.
+    """
+
+    def __init__(
+        self,
+        server_url: Optional[str] = None,
+        api_token: Optional[str] = None,
+        max_concurrency: int = 16,
+        http2: bool = False,
+        dedup_uploads: bool = True,
+    ):
+        try:
+            import httpx
+        except ImportError as e:
+            raise RuntimeError("AsyncQiboDBClient requires httpx (pip install httpx).") from e
+        self.server_url, self.api_token = _get_defaults(server_url, api_token)
+        self._http = httpx.AsyncClient(
+            base_url=self.server_url,
+            headers=_auth_headers(self.api_token),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=httpx.Timeout(300.0),
+            http2=http2,
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.dedup_uploads = dedup_uploads
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncQiboDBClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def _request(self, method: str, path: str, what: str, ok_404: bool = False, **kwargs):
+        async with self._slots:
+            r = await self._http.request(method, path, **kwargs)
+        if r.status_code == 404 and ok_404:
+            return None
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"{what} failed ({r.status_code}): {r.text}")
+        return r.json()
+
+    async def _post_archive(self, path: str, fields: Dict[str, str], files: List[str], filename: str) -> dict:
+        """Upload the ZIP of `files` by reference if the server has the content, else in full.
+
+        The archive is built and hashed in one pass into a `SpooledZip`, then
+        streamed from there. See `QiboDBClient._post_archive`.
+        """
+        archive = await asyncio.to_thread(
+            lambda: SpooledZip(expand_inputs(files), max_memory=UPLOAD_SPOOL_MAX_BYTES)
+        )
+        try:
+            fields = {**fields, "sha256": archive.sha256}
+            if self.dedup_uploads:
+                async with self._slots:
+                    r = await self._http.post(path, data={**fields, "filename": filename})
+                if not _needs_archive(r):
+                    if r.status_code >= 400:
+                        raise requests.HTTPError(f"Upload failed ({r.status_code}): {r.text}")
+                    return r.json()
+            form = [(k, None, str(v).encode(), None) for k, v in fields.items()]
+            body = _MultipartBody(form + [("archive", filename, archive.iter_chunks(), archive.size)])
+            return await self._request(
+                "POST", path, "Upload", content=_aiter_chunks(body),
+                headers={"Content-Type": body.content_type, "Content-Length": str(body.length)},
+            )
+        finally:
+            archive.close()
+
+    async def calibrations_upload(self, hashID: str, notes: str, files: List[str]) -> dict:
+        """Create a ZIP from `files` and upload it as a calibration bundle.
+
+        See `QiboDBClient.calibrations_upload`.
+        """
+        if not files:
+            raise ValueError("Provide at least one file to upload.")
+        return await self._post_archive(
+            "/calibrations/upload", {"hashID": hashID, "notes": notes or ""}, files, "calibration_bundle.zip"
+        )
+
+    async def _iter_pages(self, path: str, params: Dict[str, Any], what: str) -> AsyncIterator[Dict[str, Any]]:
+        params = {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in params.items() if v is not None}
+        while True:
+            payload = await self._request("GET", path, what, params={**params, "format": "columns"})
+            for item in _iter_rows(payload):
+                yield item
+            cursor = payload.get("next_cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+
+    def iter_calibrations(
+        self,
+        page_size: int = LIST_PAGE_SIZE,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        hash_prefix: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Lazily iterate calibration metadata (newest first) with ``async for``.
+
+        See `QiboDBClient.iter_calibrations`.
+        """
+        params = {"limit": page_size, "since": since, "until": until, "hashPrefix": hash_prefix, "notes": notes}
+        return self._iter_pages("/calibrations/list", params, "List")
+
+    async def calibrations_list(self) -> List[Dict[str, Any]]:
+        """Return metadata for all calibration uploads (newest first)."""
+        return [item async for item in self.iter_calibrations()]
+
+    async def calibrations_download(self, hashID: str) -> Tuple[Optional[str], str, str, bytes]:
+        """Download the latest calibration ZIP for a given `hashID`.
+
+        Returns:
+            Tuple of (notes, filename, created_at, data).
+        """
+        payload = await self._request("POST", "/calibrations/download", "Download", json={"hashID": hashID})
+        data = base64.b64decode(payload["data_b64"])
+        return payload.get("notes"), payload["filename"], payload["created_at"], data
+
+    async def _download_to(self, path: str, params: Dict[str, str], dest, chunk_size: int):
+        async with self._slots:
+            async with self._http.stream("GET", path, params=params) as r:
+                if r.status_code >= 400:
+                    await r.aread()
+                    raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+                await _astream_to(r, dest, chunk_size)
+                return r
+
+    async def calibrations_download_to(
+        self,
+        hashID: str,
+        dest: Union[str, os.PathLike, BinaryIO],
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> Tuple[Optional[str], str, str]:
+        """Stream the latest calibration ZIP for `hashID` into a file.
+
+        Returns:
+            Tuple of (notes, filename, created_at).
+        """
+        r = await self._download_to("/calibrations/download/raw", {"hashID": hashID}, dest, chunk_size)
+        return (
+            _header_meta(r, "X-Qibo-Notes"),
+            _header_meta(r, "X-Qibo-Filename"),
+            _header_meta(r, "X-Qibo-Created-At"),
+        )
+
+    async def calibrations_get_latest(self) -> Dict[str, Any]:
+        """Return metadata for the most recently uploaded calibration, or {} if none."""
+        return await self._request("GET", "/calibrations/latest", "Latest", ok_404=True) or {}
+
+    async def results_upload(
+        self,
+        hashID: str,
+        name: str,
+        notes: str,
+        files: List[str],
+        runID: Optional[str] = None,
+    ) -> dict:
+        """Create a ZIP from `files` and upload it as a "result" bundle.
+
+        See `QiboDBClient.results_upload`.
+        """
+        if not files:
+            raise ValueError("No files provided for upload.")
+        data = {"hashID": hashID, "name": name, "notes": notes or ""}
+        if runID is not None:
+            data["runID"] = runID
+        return await self._post_archive("/results/upload", data, files, "bundle.zip")
+
+    def iter_results(
+        self,
+        hashID: str,
+        page_size: int = LIST_PAGE_SIZE,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        name_prefix: Optional[str] = None,
+        runID: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Lazily iterate results rows for a hashID (newest first) with ``async for``.
+
+        See `QiboDBClient.iter_results`.
+        """
+        params = {
+            "hashID": hashID, "limit": page_size, "since": since, "until": until,
+            "namePrefix": name_prefix, "runID": runID, "notes": notes,
+        }
+        return self._iter_pages("/results/list", params, "Results list")
+
+    async def results_list(self, hashID: str) -> List[Dict[str, Any]]:
+        """List all results rows that share the same hashID (newest first)."""
+        return [item async for item in self.iter_results(hashID)]
+
+    async def results_download(
+        self,
+        hashID: str,
+        name: str,
+        runID: Optional[str] = None,
+    ) -> Tuple[Optional[str], str, str, Optional[str], bytes]:
+        """Download the most recent result matching (hashID, name[, runID]).
+
+        Returns:
+            (notes, filename, created_at, run_id, data_bytes)
+        """
+        body = {"hashID": hashID, "name": name}
+        if runID is not None:
+            body["runID"] = runID
+        payload = await self._request("POST", "/results/download", "Download", json=body)
+        return (
+            payload.get("notes"),
+            payload["filename"],
+            payload["created_at"],
+            payload.get("run_id"),
+            base64.b64decode(payload["data_b64"]),
+        )
+
+    async def results_download_to(
+        self,
+        hashID: str,
+        name: str,
+        dest: Union[str, os.PathLike, BinaryIO],
+        runID: Optional[str] = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> Tuple[Optional[str], str, str, Optional[str]]:
+        """Stream the most recent result matching (hashID, name[, runID]) into a file.
+
+        Returns:
+            (notes, filename, created_at, run_id)
+        """
+        params = {"hashID": hashID, "name": name}
+        if runID is not None:
+            params["runID"] = runID
+        r = await self._download_to("/results/download/raw", params, dest, chunk_size)
+        return (
+            _header_meta(r, "X-Qibo-Notes"),
+            _header_meta(r, "X-Qibo-Filename"),
+            _header_meta(r, "X-Qibo-Created-At"),
+            _header_meta(r, "X-Qibo-Run-Id"),
+        )
+
+    async def set_best_run(self, calibrationHashID: str, runID: str) -> Dict[str, Any]:
+        """Mark a (calibrationHashID, runID) pair as the current best run."""
+        return await self._request(
+            "POST", "/bestruns/set", "set_best_run",
+            json={"calibrationHashID": calibrationHashID, "runID": runID},
+        )
+
+    async def get_best_run(self) -> Tuple[str, str, str]:
+        """Returns (calibration_hash_id, run_id, created_at) of the current best run."""
+        payload = await self._request("GET", "/bestruns/get", "get_best_run")
+        if payload.get("status") != "ok":
+            raise requests.HTTPError(f"Server error: {payload}")
+        return payload["calibration_hash_id"], payload["run_id"], payload["created_at"]
+
+    async def get_best_n_runs(self, n: int) -> List[Tuple[str, str, str]]:
+        """Get up to `n` previous best runs, newest first."""
+        if n <= 0:
+            raise ValueError("n must be a positive integer")
+        payload = await self._request("GET", "/bestruns/list", "get_best_n_runs", params={"limit": n, "format": "columns"})
+        if payload.get("status") != "ok":
+            raise requests.HTTPError(f"Server error in get_best_n_runs: {payload}")
+        return [
+            (str(it["calibration_hash_id"]), str(it["run_id"]), str(it["created_at"]))
+            for it in _iter_rows(payload)
+        ]
+
+    async def iter_events(
+        self,
+        since: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        timeout: float = EVENTS_TIMEOUT,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield new best runs and calibrations as they are inserted, with ``async for``.
+
+        See `QiboDBClient.iter_events`.
+        """
+        params: Dict[str, Any] = {"timeout": timeout}
+        if types:
+            params["types"] = ",".join(types)
+        while True:
+            if since:
+                params["since"] = since
+            payload = await self._request("GET", "/events", "Events", params=params, timeout=timeout + 30)
+            for event in payload.get("events", []):
+                since = event["cursor"]
+                yield event
+            since = payload.get("cursor") or since
@@ -0,0 +1,168 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable
+
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class ArchiveCache:
+    """Size-bounded on-disk cache of downloaded archives, shared between processes.
+
+    Layout under `root`:
+      - ``blobs/<sha256>.zip``: archive contents, addressed by content hash
+      - ``refs/<key>.json``: last seen ETag, hash and metadata per request
+        (e.g. "latest calibration for hashID X")
+      - ``extracted/<sha256>/``: archives unpacked once, for `unpack`-style reuse
+      - ``tmp/``: staging area; everything is written there first and moved
+        into place with an atomic rename, so readers never see partial files
+
+    Entries are evicted least-recently-used first (access time is tracked via
+    mtime) once the blobs and extracted trees exceed `max_bytes`.
+
+    Args:
+        root: Cache directory.
+        max_bytes: Upper bound for the cache size, checked after each insert.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.root = Path(root).expanduser()
+        self.max_bytes = max_bytes
+        for sub in ("blobs", "refs", "extracted", "tmp"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def ref_key(*parts: Any) -> str:
+        """Stable file-name-safe key for a request identity."""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.root / "blobs" / f"{sha256}.zip"
+
+    def _touch(self, path: Path) -> None:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def get_ref(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored reference for `key` if its blob is still cached."""
+        try:
+            with open(self.root / "refs" / f"{key}.json") as f:
+                ref = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return ref if self._blob_path(ref.get("sha256", "")).exists() else None
+
+    def put_ref(self, key: str, ref: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root / "tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(ref, f)
+        os.replace(tmp, self.root / "refs" / f"{key}.json")
+
+    def open_blob(self, sha256: str):
+        """Open a cached archive for reading and mark it as recently used.
+
+        Raises:
+            FileNotFoundError: If the blob is not (or no longer) cached.
+        """
+        path = self._blob_path(sha256)
+        f = open(path, "rb")
+        self._touch(path)
+        return f
+
+    def put_blob(self, chunks: Iterable[bytes], expected_sha256: Optional[str] = None) -> str:
+        """Write an archive from `chunks` into the cache and return its SHA-256.
+
+        Raises:
+            ValueError: If the content does not match `expected_sha256`.
+        """
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.root / "tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256:
+                raise ValueError(f"Checksum mismatch: expected {expected_sha256}, got {sha256}")
+            os.replace(tmp, self._blob_path(sha256))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self.evict(keep=self._blob_path(sha256))
+        return sha256
+
+    def extracted(self, sha256: str) -> Path:
+        """Return a directory holding the extracted archive, unpacking it only once.
+
+        Raises:
+            FileNotFoundError: If the blob is not (or no longer) cached.
+        """
+        target = self.root / "extracted" / sha256
+        if target.exists():
+            self._touch(target)
+            return target
+        staging = Path(tempfile.mkdtemp(dir=self.root / "tmp"))
+        try:
+            with self.open_blob(sha256) as f, zipfile.ZipFile(f) as zf:
+                zf.extractall(staging)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # another process extracted it first
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict(keep=target)
+        return target
+
+    def _entries(self):
+        entries = []
+        for path in (self.root / "blobs").iterdir():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        for path in (self.root / "extracted").iterdir():
+            try:
+                mtime = path.stat().st_mtime
+                size = sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+            except FileNotFoundError:
+                continue
+            entries.append((mtime, size, path))
+        return entries
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Delete least-recently-used entries until the cache fits in `max_bytes`.
+
+        `keep` (the entry just added) is never evicted, even if it alone exceeds the bound.
+        """
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every cached archive, reference and extracted tree."""
+        for sub in ("blobs", "refs", "extracted"):
+            shutil.rmtree(self.root / sub, ignore_errors=True)
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
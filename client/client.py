@@ -2,10 +2,35 @@ import os
 import io
 import json
 import base64
+import shutil
+import hashlib
 import zipfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any, List
+from datetime import datetime, timedelta
+from typing import Optional, Tuple, Dict, Any, List, Union, BinaryIO, Iterator, Iterable, Callable
+from urllib.parse import unquote
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import ArchiveCache, DEFAULT_CACHE_MAX_BYTES
+from .zipstream import DEFAULT_COMPRESSLEVEL, SpooledZip, expand_inputs, iter_zip
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+LIST_PAGE_SIZE = 100
+EVENTS_TIMEOUT = 25.0
+MAX_BLOB_LOOKUP = 1000
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+RANGE_BLOCK_SIZE = 64 * 1024
+DEFAULT_SERVER_URL = "http://127.0.0.1:5050"
+# results_download_all: directory of results without a run, next to the run directories
+NO_RUN_DIR = "_norun"
+MSGPACK_MIMETYPE = "application/msgpack"
+_EPOCH = datetime(1970, 1, 1)
 
 CFG_PATHS = [
     Path(os.getenv("QIBO_CLIENT_CONFIG", "")) if os.getenv("QIBO_CLIENT_CONFIG") else None,
@@ -36,6 +61,39 @@ def _read_cfg() -> dict:
     return {}
 
 
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def _decode_listing(r: requests.Response) -> Dict[str, Any]:
+    """Parse a listing response sent as JSON or, for ``format=msgpack``, as msgpack."""
+    if r.headers.get("Content-Type", "").startswith(MSGPACK_MIMETYPE):
+        return _msgpack().unpackb(r.content, raw=False)
+    return r.json()
+
+
+def _iter_rows(payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of a listing page, sent either as row dicts or column-wise.
+
+    Columnar pages (``format=columns`` or ``msgpack``) are turned into dicts
+    one row at a time as the iterator is consumed; `created_at`, sent as
+    microseconds since the epoch, is formatted as in the row format.
+    """
+    if "columns" not in payload:
+        yield from payload.get("items", [])
+        return
+    columns = dict(payload["columns"])
+    if "created_at" in columns:
+        columns["created_at"] = (str(_EPOCH + timedelta(microseconds=us)) for us in columns["created_at"])
+    names = list(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(names, values))
+
+
 def _write_cfg(data: dict) -> None:
     """Write client configuration to a persistent file.
 
@@ -71,21 +129,39 @@ def set_server(server_url: str, api_token: Optional[str] = None) -> None:
     if api_token is not None:
         data["api_token"] = api_token
     _write_cfg(data)
+    # shared clients cached the previous defaults
+    _close_shared_clients()
 
 
-def _get_defaults(server_url: Optional[str], api_token: Optional[str]) -> Tuple[str, Optional[str]]:
+def set_cache(cache_dir: Optional[str], max_bytes: Optional[int] = None) -> None:
+    """Persist the on-disk archive cache settings for this client.
+
+    Args:
+        cache_dir: Cache directory, or None to disable caching.
+        max_bytes: Optional size bound for the cache (default 2 GiB).
+    """
+    data = _read_cfg()
+    data["cache_dir"] = cache_dir
+    if max_bytes is not None:
+        data["cache_max_bytes"] = int(max_bytes)
+    _write_cfg(data)
+    _close_shared_clients()
+
+
+def _get_defaults(server_url: Optional[str], api_token: Optional[str], cfg: Optional[dict] = None) -> Tuple[str, Optional[str]]:
     """Resolve server_url and api_token from arguments or persisted config.
 
     Args:
         server_url: Optional explicit server URL.
         api_token: Optional explicit token.
+        cfg: Already loaded client config; read from disk if omitted.
 
     Returns:
         (server_url, api_token): Final values after consulting config.
     """
-    cfg = _read_cfg()
+    cfg = _read_cfg() if cfg is None else cfg
     return (
-        server_url.rstrip("/") if server_url else cfg.get("server_url", "http://127.0.0.1:5050"),
+        server_url.rstrip("/") if server_url else cfg.get("server_url", DEFAULT_SERVER_URL),
         api_token if api_token is not None else cfg.get("api_token")
     )
 
@@ -95,85 +171,1386 @@ def _auth_headers(api_token: Optional[str]) -> dict:
     return {"Authorization": f"Bearer {api_token}"} if api_token else {}
 
 
+def _header_meta(resp: requests.Response, key: str) -> Optional[str]:
+    """Return a percent-decoded X-Qibo-* metadata header, or None if absent."""
+    value = resp.headers.get(key)
+    return unquote(value) if value is not None else None
+
+
+def _needs_archive(resp) -> bool:
+    """Whether a by-reference upload was refused because the server lacks the content.
+
+    That is the server's 404 for an unknown sha256, or the 400 of servers
+    without deduplication that still require the archive itself. Any other
+    error is final, so the archive is not sent just to fail again.
+    """
+    if resp.status_code not in (400, 404):
+        return False
+    try:
+        error = resp.json().get("error") or ""
+    except (ValueError, AttributeError):
+        return False
+    if resp.status_code == 404:
+        return error.startswith("unknown archive sha256")
+    return error == "archive file is required"
+
+
+_ARCHIVE_META_HEADERS = ("X-Qibo-Notes", "X-Qibo-Filename", "X-Qibo-Created-At", "X-Qibo-Run-Id", "X-Qibo-Sha256")
+
+
+def _stream_to(chunks: Iterable[bytes], dest: Union[str, os.PathLike, BinaryIO]) -> int:
+    """Copy a stream of byte chunks (e.g. a response body) into `dest`.
+
+    If `dest` is a path, the body is written to a sibling ``.part`` file which
+    is atomically renamed into place once the transfer completes. Otherwise
+    `dest` must be a writable binary file object.
+
+    Returns:
+        int: Number of bytes written.
+    """
+    written = 0
+    if hasattr(dest, "write"):
+        for chunk in chunks:
+            dest.write(chunk)
+            written += len(chunk)
+        return written
+
+    target = Path(dest)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".part")
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return written
+
+
+class _RangeFile(io.RawIOBase):
+    """Read-only, seekable view of a remote archive that fetches byte ranges on demand.
+
+    The first request reads the last `block_size` bytes (where the ZIP central
+    directory lives) and pins the archive's ETag; every later read sends it as
+    If-Range, so a newer upload replacing "the latest" archive mid-read is
+    detected instead of mixing bytes of two archives. Reads are rounded up to
+    `block_size` to keep the number of requests small.
+    """
+
+    def __init__(self, session: requests.Session, url: str, params: Dict[str, str], block_size: int = RANGE_BLOCK_SIZE):
+        super().__init__()
+        self._session, self._url, self._params, self._block_size = session, url, params, block_size
+        r = session.get(url, params=params, headers={"Range": f"bytes=-{block_size}"}, timeout=300)
+        if r.status_code == 416:
+            raise zipfile.BadZipFile("Archive is empty")
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+        self.headers = r.headers
+        self._etag = r.headers.get("ETag")
+        if r.status_code == 206:
+            self.size = int(r.headers["Content-Range"].rsplit("/", 1)[1])
+            self._blocks = {self.size - len(r.content): r.content}
+        else:  # the server ignored the Range header and sent everything
+            self.size = len(r.content)
+            self._blocks = {0: r.content}
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(base + offset, 0)
+        return self._pos
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        if self._etag:
+            headers["If-Range"] = self._etag
+        r = self._session.get(self._url, params=self._params, headers=headers, timeout=300)
+        if r.status_code != 206:
+            raise requests.HTTPError(f"Ranged read failed ({r.status_code}); the archive may have been replaced")
+        return r.content
+
+    def read(self, n: int = -1) -> bytes:
+        end = self.size if n is None or n < 0 else min(self._pos + n, self.size)
+        out = bytearray()
+        while self._pos < end:
+            for start, block in self._blocks.items():
+                if start <= self._pos < start + len(block):
+                    break
+            else:
+                start = self._pos
+                block = self._fetch(start, min(max(end, start + self._block_size), self.size))
+                # keep the tail block (central directory) and the most recent one
+                tail = max(self._blocks)
+                self._blocks = {tail: self._blocks[tail], start: block}
+            piece = block[self._pos - start:end - start]
+            out += piece
+            self._pos += len(piece)
+        return bytes(out)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def _link_tree(src: Path, dst: Union[str, os.PathLike], link: bool) -> None:
+    """Recreate the tree `src` under `dst` using hardlinks (falling back to copies)."""
+    def _link(s, d):
+        try:
+            if os.path.lexists(d):
+                os.unlink(d)
+            os.link(s, d)
+        except OSError:
+            shutil.copy2(s, d)
+    shutil.copytree(src, dst, copy_function=_link if link else shutil.copy2, dirs_exist_ok=True)
+
+
+def _path_component(value: str) -> str:
+    """Make a result name or run id usable as a single directory name."""
+    value = value.replace("/", "_").replace(os.sep, "_")
+    return "_" + value if value in ("", ".", "..") else value
+
+
+def _run_dir(run_id: Optional[str]) -> str:
+    """Directory of a run under its result's name; results without a run go to `NO_RUN_DIR`."""
+    if run_id is None:
+        return NO_RUN_DIR
+    component = _path_component(run_id)
+    # run ids starting with "_" get one more, so none of them maps to NO_RUN_DIR
+    return "_" + component if component.startswith("_") else component
+
+
+def _zip_files(files: List[str], compresslevel: int = DEFAULT_COMPRESSLEVEL, workers: Optional[int] = None) -> bytes:
+    """Bundle `files` (paths, directories or glob patterns) into an in-memory ZIP.
+
+    Produces the same bytes as the streaming upload path (see `iter_zip`), so
+    uploads from either client deduplicate against each other.
+
+    Raises:
+        FileNotFoundError: If a path does not exist or a pattern matches nothing.
+    """
+    return b"".join(iter_zip(expand_inputs(files), compresslevel, workers))
+
+
+class _HashingStream:
+    """Pass chunks through while computing their SHA-256."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+        self._digest = hashlib.sha256()
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self._digest.update(chunk)
+            yield chunk
+
+    def hexdigest(self) -> bytes:
+        return self._digest.hexdigest().encode()
+
+
+class _MultipartBody:
+    """A multipart/form-data request body produced part by part.
+
+    `parts` are ``(name, filename, content, size)`` tuples; `content` is bytes,
+    an iterable of byte chunks, or a callable returning bytes that is only
+    called when its part is reached (e.g. a checksum of a preceding streamed
+    part). `requests` sends the body with a Content-Length when every part's
+    size is known and chunked otherwise.
+    """
+
+    def __init__(self, parts: List[Tuple[str, Optional[str], Any, Optional[int]]]):
+        self.boundary = os.urandom(16).hex()
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._parts = []
+        for name, filename, content, size in parts:
+            disposition = f'form-data; name="{name}"'
+            if filename is not None:
+                disposition += f'; filename="{filename}"\r\nContent-Type: application/zip'
+            head = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode()
+            self._parts.append((head, content, len(content) if isinstance(content, bytes) else size))
+        self._tail = f"--{self.boundary}--\r\n".encode()
+        sizes = [size for _head, _content, size in self._parts]
+        self.length = None if None in sizes else (
+            sum(len(head) + size + 2 for head, _content, size in self._parts) + len(self._tail)
+        )
+
+    def __iter__(self) -> Iterator[bytes]:
+        for head, content, _size in self._parts:
+            yield head
+            if isinstance(content, bytes):
+                yield content
+            elif callable(content):
+                yield content()
+            else:
+                yield from content
+            yield b"\r\n"
+        yield self._tail
+
+    def body(self) -> Iterable[bytes]:
+        """What to pass as `data=`: sized (Content-Length) if possible, else a generator (chunked)."""
+        if self.length is None:
+            return iter(self)
+        return _SizedBody(self, self.length)
+
+
+class _SizedBody:
+    def __init__(self, chunks: Iterable[bytes], length: int):
+        self._chunks, self._length = chunks, length
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._chunks)
+
+    def __len__(self) -> int:
+        return self._length
+
+
+class QiboDBClient:
+    """Reusable connection to a QiboDB server.
+
+    Holds a pooled `requests.Session`, so consecutive calls reuse keep-alive
+    TCP/TLS connections instead of opening one per call, and resolves the
+    server URL and token from the client config once, at construction.
+    Idempotent requests (GET/HEAD/PUT/DELETE) are retried with exponential
+    backoff on connection errors and 502/503/504 responses. Responses of the
+    polled metadata endpoints (latest calibration, best runs) are revalidated
+    with their ETag and reused when the server answers 304 Not Modified.
+
+    With a cache directory configured (argument, `QIBO_CLIENT_CACHE` or
+    `set_cache`), downloaded archives are kept in an `ArchiveCache`; repeat
+    downloads cost one conditional request and are served from disk.
+
+    The module-level functions (`results_upload`, `get_best_run`, ...) delegate
+    to a shared instance; create your own to tune pooling or retries::
+
+        with QiboDBClient(pool_size=32, max_retries=5) as db:
+            for _ in range(1000):
+                db.get_best_run()
+
+    Args:
+        server_url: Base URL of the server; defaults to the saved config.
+        api_token: Bearer token; defaults to the saved config.
+        pool_size: Maximum number of pooled connections kept per host.
+        max_retries: Retries for idempotent requests (0 disables retrying).
+        backoff_factor: Exponential backoff base, in seconds, between retries.
+        cache_dir: Directory of the on-disk archive cache; caching is disabled
+            if neither this, `QIBO_CLIENT_CACHE` nor the config sets one.
+        cache_max_bytes: Size bound of the archive cache.
+        dedup_uploads: Send only an archive's SHA-256 first and skip the body
+            when the server already stores identical content. This spools
+            every archive to a temporary file before sending it; disable it
+            to stream archives into the request while they are compressed.
+        compresslevel: Default deflate level (0-9) of upload archives; 0
+            stores files uncompressed, which suits already-compressed data.
+        zip_workers: Threads compressing upload archives (default: up to 8,
+            one per CPU).
+    """
+
+    def __init__(
+        self,
+        server_url: Optional[str] = None,
+        api_token: Optional[str] = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: Optional[int] = None,
+        dedup_uploads: bool = True,
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
+        zip_workers: Optional[int] = None,
+    ):
+        cfg = _read_cfg()
+        self.dedup_uploads = dedup_uploads
+        self.compresslevel = compresslevel
+        self.zip_workers = zip_workers
+        self.server_url, self.api_token = _get_defaults(server_url, api_token, cfg)
+        cache_dir = cache_dir or os.getenv("QIBO_CLIENT_CACHE") or cfg.get("cache_dir")
+        self.cache: Optional[ArchiveCache] = None
+        if cache_dir:
+            self.cache = ArchiveCache(cache_dir, cache_max_bytes or cfg.get("cache_max_bytes") or DEFAULT_CACHE_MAX_BYTES)
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(_auth_headers(self.api_token))
+        # (path, params) -> (etag, parsed JSON body) for conditional GETs
+        self._validators: Dict[Tuple[str, Tuple], Tuple[str, Any]] = {}
+        self._validators_lock = threading.Lock()
+        # compact listing pages; columnar JSON when msgpack is not installed here or on the server
+        self._list_format = "msgpack" if _msgpack() is not None else "columns"
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "QiboDBClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _url(self, path: str) -> str:
+        return self.server_url + path
+
+    def _get_json_conditional(self, path: str, params: Optional[Dict[str, Any]], timeout: float) -> Tuple[int, Any, requests.Response]:
+        """GET a JSON endpoint with If-None-Match, reusing the cached body on 304.
+
+        Returns:
+            (status_code, payload, response); the status of a revalidated
+            response is reported as 200.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._validators_lock:
+            cached = self._validators.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = self.session.get(self._url(path), params=params, headers=headers, timeout=timeout)
+        if r.status_code == 304 and cached:
+            return 200, cached[1], r
+        if r.status_code >= 400:
+            return r.status_code, None, r
+        payload = r.json()
+        etag = r.headers.get("ETag")
+        if etag:
+            with self._validators_lock:
+                self._validators[key] = (etag, payload)
+        return r.status_code, payload, r
+
+    def _fetch_archive(
+        self,
+        path: str,
+        params: Dict[str, str],
+        dest: Optional[Union[str, os.PathLike, BinaryIO]],
+        chunk_size: int,
+    ) -> Dict[str, Any]:
+        """Download a raw archive endpoint into `dest`, going through the cache if enabled.
+
+        With a cache, the request carries the ETag last seen for (path, params);
+        on 304 the cached copy is used, otherwise the body is streamed into the
+        cache first. `dest` may be None to only make sure the archive is cached.
+
+        Returns:
+            dict with ``meta`` (X-Qibo-* header values) and ``sha256``.
+        """
+        url = self._url(path)
+        if self.cache is None:
+            with self.session.get(url, params=params, stream=True, timeout=300) as r:
+                if r.status_code >= 400:
+                    raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+                _stream_to(r.iter_content(chunk_size=chunk_size), dest)
+                meta = {h: _header_meta(r, h) for h in _ARCHIVE_META_HEADERS}
+                return {"meta": meta, "sha256": meta["X-Qibo-Sha256"]}
+
+        key = ArchiveCache.ref_key(self.server_url, path, params)
+        for _attempt in range(2):
+            ref = self.cache.get_ref(key)
+            headers = {"If-None-Match": ref["etag"]} if ref else {}
+            with self.session.get(url, params=params, headers=headers, stream=True, timeout=300) as r:
+                if r.status_code >= 400:
+                    raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+                if r.status_code != 304 or not ref:
+                    meta = {h: _header_meta(r, h) for h in _ARCHIVE_META_HEADERS}
+                    sha256 = self.cache.put_blob(r.iter_content(chunk_size=chunk_size), meta["X-Qibo-Sha256"])
+                    ref = {"etag": r.headers.get("ETag"), "sha256": sha256, "meta": meta}
+                    if ref["etag"]:
+                        self.cache.put_ref(key, ref)
+            if dest is None:
+                return ref
+            try:
+                with self.cache.open_blob(ref["sha256"]) as f:
+                    _stream_to(iter(lambda: f.read(chunk_size), b""), dest)
+                return ref
+            except FileNotFoundError:
+                # evicted by another process in between; fetch unconditionally
+                self.cache.put_ref(key, {})
+        raise requests.HTTPError("Download failed: cached archive disappeared during download")
+
+    def has_archives(self, sha256s: List[str]) -> Dict[str, int]:
+        """Ask the server which of these archive SHA-256 hashes it already stores.
+
+        Servers without deduplication support are treated as storing nothing.
+
+        Returns:
+            Mapping of each stored hash to its size in bytes.
+        """
+        present: Dict[str, int] = {}
+        for start in range(0, len(sha256s), MAX_BLOB_LOOKUP):
+            r = self.session.post(self._url("/blobs/lookup"), json={"sha256": sha256s[start:start + MAX_BLOB_LOOKUP]}, timeout=60)
+            if r.status_code in (404, 405):
+                return {}
+            if r.status_code >= 400:
+                raise requests.HTTPError(f"Lookup failed ({r.status_code}): {r.text}")
+            present.update(r.json().get("present", {}))
+        return present
+
+    def _post_multipart(self, path: str, parts: List[Tuple[str, Optional[str], Any, Optional[int]]]) -> requests.Response:
+        body = _MultipartBody(parts)
+        return self.session.post(
+            self._url(path), data=body.body(), headers={"Content-Type": body.content_type}, timeout=300
+        )
+
+    def _spool_archive(self, files: List[str], compresslevel: Optional[int]) -> SpooledZip:
+        level = self.compresslevel if compresslevel is None else compresslevel
+        return SpooledZip(expand_inputs(files), level, self.zip_workers)
+
+    def _post_archive(
+        self, path: str, fields: Dict[str, str], files: List[str], filename: str, compresslevel: Optional[int] = None
+    ) -> requests.Response:
+        """POST an upload form with the ZIP of `files`, sending only its SHA-256 if possible.
+
+        With deduplication, the archive is built once into a spooled temporary
+        file so its hash is known before anything is sent: the server accepts
+        the reference when it already stores identical content, so
+        re-uploading unchanged files costs one small request. Only when the
+        server does not have the content (or does not support deduplication)
+        is the spooled archive streamed as the body; other errors, such as a
+        missing hashID, are returned as they are. The price is that
+        compression and sending do not overlap, and the archive takes up to
+        its size in temporary disk space. Without deduplication the archive
+        is streamed into the request body while it is being compressed,
+        followed by its SHA-256 for the server to verify.
+        """
+        form = [(k, None, str(v).encode(), None) for k, v in fields.items()]
+        if not self.dedup_uploads:
+            level = self.compresslevel if compresslevel is None else compresslevel
+            archive = _HashingStream(iter_zip(expand_inputs(files), level, self.zip_workers))
+            return self._post_multipart(path, form + [("archive", filename, archive, None), ("sha256", None, archive.hexdigest, None)])
+        with self._spool_archive(files, compresslevel) as archive:
+            fields = {**fields, "sha256": archive.sha256}
+            r = self.session.post(self._url(path), data={**fields, "filename": filename}, timeout=60)
+            if not _needs_archive(r):
+                return r
+            form.append(("sha256", None, archive.sha256.encode(), None))
+            return self._post_multipart(path, form + [("archive", filename, archive.iter_chunks(), archive.size)])
+
+    def calibrations_upload(self, hashID: str, notes: str, files: List[str], compresslevel: Optional[int] = None) -> dict:
+        """Create a ZIP from `files` and upload it as a calibration bundle.
+
+        This bundles all given files into a ZIP archive, compressed in parallel
+        and streamed without holding it in memory, and posts it to the server's
+        `/calibrations/upload` endpoint along with `hashID` and `notes`.
+        If the server already stores an identical archive, only its hash is sent.
+
+        Args:
+            hashID: Unique identifier for the calibration record.
+            notes: Free-form notes associated with this upload.
+            files: Files to include in the ZIP archive. Plain files are stored
+                by basename; directories are added recursively under their own
+                name; glob patterns (``"out/*.json"``, ``"data/**"``) are expanded.
+            compresslevel: Deflate level 0-9 (0 = store only); defaults to the
+                client's `compresslevel`.
+
+        Raises:
+            ValueError: If `files` is empty or two inputs have the same name in the archive.
+            FileNotFoundError: If a path does not exist or a pattern matches nothing.
+            requests.HTTPError: If the server returns an error response.
+
+        Returns:
+            dict: The server's JSON response, typically including:
+                {"status": "ok", "id": <int>, "created_at": "<timestamp>"}.
+        """
+        if not files:
+            raise ValueError("Provide at least one file to upload.")
+
+        data_payload = {"hashID": hashID, "notes": notes or ""}
+        resp = self._post_archive("/calibrations/upload", data_payload, files, "calibration_bundle.zip", compresslevel)
+        if resp.status_code >= 400:
+            raise requests.HTTPError(f"Upload failed ({resp.status_code}): {resp.text}")
+        return resp.json()
+
+    def _iter_pages(self, path: str, params: Dict[str, Any], what: str) -> Iterator[Dict[str, Any]]:
+        """Lazily yield items from a cursor-paginated listing endpoint.
+
+        Each page is only requested once the previous one has been consumed.
+        Pages are fetched in the compact columnar format (servers that predate
+        it ignore the parameter and send rows).
+        """
+        params = {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in params.items() if v is not None}
+        while True:
+            r = self.session.get(self._url(path), params={**params, "format": self._list_format}, timeout=120)
+            if r.status_code == 406 and self._list_format == "msgpack":
+                self._list_format = "columns"  # the server lacks msgpack
+                continue
+            if r.status_code >= 400:
+                raise requests.HTTPError(f"{what} failed ({r.status_code}): {r.text}")
+            payload = _decode_listing(r)
+            yield from _iter_rows(payload)
+            cursor = payload.get("next_cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+
+    def iter_calibrations(
+        self,
+        page_size: int = LIST_PAGE_SIZE,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        hash_prefix: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazily iterate calibration metadata (newest first), one page at a time.
+
+        Args:
+            page_size: Number of rows fetched per request (server caps it at 1000).
+            since: Only calibrations created at or after this UTC time.
+            until: Only calibrations created before this UTC time.
+            hash_prefix: Only calibrations whose hashID starts with this prefix.
+            notes: Only calibrations whose notes contain this substring.
+
+        Raises:
+            requests.HTTPError: On server error.
+
+        Yields:
+            Dicts with the same keys as `calibrations_list` items.
+        """
+        params = {"limit": page_size, "since": since, "until": until, "hashPrefix": hash_prefix, "notes": notes}
+        return self._iter_pages("/calibrations/list", params, "List")
+
+    def calibrations_list(self) -> List[Dict[str, Any]]:
+        """Return metadata for all calibration uploads (newest first).
+
+        Pages through the whole listing; use `iter_calibrations` to filter or to
+        stop early without fetching every page.
+
+        Raises:
+            requests.HTTPError: On server error.
+
+        Returns:
+            List of dicts with keys:
+              - id (int)
+              - hashID (str)
+              - notes (str | None)
+              - created_at (str)
+              - filename (str)
+              - size (int)  # size of stored ZIP in bytes
+              - sha256 (str | None)  # checksum of stored ZIP
+        """
+        return list(self.iter_calibrations())
+
+    def calibrations_download(self, hashID: str) -> Tuple[Optional[str], str, str, bytes]:
+        """Download the latest calibration ZIP for a given `hashID`.
+
+        Args:
+            hashID: The calibration record identifier to fetch.
+
+        Raises:
+            requests.HTTPError: On server error or not found (4xx/5xx).
+
+        Returns:
+            Tuple of (notes, filename, data):
+              - notes (Optional[str]): Notes saved with the record.
+              - filename (str): Original ZIP filename returned by the server.
+              - created_at (str): UTC date-time for calibration entry to the db
+              - data (bytes): Raw ZIP file contents.
+        """
+        if self.cache is not None:
+            buf = io.BytesIO()
+            notes, filename, created_at = self.calibrations_download_to(hashID, buf)
+            return notes, filename, created_at, buf.getvalue()
+        r = self.session.post(self._url("/calibrations/download"), json={"hashID": hashID}, timeout=300)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+        payload = r.json()
+        data = base64.b64decode(payload["data_b64"])
+        return payload.get("notes"), payload["filename"], payload["created_at"], data
+
+    def calibrations_download_to(
+        self,
+        hashID: str,
+        dest: Union[str, os.PathLike, BinaryIO],
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> Tuple[Optional[str], str, str]:
+        """Stream the latest calibration ZIP for `hashID` into a file.
+
+        Unlike `calibrations_download`, the archive is transferred as raw
+        `application/zip` and written to `dest` in chunks, so the whole blob is
+        never held in memory.
+
+        Args:
+            hashID: The calibration record identifier to fetch.
+            dest: Output file path, or a writable binary file object.
+            chunk_size: Number of bytes read from the socket per chunk.
+
+        Raises:
+            requests.HTTPError: On server error or not found (4xx/5xx).
+
+        Returns:
+            Tuple of (notes, filename, created_at).
+        """
+        meta = self._fetch_archive("/calibrations/download/raw", {"hashID": hashID}, dest, chunk_size)["meta"]
+        return meta["X-Qibo-Notes"], meta["X-Qibo-Filename"], meta["X-Qibo-Created-At"]
+
+    def calibrations_unpack(self, hashID: str, foldername: str, link: bool = True) -> Tuple[Optional[str], str, str]:
+        """Download the latest calibration for `hashID` and unpack it into `foldername`.
+
+        With a cache, each archive is extracted only once and `foldername` is
+        populated with hardlinks to the extracted tree (or copies when `link`
+        is False or hardlinks are not possible). Hardlinked files share their
+        contents with the cache, so pass ``link=False`` if you edit them.
+
+        Returns:
+            Tuple of (notes, filename, created_at).
+        """
+        ref = self._unpack("/calibrations/download/raw", {"hashID": hashID}, foldername, link)
+        meta = ref["meta"]
+        return meta["X-Qibo-Notes"], meta["X-Qibo-Filename"], meta["X-Qibo-Created-At"]
+
+    def _unpack(self, path: str, params: Dict[str, str], foldername: str, link: bool) -> Dict[str, Any]:
+        if self.cache is None:
+            with tempfile.TemporaryFile() as tmp:
+                ref = self._fetch_archive(path, params, tmp, DOWNLOAD_CHUNK_SIZE)
+                tmp.seek(0)
+                unpack(foldername, tmp)
+            return ref
+        ref = self._fetch_archive(path, params, None, DOWNLOAD_CHUNK_SIZE)
+        _link_tree(self.cache.extracted(ref["sha256"]), foldername, link)
+        return ref
+
+    def calibrations_get_latest(self) -> Dict[str, Any]:
+        """Return metadata for the most recently uploaded calibration.
+
+        Raises:
+            requests.HTTPError: On server error (>=400).
+
+        Returns:
+            Dict with keys:
+              - hashID (str)
+              - notes (str | None)
+              - created_at (str)
+            If no calibrations exist, returns {}.
+        """
+        status, payload, r = self._get_json_conditional("/calibrations/latest", None, timeout=120)
+        if status == 404:
+            return {}
+        if status >= 400:
+            raise requests.HTTPError(f"Latest failed ({r.status_code}): {r.text}")
+        return dict(payload)
+
+    def results_upload(
+        self,
+        hashID: str,
+        name: str,
+        notes: str,
+        files: List[str],
+        runID: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+    ) -> dict:
+        """
+        Create a ZIP from `files` and upload it as a "result" bundle.
+
+        The archive is compressed in parallel and streamed, as in
+        `calibrations_upload`. If the server already stores an identical
+        archive, only its hash is sent.
+
+        Args:
+            hashID: Required. Identifier tying related results together.
+            name: Required. Logical name/group for this particular result.
+            notes: Free-form notes.
+            files: Files, directories or glob patterns to include in the ZIP
+                (see `calibrations_upload`).
+            runID: Optional string to tag this result with an run.
+            compresslevel: Deflate level 0-9 (0 = store only); defaults to the
+                client's `compresslevel`.
+
+        Returns:
+            dict with keys like:
+              {
+                "status": "ok",
+                "id": <int>,
+                "created_at": "<timestamp>",
+                "run_id": "<runID or null>"
+              }
+        """
+        if not files:
+            raise ValueError("No files provided for upload.")
+
+        fields = {"hashID": hashID, "name": name, "notes": notes or ""}
+
+        # only send runID if provided
+        if runID is not None:
+            fields["runID"] = runID
+
+        r = self._post_archive("/results/upload", fields, files, "bundle.zip", compresslevel)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"Upload failed ({r.status_code}): {r.text}")
+        return r.json()
+
+    def _upload_resumable(
+        self,
+        kind: str,
+        fields: Dict[str, str],
+        archive: SpooledZip,
+        filename: str,
+        chunk_size: int,
+        parallel: int,
+    ) -> dict:
+        """Upload `archive` through a resumable upload session (see `results_upload_resumable`)."""
+        sha256 = archive.sha256
+        if self.dedup_uploads:
+            r = self.session.post(self._url(f"/{kind}/upload"), data={**fields, "sha256": sha256, "filename": filename}, timeout=60)
+            if r.status_code < 400:
+                return r.json()
+            if not _needs_archive(r):
+                raise requests.HTTPError(f"Upload failed ({r.status_code}): {r.text}")
+
+        body = {"kind": kind, "fields": {**fields, "filename": filename}, "size": archive.size, "sha256": sha256}
+        r = self.session.post(self._url("/uploads"), json=body, timeout=60)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"Upload session failed ({r.status_code}): {r.text}")
+        upload = r.json()
+        upload_url = self._url(f"/uploads/{upload['upload_id']}")
+
+        def received(start: int, end: int) -> bool:
+            return any(lo <= start and end <= hi for lo, hi in upload["received"])
+
+        def put(offset: int) -> None:
+            chunk = archive.read_range(offset, min(offset + chunk_size, archive.size))
+            resp = self.session.put(upload_url, params={"offset": offset}, data=chunk, timeout=300)
+            if resp.status_code >= 400:
+                raise requests.HTTPError(f"Chunk upload failed ({resp.status_code}): {resp.text}")
+
+        missing = [off for off in range(0, archive.size, chunk_size) if not received(off, min(off + chunk_size, archive.size))]
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            # list() re-raises the first failed chunk; the finished ones stay on the server
+            list(pool.map(put, missing))
+
+        r = self.session.post(upload_url + "/finalize", timeout=300)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"Upload finalize failed ({r.status_code}): {r.text}")
+        return r.json()
+
+    def results_upload_resumable(
+        self,
+        hashID: str,
+        name: str,
+        notes: str,
+        files: List[str],
+        runID: Optional[str] = None,
+        chunk_size: int = RESUMABLE_CHUNK_SIZE,
+        parallel: int = 4,
+        compresslevel: Optional[int] = None,
+    ) -> dict:
+        """
+        Like `results_upload`, but in chunks through a resumable upload session.
+
+        The archive is sent as `chunk_size` pieces, `parallel` at a time, and
+        assembled and checksum-verified by the server. If the upload is
+        interrupted (the call raises), calling it again with the same
+        arguments resumes the server-side session and only sends the chunks
+        that are still missing, even from a new process.
+
+        Args:
+            hashID: Required. Identifier tying related results together.
+            name: Required. Logical name/group for this particular result.
+            notes: Free-form notes.
+            files: Files, directories or glob patterns to include in the ZIP.
+            runID: Optional string to tag this result with an run.
+            chunk_size: Bytes per chunk request.
+            parallel: Number of chunks uploaded concurrently.
+            compresslevel: Deflate level 0-9 (0 = store only).
+
+        Raises:
+            ValueError: If `files` is empty.
+            requests.HTTPError: If a request fails after retries.
+
+        Returns:
+            dict: Same as `results_upload`.
+        """
+        if not files:
+            raise ValueError("No files provided for upload.")
+        fields = {"hashID": hashID, "name": name, "notes": notes or ""}
+        if runID is not None:
+            fields["runID"] = runID
+        with self._spool_archive(files, compresslevel) as archive:
+            return self._upload_resumable("results", fields, archive, "bundle.zip", chunk_size, parallel)
+
+    def calibrations_upload_resumable(
+        self,
+        hashID: str,
+        notes: str,
+        files: List[str],
+        chunk_size: int = RESUMABLE_CHUNK_SIZE,
+        parallel: int = 4,
+        compresslevel: Optional[int] = None,
+    ) -> dict:
+        """Like `calibrations_upload`, but in chunks through a resumable upload session.
+
+        See `results_upload_resumable`.
+        """
+        if not files:
+            raise ValueError("Provide at least one file to upload.")
+        fields = {"hashID": hashID, "notes": notes or ""}
+        with self._spool_archive(files, compresslevel) as archive:
+            return self._upload_resumable("calibrations", fields, archive, "calibration_bundle.zip", chunk_size, parallel)
+
+    def results_upload_many(self, items: List[Dict[str, Any]], compresslevel: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Upload many result bundles in a single request and server transaction.
+
+        Archives the server already stores (checked with one `has_archives`
+        pre-flight) are sent by reference only.
+
+        Args:
+            items: One dict per result with keys ``hashID``, ``name``, ``files``
+                (paths, directories or glob patterns) and optionally ``notes``
+                and ``runID``.
+            compresslevel: Deflate level 0-9 (0 = store only).
+
+        Raises:
+            ValueError: If `items` is empty or an item has no files.
+            FileNotFoundError: If any file path does not exist.
+            requests.HTTPError: If the request itself is rejected (e.g. auth or
+                a malformed batch). Per-item failures are reported in the result.
+
+        Returns:
+            Per-item status dicts, in input order, e.g.
+              {"index": 0, "status": "ok", "id": <int>, "created_at": "<timestamp>", "run_id": ...}
+              {"index": 1, "status": "error", "error": "<reason>"}
+        """
+        if not items:
+            raise ValueError("No items provided for upload.")
+
+        for idx, item in enumerate(items):
+            if not item.get("files"):
+                raise ValueError(f"No files provided for item {idx}.")
+        with ExitStack() as stack:
+            archives = [stack.enter_context(self._spool_archive(item["files"], compresslevel)) for item in items]
+            return self._post_many(items, archives)
+
+    def _post_many(self, items: List[Dict[str, Any]], archives: List[SpooledZip]) -> List[Dict[str, Any]]:
+        hashes = [archive.sha256 for archive in archives]
+        present = self.has_archives(sorted(set(hashes))) if self.dedup_uploads else {}
+
+        manifest = []
+        multipart = []
+        for idx, (item, archive, sha256) in enumerate(zip(items, archives, hashes)):
+            entry = {
+                "hashID": item["hashID"],
+                "name": item["name"],
+                "notes": item.get("notes") or "",
+                "runID": item.get("runID"),
+                "sha256": sha256,
+                "filename": "bundle.zip",
+            }
+            if sha256 not in present:
+                # later items with the same content reference this one (items are stored in order)
+                present[sha256] = archive.size
+                entry["archive"] = f"archive_{idx}"
+                multipart.append((entry["archive"], "bundle.zip", archive.iter_chunks(), archive.size))
+            manifest.append(entry)
+        multipart.insert(0, ("items", None, json.dumps(manifest).encode(), None))
+
+        r = self._post_multipart("/results/upload_many", multipart)
+        payload = r.json() if r.headers.get("Content-Type", "").startswith("application/json") else {}
+        if "items" not in payload:
+            raise requests.HTTPError(f"Batch upload failed ({r.status_code}): {r.text}")
+        return payload["items"]
+
+    def iter_results(
+        self,
+        hashID: str,
+        page_size: int = LIST_PAGE_SIZE,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        name_prefix: Optional[str] = None,
+        runID: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate results rows for a hashID (newest first), one page at a time.
+
+        Args:
+            hashID: Required identifier group.
+            page_size: Number of rows fetched per request (server caps it at 1000).
+            since: Only results created at or after this UTC time.
+            until: Only results created before this UTC time.
+            name_prefix: Only results whose name starts with this prefix.
+            runID: Only results from this run.
+            notes: Only results whose notes contain this substring.
+
+        Yields:
+            Dicts with the same keys as `results_list` items.
+        """
+        params = {
+            "hashID": hashID, "limit": page_size, "since": since, "until": until,
+            "namePrefix": name_prefix, "runID": runID, "notes": notes,
+        }
+        return self._iter_pages("/results/list", params, "Results list")
+
+    def results_list(self, hashID: str) -> List[Dict[str, Any]]:
+        """
+        List all results rows that share the same hashID.
+
+        Pages through the whole listing; use `iter_results` to filter or to stop
+        early without fetching every page.
+
+        Returns a list of dicts, newest first:
+          {
+            "id": int,
+            "name": str,
+            "run_id": Optional[str],
+            "notes": Optional[str],
+            "created_at": str,
+          }
+        """
+        return list(self.iter_results(hashID))
+
+    def results_download(
+        self,
+        hashID: str,
+        name: str,
+        runID: Optional[str] = None,
+    ) -> Tuple[Optional[str], str, str, Optional[str], bytes]:
+        """
+        Download the most recent result matching (hashID, name),
+        and optionally filter by runID.
+
+        Args:
+            hashID: Required identifier group.
+            name: Result name to download.
+            runID: Optional filter; only match results from this run.
+
+        Returns:
+            (
+                notes,          # Optional[str]
+                filename,       # str
+                created_at,     # str
+                run_id,         # Optional[str]
+                data_bytes      # bytes
+            )
+        """
+        if self.cache is not None:
+            buf = io.BytesIO()
+            return (*self.results_download_to(hashID, name, buf, runID), buf.getvalue())
+
+        payload = {"hashID": hashID, "name": name}
+        if runID is not None:
+            payload["runID"] = runID
+
+        r = self.session.post(self._url("/results/download"), json=payload, timeout=300)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+
+        payload = r.json()
+        data_bytes = base64.b64decode(payload["data_b64"])
+
+        return (
+            payload.get("notes"),
+            payload["filename"],
+            payload["created_at"],
+            payload.get("run_id"),
+            data_bytes,
+        )
+
+    def results_download_to(
+        self,
+        hashID: str,
+        name: str,
+        dest: Union[str, os.PathLike, BinaryIO],
+        runID: Optional[str] = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> Tuple[Optional[str], str, str, Optional[str]]:
+        """
+        Stream the most recent result matching (hashID, name) into a file,
+        optionally filtered by runID.
+
+        The archive is transferred as raw `application/zip` and written to `dest`
+        in chunks instead of being base64-decoded in memory.
+
+        Args:
+            hashID: Required identifier group.
+            name: Result name to download.
+            dest: Output file path, or a writable binary file object.
+            runID: Optional filter; only match results from this run.
+            chunk_size: Number of bytes read from the socket per chunk.
+
+        Returns:
+            (
+                notes,          # Optional[str]
+                filename,       # str
+                created_at,     # str
+                run_id,         # Optional[str]
+            )
+        """
+        params = {"hashID": hashID, "name": name}
+        if runID is not None:
+            params["runID"] = runID
+
+        meta = self._fetch_archive("/results/download/raw", params, dest, chunk_size)["meta"]
+        return meta["X-Qibo-Notes"], meta["X-Qibo-Filename"], meta["X-Qibo-Created-At"], meta["X-Qibo-Run-Id"]
+
+    def results_unpack(
+        self,
+        hashID: str,
+        name: str,
+        foldername: str,
+        runID: Optional[str] = None,
+        link: bool = True,
+    ) -> Tuple[Optional[str], str, str, Optional[str]]:
+        """Download the most recent matching result and unpack it into `foldername`.
+
+        See `calibrations_unpack` for how the cache and `link` are used.
+
+        Returns:
+            (notes, filename, created_at, run_id)
+        """
+        params = {"hashID": hashID, "name": name}
+        if runID is not None:
+            params["runID"] = runID
+        meta = self._unpack("/results/download/raw", params, foldername, link)["meta"]
+        return meta["X-Qibo-Notes"], meta["X-Qibo-Filename"], meta["X-Qibo-Created-At"], meta["X-Qibo-Run-Id"]
+
+    def results_download_all(
+        self,
+        hashID: str,
+        foldername: str,
+        name_prefix: Optional[str] = None,
+        runID: Optional[str] = None,
+        parallel: int = 8,
+        progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+        link: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Download and unpack every matching result of `hashID`, `parallel` at a time.
+
+        The latest archive of each distinct (name, runID) is streamed to disk
+        and extracted into ``foldername/<name>/<runID>``. Results without a run
+        go to ``foldername/<name>/_norun`` (`NO_RUN_DIR`), a sibling of the run
+        directories, so their files never mix with a run's; run ids starting
+        with ``_`` get one more ``_`` prepended. Up to `parallel` archives are in flight,
+        so fetching a full run set is limited by bandwidth rather than by
+        per-request latency. With a cache, archives that did not change are
+        not downloaded again (see `calibrations_unpack` for `link`).
+
+        Args:
+            hashID: Required identifier group.
+            foldername: Root folder of the extracted results.
+            name_prefix: Only results whose name starts with this prefix.
+            runID: Only results from this run.
+            parallel: Maximum number of concurrent downloads.
+            progress: Called on the calling thread after each result finishes,
+                as ``progress(done, total, status)`` with the status dict below.
+            link: Hardlink files from the cache instead of copying them.
+
+        Returns:
+            One status dict per result, in listing order (newest first):
+              {"name", "run_id", "path", "status": "ok", "notes", "filename", "created_at"}
+              {"name", "run_id", "path", "status": "error", "error": "<reason>"}
+            Failed results do not stop the others.
+        """
+        targets: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        for row in self.iter_results(hashID, page_size=1000, name_prefix=name_prefix, runID=runID):
+            targets.setdefault((row["name"], row.get("run_id")), row)
+
+        def fetch(name: str, run_id: Optional[str]) -> Dict[str, Any]:
+            path = os.path.join(foldername, _path_component(name), _run_dir(run_id))
+            status = {"name": name, "run_id": run_id, "path": path}
+            # the listed row itself; (name, runID) alone would not single out results without a run
+            params = {"hashID": hashID, "name": name, "id": str(targets[(name, run_id)]["id"])}
+            try:
+                meta = self._unpack("/results/download/raw", params, status["path"], link)["meta"]
+            except Exception as e:
+                status.update({"status": "error", "error": str(e)})
+                return status
+            status.update({
+                "status": "ok",
+                "notes": meta["X-Qibo-Notes"],
+                "filename": meta["X-Qibo-Filename"],
+                "created_at": meta["X-Qibo-Created-At"],
+            })
+            return status
+
+        statuses: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            futures = {pool.submit(fetch, *key): key for key in targets}
+            for done, future in enumerate(as_completed(futures), 1):
+                statuses[futures[future]] = future.result()
+                if progress is not None:
+                    progress(done, len(futures), statuses[futures[future]])
+        return [statuses[key] for key in targets]
+
+    def calibrations_open_zip(self, hashID: str) -> zipfile.ZipFile:
+        """Open the latest calibration ZIP for `hashID` remotely, without downloading it.
+
+        Only the central directory and the members actually read are
+        transferred, using HTTP Range requests::
+
+            with db.calibrations_open_zip("abc123") as zf:
+                params = json.loads(zf.read("parameters.json"))
+
+        Raises:
+            requests.HTTPError: On server error or not found, or if the archive
+                is replaced by a newer upload while it is being read.
+        """
+        return zipfile.ZipFile(_RangeFile(self.session, self._url("/calibrations/download/raw"), {"hashID": hashID}))
+
+    def results_open_zip(self, hashID: str, name: str, runID: Optional[str] = None) -> zipfile.ZipFile:
+        """Open the most recent matching result ZIP remotely, without downloading it.
+
+        See `calibrations_open_zip`.
+        """
+        params = {"hashID": hashID, "name": name}
+        if runID is not None:
+            params["runID"] = runID
+        return zipfile.ZipFile(_RangeFile(self.session, self._url("/results/download/raw"), params))
+
+    def _list_members(self, path: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        status, payload, r = self._get_json_conditional(path, params, timeout=60)
+        if status >= 400:
+            raise requests.HTTPError(f"list members failed ({r.status_code}): {r.text}")
+        return payload["members"]
+
+    def _read_member(self, path: str, params: Dict[str, str]) -> bytes:
+        r = self.session.get(self._url(path), params=params, timeout=300)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"read member failed ({r.status_code}): {r.text}")
+        return r.content
+
+    def calibrations_list_members(self, hashID: str) -> List[Dict[str, Any]]:
+        """List the files inside the latest calibration archive for `hashID`.
+
+        Returns:
+            list[dict]: ``{"name", "size", "compressed_size", "crc32"}`` per file,
+            in archive order.
+        """
+        return self._list_members("/calibrations/members", {"hashID": hashID})
+
+    def calibrations_read_member(self, hashID: str, member: str) -> bytes:
+        """Read one file from the latest calibration archive for `hashID`.
+
+        The server decompresses just that member, so only its contents are
+        transferred::
+
+            params = json.loads(db.calibrations_read_member("abc123", "parameters.json"))
+
+        Raises:
+            requests.HTTPError: On server error, or if the archive or member is not found.
+        """
+        return self._read_member("/calibrations/member", {"hashID": hashID, "member": member})
+
+    def results_list_members(self, hashID: str, name: str, runID: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List the files inside the most recent matching result archive.
+
+        See `calibrations_list_members`.
+        """
+        params = {"hashID": hashID, "name": name}
+        if runID is not None:
+            params["runID"] = runID
+        return self._list_members("/results/members", params)
+
+    def results_read_member(self, hashID: str, name: str, member: str, runID: Optional[str] = None) -> bytes:
+        """Read one file from the most recent matching result archive.
+
+        See `calibrations_read_member`.
+        """
+        params = {"hashID": hashID, "name": name, "member": member}
+        if runID is not None:
+            params["runID"] = runID
+        return self._read_member("/results/member", params)
+
+    def set_best_run(self, calibrationHashID: str, runID: str) -> Dict[str, Any]:
+        """
+        Mark a (calibrationHashID, runID) pair as the current best run.
+        """
+        payload = {
+            "calibrationHashID": calibrationHashID,
+            "runID": runID,
+        }
+
+        r = self.session.post(self._url("/bestruns/set"), json=payload, timeout=60)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"set_best_run failed ({r.status_code}): {r.text}")
+
+        return r.json()
+
+    def get_best_run(self) -> Tuple[str, str, str]:
+        """
+        Returns (calibration_hash_id, run_id, created_at)
+        from the most recently inserted best run.
+        """
+        status, payload, r = self._get_json_conditional("/bestruns/get", None, timeout=60)
+        if status >= 400:
+            raise requests.HTTPError(f"get_best_run failed ({r.status_code}): {r.text}")
+
+        if payload.get("status") != "ok":
+            raise requests.HTTPError(f"Server error: {payload}")
+
+        return (
+            payload["calibration_hash_id"],
+            payload["run_id"],
+            payload["created_at"],
+        )
+
+    def get_best_n_runs(self, n: int) -> List[Tuple[str, str, str]]:
+        """
+        Get up to `n` previous best runs.
+
+        Returns a list of tuples:
+            [
+              (calibration_hash_id, run_id, created_at),
+              ...
+            ]
+        ordered from newest (most recent best run) to oldest,
+        up to the requested limit `n`.
+        """
+        if n <= 0:
+            raise ValueError("n must be a positive integer")
+
+        status, payload, r = self._get_json_conditional("/bestruns/list", {"limit": n, "format": "columns"}, timeout=60)
+        if status >= 400:
+            raise requests.HTTPError(f"get_best_n_runs failed ({r.status_code}): {r.text}")
+
+        if payload.get("status") != "ok":
+            raise requests.HTTPError(f"Server error in get_best_n_runs: {payload}")
+
+        result: List[Tuple[str, str, str]] = []
+        for it in _iter_rows(payload):
+            result.append(
+                (
+                    str(it["calibration_hash_id"]),
+                    str(it["run_id"]),
+                    str(it["created_at"]),
+                )
+            )
+        return result
+
+    def iter_events(
+        self,
+        since: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        timeout: float = EVENTS_TIMEOUT,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield new best runs and calibrations as they are inserted.
+
+        Long-polls ``/events``: each request is held open by the server until
+        something happens (or `timeout` expires), so events arrive within
+        milliseconds without a tight polling loop. The iterator never ends on
+        its own; break out of the loop to stop.
+
+        Every event carries a ``cursor``; pass the last one seen as `since` to
+        resume later without missing or repeating events.
+
+        Args:
+            since: Cursor to resume from; None starts with events after the first request.
+            types: Subset of ``["bestrun", "calibration"]``; all by default.
+            timeout: Seconds the server may hold each request open (max 60).
+
+        Raises:
+            requests.HTTPError: On server error.
+
+        Yields:
+            Dicts with ``type`` ("bestrun" or "calibration"), ``cursor``, ``id``
+            and ``created_at``, plus ``calibration_hash_id``/``run_id`` for best
+            runs or ``hashID``/``notes`` for calibrations.
+        """
+        params: Dict[str, Any] = {"timeout": timeout}
+        if types:
+            params["types"] = ",".join(types)
+        while True:
+            if since:
+                params["since"] = since
+            r = self.session.get(self._url("/events"), params=params, timeout=timeout + 30)
+            if r.status_code >= 400:
+                raise requests.HTTPError(f"Events failed ({r.status_code}): {r.text}")
+            payload = r.json()
+            for event in payload.get("events", []):
+                since = event["cursor"]
+                yield event
+            since = payload.get("cursor") or since
+
+
+_SHARED_CLIENTS: Dict[Tuple[Optional[str], Optional[str]], QiboDBClient] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def get_client(server_url: Optional[str] = None, api_token: Optional[str] = None) -> QiboDBClient:
+    """Return the shared `QiboDBClient` for these overrides, creating it on first use.
+
+    The module-level functions call this, so repeated calls with the same
+    `server_url`/`api_token` (usually both None, i.e. the saved config) reuse
+    one pooled session.
+    """
+    key = (server_url.rstrip("/") if server_url else None, api_token)
+    with _SHARED_LOCK:
+        client = _SHARED_CLIENTS.get(key)
+        if client is None:
+            client = _SHARED_CLIENTS[key] = QiboDBClient(server_url, api_token)
+        return client
+
+
+def _close_shared_clients() -> None:
+    with _SHARED_LOCK:
+        for client in _SHARED_CLIENTS.values():
+            client.close()
+        _SHARED_CLIENTS.clear()
+
+
+def has_archives(
+    sha256s: List[str],
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Dict[str, int]:
+    """Ask the server which of these archive SHA-256 hashes it already stores.
+
+    See `QiboDBClient.has_archives`.
+    """
+    return get_client(server_url, api_token).has_archives(sha256s)
+
+
 def calibrations_upload(
     hashID: str,
     notes: str,
     files: List[str],
     server_url: Optional[str] = None,
-    api_token: Optional[str] = None
+    api_token: Optional[str] = None,
+    compresslevel: Optional[int] = None,
 ) -> dict:
     """Create a ZIP from `files` and upload it as a calibration bundle.
 
-    This bundles all given files into an in-memory ZIP archive and posts it to
-    the server's `/calibrations/upload` endpoint along with `hashID` and `notes`.
-    If `api_token` is provided (or saved in the client config), it is sent as
-    a Bearer token.
-
-    Args:
-        hashID: Unique identifier for the calibration record.
-        notes: Free-form notes associated with this upload.
-        files: List of file paths to include in the ZIP archive.
-        server_url: Base server URL; if omitted, uses saved config or defaults to
-            "http://127.0.0.1:5000".
-        api_token: Optional bearer token; if omitted, uses saved config.
-
-    Raises:
-        ValueError: If `files` is empty.
-        FileNotFoundError: If any file path does not exist.
-        requests.HTTPError: If the server returns an error response.
-
-    Returns:
-        dict: The server's JSON response, typically including:
-            {"status": "ok", "id": <int>, "created_at": "<timestamp>"}.
+    See `QiboDBClient.calibrations_upload`. `server_url` and `api_token`
+    override the saved client config.
     """
-    server_url, api_token = _get_defaults(server_url, api_token)
+    return get_client(server_url, api_token).calibrations_upload(hashID, notes, files, compresslevel)
 
-    if not files:
-        raise ValueError("Provide at least one file to upload.")
-    for p in files:
-        if not os.path.isfile(p):
-            raise FileNotFoundError(f"File not found: {p}")
 
-    mem_zip = io.BytesIO()
-    with zipfile.ZipFile(mem_zip, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for p in files:
-            zf.write(p, arcname=os.path.basename(p))
-    mem_zip.seek(0)
+def iter_calibrations(
+    page_size: int = LIST_PAGE_SIZE,
+    since: Optional[Union[str, datetime]] = None,
+    until: Optional[Union[str, datetime]] = None,
+    hash_prefix: Optional[str] = None,
+    notes: Optional[str] = None,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily iterate calibration metadata (newest first), one page at a time.
 
-    files_payload = {"archive": ("calibration_bundle.zip", mem_zip.read(), "application/zip")}
-    data_payload = {"hashID": hashID, "notes": notes or ""}
-    url = server_url + "/calibrations/upload"
-    resp = requests.post(url, data=data_payload, files=files_payload, headers=_auth_headers(api_token), timeout=300)
-    if resp.status_code >= 400:
-        raise requests.HTTPError(f"Upload failed ({resp.status_code}): {resp.text}")
-    return resp.json()
+    See `QiboDBClient.iter_calibrations`.
+    """
+    return get_client(server_url, api_token).iter_calibrations(page_size, since, until, hash_prefix, notes)
 
 
 def calibrations_list(server_url: Optional[str] = None, api_token: Optional[str] = None) -> List[Dict[str, Any]]:
     """Return metadata for all calibration uploads (newest first).
 
-    Args:
-        server_url: Optional override for the server base URL.
-        api_token: Optional override for the bearer token.
-
-    Raises:
-        requests.HTTPError: On server error.
-
-    Returns:
-        List of dicts with keys:
-          - id (int)
-          - hashID (str)
-          - notes (str | None)
-          - created_at (str)
-          - filename (str)
-          - size (int)  # size of stored ZIP in bytes
-    """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/calibrations/list"
-    r = requests.get(url, headers=_auth_headers(api_token), timeout=120)
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"List failed ({r.status_code}): {r.text}")
-    return r.json().get("items", [])
+    See `QiboDBClient.calibrations_list`.
+    """
+    return get_client(server_url, api_token).calibrations_list()
 
 
 def calibrations_download(
@@ -183,29 +1560,37 @@ def calibrations_download(
 ) -> Tuple[Optional[str], str, str, bytes]:
     """Download the latest calibration ZIP for a given `hashID`.
 
-    Args:
-        hashID: The calibration record identifier to fetch.
-        server_url: Optional override for the server base URL.
-        api_token: Optional override for the bearer token.
+    See `QiboDBClient.calibrations_download`.
+    """
+    return get_client(server_url, api_token).calibrations_download(hashID)
 
-    Raises:
-        requests.HTTPError: On server error or not found (4xx/5xx).
 
-    Returns:
-        Tuple of (notes, filename, data):
-          - notes (Optional[str]): Notes saved with the record.
-          - filename (str): Original ZIP filename returned by the server.
-          - created_at (str): UTC date-time for calibration entry to the db
-          - data (bytes): Raw ZIP file contents.
-    """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/calibrations/download"
-    r = requests.post(url, json={"hashID": hashID}, headers=_auth_headers(api_token), timeout=300)
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
-    payload = r.json()
-    data = base64.b64decode(payload["data_b64"])
-    return payload.get("notes"), payload["filename"], payload["created_at"], data
+def calibrations_download_to(
+    hashID: str,
+    dest: Union[str, os.PathLike, BinaryIO],
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> Tuple[Optional[str], str, str]:
+    """Stream the latest calibration ZIP for `hashID` into a file.
+
+    See `QiboDBClient.calibrations_download_to`.
+    """
+    return get_client(server_url, api_token).calibrations_download_to(hashID, dest, chunk_size)
+
+
+def calibrations_unpack(
+    hashID: str,
+    foldername: str,
+    link: bool = True,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Tuple[Optional[str], str, str]:
+    """Download the latest calibration for `hashID` and unpack it into `foldername`.
+
+    See `QiboDBClient.calibrations_unpack`.
+    """
+    return get_client(server_url, api_token).calibrations_unpack(hashID, foldername, link)
 
 
 def calibrations_get_latest(
@@ -214,28 +1599,9 @@ def calibrations_get_latest(
 ) -> Dict[str, Any]:
     """Return metadata for the most recently uploaded calibration.
 
-    Args:
-        server_url: Optional override for the server base URL.
-        api_token: Optional override for the bearer token.
-
-    Raises:
-        requests.HTTPError: On server error (>=400).
-
-    Returns:
-        Dict with keys:
-          - hashID (str)
-          - notes (str | None)
-          - created_at (str)
-        If no calibrations exist, returns {}.
-    """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/calibrations/latest"
-    r = requests.get(url, headers=_auth_headers(api_token), timeout=120)
-    if r.status_code == 404:
-        return {}
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"Latest failed ({r.status_code}): {r.text}")
-    return r.json()
+    See `QiboDBClient.calibrations_get_latest`.
+    """
+    return get_client(server_url, api_token).calibrations_get_latest()
 
 
 def results_upload(
@@ -243,69 +1609,91 @@ def results_upload(
     name: str,
     notes: str,
     files: List[str],
-    runID: Optional[str] = None,  # NEW
+    runID: Optional[str] = None,
     server_url: Optional[str] = None,
-    api_token: Optional[str] = None
+    api_token: Optional[str] = None,
+    compresslevel: Optional[int] = None,
 ) -> dict:
     """
     Create a ZIP from `files` and upload it as a "result" bundle.
 
-    Args:
-        hashID: Required. Identifier tying related results together.
-        name: Required. Logical name/group for this particular result.
-        notes: Free-form notes.
-        files: List of file paths to include in the ZIP.
-        runID: Optional string to tag this result with an run.
-        server_url: Override server URL; otherwise use stored default.
-        api_token: Override API token; otherwise use stored default.
+    See `QiboDBClient.results_upload`.
+    """
+    return get_client(server_url, api_token).results_upload(hashID, name, notes, files, runID, compresslevel)
 
-    Returns:
-        dict with keys like:
-          {
-            "status": "ok",
-            "id": <int>,
-            "created_at": "<timestamp>",
-            "run_id": "<runID or null>"
-          }
+
+def results_upload_many(
+    items: List[Dict[str, Any]],
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Upload many result bundles in a single request and server transaction.
+
+    See `QiboDBClient.results_upload_many`.
+    """
+    return get_client(server_url, api_token).results_upload_many(items, compresslevel)
+
+
+def results_upload_resumable(
+    hashID: str,
+    name: str,
+    notes: str,
+    files: List[str],
+    runID: Optional[str] = None,
+    chunk_size: int = RESUMABLE_CHUNK_SIZE,
+    parallel: int = 4,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+) -> dict:
     """
-    server_url, api_token = _get_defaults(server_url, api_token)
-
-    if not files:
-        raise ValueError("No files provided for upload.")
-
-    # create in-memory zip
-    mem = io.BytesIO()
-    with zipfile.ZipFile(mem, "w", zipfile.ZIP_DEFLATED) as zf:
-        for p in files:
-            pth = Path(p)
-            if not pth.exists():
-                raise FileNotFoundError(f"File not found: {pth}")
-            zf.write(pth, arcname=pth.name)
-    mem.seek(0)
-    zip_bytes = mem.read()
-
-    url = server_url + "/results/upload"
-    multipart = {
-        "hashID": (None, hashID),
-        "name": (None, name),
-        "notes": (None, notes or ""),
-        "archive": ("bundle.zip", zip_bytes, "application/zip"),
-    }
-
-    # NEW: only send runID if provided
-    if runID is not None:
-        multipart["runID"] = (None, runID)
-
-
-    r = requests.post(
-        url,
-        files=multipart,
-        headers=_auth_headers(api_token),
-        timeout=300
+    Upload a "result" bundle in parallel chunks that survive interruptions.
+
+    See `QiboDBClient.results_upload_resumable`.
+    """
+    return get_client(server_url, api_token).results_upload_resumable(
+        hashID, name, notes, files, runID, chunk_size, parallel, compresslevel
     )
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"Upload failed ({r.status_code}): {r.text}")
-    return r.json()
+
+
+def calibrations_upload_resumable(
+    hashID: str,
+    notes: str,
+    files: List[str],
+    chunk_size: int = RESUMABLE_CHUNK_SIZE,
+    parallel: int = 4,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+) -> dict:
+    """Upload a calibration bundle in parallel chunks that survive interruptions.
+
+    See `QiboDBClient.calibrations_upload_resumable`.
+    """
+    return get_client(server_url, api_token).calibrations_upload_resumable(
+        hashID, notes, files, chunk_size, parallel, compresslevel
+    )
+
+
+def iter_results(
+    hashID: str,
+    page_size: int = LIST_PAGE_SIZE,
+    since: Optional[Union[str, datetime]] = None,
+    until: Optional[Union[str, datetime]] = None,
+    name_prefix: Optional[str] = None,
+    runID: Optional[str] = None,
+    notes: Optional[str] = None,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate results rows for a hashID (newest first), one page at a time.
+
+    See `QiboDBClient.iter_results`.
+    """
+    return get_client(server_url, api_token).iter_results(hashID, page_size, since, until, name_prefix, runID, notes)
 
 
 def results_list(
@@ -316,33 +1704,15 @@ def results_list(
     """
     List all results rows that share the same hashID.
 
-    Returns a list of dicts, newest first:
-      {
-        "name": str,
-        "run_id": Optional[str],  # NEW
-        "notes": Optional[str],
-        "created_at": str,
-      }
-    """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/results/list"
-
-    r = requests.get(
-        url,
-        params={"hashID": hashID},
-        headers=_auth_headers(api_token),
-        timeout=120
-    )
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"Results list failed ({r.status_code}): {r.text}")
-    return r.json().get("items", [])
-
+    See `QiboDBClient.results_list`.
+    """
+    return get_client(server_url, api_token).results_list(hashID)
 
 
 def results_download(
     hashID: str,
     name: str,
-    runID: Optional[str] = None,  # NEW
+    runID: Optional[str] = None,
     server_url: Optional[str] = None,
     api_token: Optional[str] = None
 ) -> Tuple[Optional[str], str, str, Optional[str], bytes]:
@@ -350,109 +1720,168 @@ def results_download(
     Download the most recent result matching (hashID, name),
     and optionally filter by runID.
 
-    Args:
-        hashID: Required identifier group.
-        name: Result name to download.
-        runID: Optional filter; only match results from this run.
-        server_url, api_token: Overrides.
+    See `QiboDBClient.results_download`.
+    """
+    return get_client(server_url, api_token).results_download(hashID, name, runID)
 
-    Returns:
-        (
-            notes,          # Optional[str]
-            filename,       # str
-            created_at,     # str
-            run_id,         # Optional[str]
-            data_bytes      # bytes
-        )
+
+def results_download_to(
+    hashID: str,
+    name: str,
+    dest: Union[str, os.PathLike, BinaryIO],
+    runID: Optional[str] = None,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> Tuple[Optional[str], str, str, Optional[str]]:
     """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/results/download"
+    Stream the most recent result matching (hashID, name) into a file,
+    optionally filtered by runID.
 
-    payload = {"hashID": hashID, "name": name}
-    if runID is not None:
-        payload["runID"] = runID
+    See `QiboDBClient.results_download_to`.
+    """
+    return get_client(server_url, api_token).results_download_to(hashID, name, dest, runID, chunk_size)
 
 
-    r = requests.post(
-        url,
-        json=payload,
-        headers=_auth_headers(api_token),
-        timeout=300
-    )
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"Download failed ({r.status_code}): {r.text}")
+def results_unpack(
+    hashID: str,
+    name: str,
+    foldername: str,
+    runID: Optional[str] = None,
+    link: bool = True,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Tuple[Optional[str], str, str, Optional[str]]:
+    """
+    Download the most recent matching result and unpack it into `foldername`.
 
-    payload = r.json()
-    data_bytes = base64.b64decode(payload["data_b64"])
+    See `QiboDBClient.results_unpack`.
+    """
+    return get_client(server_url, api_token).results_unpack(hashID, name, foldername, runID, link)
 
-    return (
-        payload.get("notes"),
-        payload["filename"],
-        payload["created_at"],
-        payload.get("run_id"),
-        data_bytes,
+
+def results_download_all(
+    hashID: str,
+    foldername: str,
+    name_prefix: Optional[str] = None,
+    runID: Optional[str] = None,
+    parallel: int = 8,
+    progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    link: bool = True,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Download and unpack every matching result of `hashID` concurrently.
+
+    See `QiboDBClient.results_download_all`.
+    """
+    return get_client(server_url, api_token).results_download_all(
+        hashID, foldername, name_prefix, runID, parallel, progress, link
     )
 
-def set_best_run(
-    calibrationHashID: str,
-    runID: str,
+
+def calibrations_open_zip(
+    hashID: str,
     server_url: Optional[str] = None,
     api_token: Optional[str] = None,
-) -> Dict[str, Any]:
+) -> zipfile.ZipFile:
+    """Open the latest calibration ZIP for `hashID` remotely, reading only what is needed.
+
+    See `QiboDBClient.calibrations_open_zip`.
     """
-    Mark a (calibrationHashID, runID) pair as the current best run.
+    return get_client(server_url, api_token).calibrations_open_zip(hashID)
+
+
+def results_open_zip(
+    hashID: str,
+    name: str,
+    runID: Optional[str] = None,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> zipfile.ZipFile:
     """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/bestruns/set"
+    Open the most recent matching result ZIP remotely, reading only what is needed.
 
-    payload = {
-        "calibrationHashID": calibrationHashID,
-        "runID": runID,
-    }
+    See `QiboDBClient.results_open_zip`.
+    """
+    return get_client(server_url, api_token).results_open_zip(hashID, name, runID)
 
-    r = requests.post(
-        url,
-        json=payload,
-        headers=_auth_headers(api_token),
-        timeout=60,
-    )
 
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"set_best_run failed ({r.status_code}): {r.text}")
+def calibrations_list_members(
+    hashID: str,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """List the files inside the latest calibration archive for `hashID`.
 
-    return r.json()
+    See `QiboDBClient.calibrations_list_members`.
+    """
+    return get_client(server_url, api_token).calibrations_list_members(hashID)
 
-def get_best_run(
+
+def calibrations_read_member(
+    hashID: str,
+    member: str,
     server_url: Optional[str] = None,
     api_token: Optional[str] = None,
-) -> Tuple[str, str, str]:
+) -> bytes:
+    """Read one file from the latest calibration archive for `hashID`.
+
+    See `QiboDBClient.calibrations_read_member`.
     """
-    Returns (calibration_hash_id, run_id, created_at)
-    from the most recently inserted best run.
+    return get_client(server_url, api_token).calibrations_read_member(hashID, member)
+
+
+def results_list_members(
+    hashID: str,
+    name: str,
+    runID: Optional[str] = None,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """List the files inside the most recent matching result archive.
+
+    See `QiboDBClient.results_list_members`.
     """
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/bestruns/get"
+    return get_client(server_url, api_token).results_list_members(hashID, name, runID)
 
-    r = requests.get(
-        url,
-        headers=_auth_headers(api_token),
-        timeout=60,
-    )
 
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"get_best_run failed ({r.status_code}): {r.text}")
+def results_read_member(
+    hashID: str,
+    name: str,
+    member: str,
+    runID: Optional[str] = None,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> bytes:
+    """Read one file from the most recent matching result archive.
 
-    payload = r.json()
-    if payload.get("status") != "ok":
-        raise requests.HTTPError(f"Server error: {payload}")
+    See `QiboDBClient.results_read_member`.
+    """
+    return get_client(server_url, api_token).results_read_member(hashID, name, member, runID)
 
-    return (
-        payload["calibration_hash_id"],
-        payload["run_id"],
-        payload["created_at"],
-    )
+
+def set_best_run(
+    calibrationHashID: str,
+    runID: str,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Mark a (calibrationHashID, runID) pair as the current best run.
+    """
+    return get_client(server_url, api_token).set_best_run(calibrationHashID, runID)
 
 
+def get_best_run(
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Tuple[str, str, str]:
+    """
+    Returns (calibration_hash_id, run_id, created_at)
+    from the most recently inserted best run.
+    """
+    return get_client(server_url, api_token).get_best_run()
 
 
 def get_best_n_runs(
@@ -461,60 +1890,44 @@ def get_best_n_runs(
     api_token: Optional[str] = None,
 ) -> List[Tuple[str, str, str]]:
     """
-    Get up to `n` previous best runs.
+    Get up to `n` previous best runs, newest first, as
+    (calibration_hash_id, run_id, created_at) tuples.
 
-    Returns a list of tuples:
-        [
-          (calibration_hash_id, run_id, created_at),
-          ...
-        ]
-    ordered from newest (most recent best run) to oldest,
-    up to the requested limit `n`.
+    See `QiboDBClient.get_best_n_runs`.
     """
-    if n <= 0:
-        raise ValueError("n must be a positive integer")
+    return get_client(server_url, api_token).get_best_n_runs(n)
 
-    server_url, api_token = _get_defaults(server_url, api_token)
-    url = server_url + "/bestruns/list"
 
-    r = requests.get(
-        url,
-        params={"limit": n},
-        headers=_auth_headers(api_token),
-        timeout=60,
-    )
-    if r.status_code >= 400:
-        raise requests.HTTPError(f"get_best_n_runs failed ({r.status_code}): {r.text}")
+def iter_events(
+    since: Optional[str] = None,
+    types: Optional[List[str]] = None,
+    timeout: float = EVENTS_TIMEOUT,
+    server_url: Optional[str] = None,
+    api_token: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield new best runs and calibrations as they are inserted.
 
-    payload = r.json()
-    if payload.get("status") != "ok":
-        raise requests.HTTPError(f"Server error in get_best_n_runs: {payload}")
+    See `QiboDBClient.iter_events`.
+    """
+    return get_client(server_url, api_token).iter_events(since, types, timeout)
 
-    items = payload.get("items", [])
-    result: List[Tuple[str, str, str]] = []
-    for it in items:
-        result.append(
-            (
-                str(it["calibration_hash_id"]),
-                str(it["run_id"]),
-                str(it["created_at"]),
-            )
-        )
-    return result
 
-def unpack(foldername: str, zipdata: bytes) -> None:
+def unpack(foldername: str, zipdata: Union[bytes, str, os.PathLike, BinaryIO]) -> None:
     """
-    Create a folder named `foldername` and unzip the given zip bytes into it.
+    Create a folder named `foldername` and unzip the given zip into it.
 
     Args:
         foldername: Path to the output folder.
-        zipdata: Bytes representing a .zip archive.
+        zipdata: Bytes representing a .zip archive, the path of a .zip file
+            (e.g. one written by `results_download_to`) or a seekable binary
+            file object.
     """
     # Ensure the folder exists
     os.makedirs(foldername, exist_ok=True)
 
-    # Wrap the raw zipdata in a BytesIO and extract
-    with zipfile.ZipFile(io.BytesIO(zipdata)) as zf:
+    # Wrap raw zipdata in a BytesIO; paths are opened directly by ZipFile
+    source = io.BytesIO(zipdata) if isinstance(zipdata, (bytes, bytearray)) else zipdata
+    with zipfile.ZipFile(source) as zf:
         zf.extractall(path=foldername)
     
 def test():
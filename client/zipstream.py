@@ -0,0 +1,264 @@
+import glob, hashlib, os, struct, tempfile, threading, zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_COMPRESSLEVEL = 6
+BLOCK_SIZE = 1024 * 1024
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+# fixed member timestamp, so identical files always zip to identical bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# already-compressed formats: deflating them again costs CPU for no gain
+STORE_SUFFIXES = frozenset({".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".png", ".jpg", ".jpeg"})
+
+_STORED, _DEFLATED = 0, 8
+_FLAG_DESCRIPTOR, _FLAG_UTF8 = 0x08, 0x800
+_ZIP64_LIMIT = 0xFFFFFFFF
+_WINDOW = 32 * 1024
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4H3L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_END_RECORD64 = struct.Struct("<4sQ2H2L4Q")
+_END_LOCATOR64 = struct.Struct("<4sLQL")
+_DOS_DATE = (ZIP_DATE_TIME[0] - 1980) << 9 | ZIP_DATE_TIME[1] << 5 | ZIP_DATE_TIME[2]
+_DOS_TIME = ZIP_DATE_TIME[3] << 11 | ZIP_DATE_TIME[4] << 5 | ZIP_DATE_TIME[5] // 2
+
+
+def expand_inputs(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """Resolve upload inputs to ``(archive name, file path)`` pairs, sorted by name.
+
+    Files are stored flat, by basename. Directories are added recursively
+    under their own name (``data/`` -> ``data/sub/x.h5``). Paths containing
+    glob characters are expanded (``**`` recurses), each match being treated
+    as a file or directory.
+
+    Raises:
+        FileNotFoundError: If a path does not exist or a pattern matches nothing.
+        ValueError: If two inputs map to the same archive name.
+    """
+    entries = {}
+
+    def add(arcname: str, path: str) -> None:
+        if arcname in entries:
+            if os.path.samefile(entries[arcname], path):
+                return  # named twice, e.g. by a path and an overlapping glob
+            raise ValueError(f"Duplicate archive member {arcname!r}: {entries[arcname]} and {path}")
+        entries[arcname] = path
+
+    def add_path(path: str) -> None:
+        if os.path.isfile(path):
+            add(os.path.basename(path), path)
+        elif os.path.isdir(path):
+            root = os.path.dirname(os.path.abspath(path))
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for name in filenames:
+                    full = os.path.join(dirpath, name)
+                    add(os.path.relpath(os.path.abspath(full), root).replace(os.sep, "/"), full)
+        else:
+            raise FileNotFoundError(f"File not found: {path}")
+
+    for p in paths:
+        p = os.fspath(p)
+        if any(c in p for c in "*?["):
+            matches = sorted(glob.glob(p, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"No files match: {p}")
+            for match in matches:
+                add_path(match)
+        else:
+            add_path(p)
+    return sorted(entries.items())
+
+
+def _deflate_block(block: bytes, zdict: bytes, level: int, last: bool) -> bytes:
+    """Raw-deflate one block, primed with the preceding window; outputs concatenate into one stream."""
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class _Member:
+    __slots__ = ("name", "path", "method", "zip64", "flags", "offset", "crc", "size", "csize")
+
+    def __init__(self, arcname: str, path: str, level: int):
+        try:
+            self.name, self.flags = arcname.encode("ascii"), _FLAG_DESCRIPTOR
+        except UnicodeEncodeError:
+            self.name, self.flags = arcname.encode("utf-8"), _FLAG_DESCRIPTOR | _FLAG_UTF8
+        self.path = path
+        stored = level == 0 or os.path.splitext(arcname)[1].lower() in STORE_SUFFIXES
+        self.method = _STORED if stored else _DEFLATED
+        # decided up front, like zipfile: deflate can slightly expand incompressible data
+        self.zip64 = os.path.getsize(path) * 1.05 > _ZIP64_LIMIT
+        self.offset = self.crc = self.size = self.csize = 0
+
+
+class _ZipStream:
+    """State of one archive being written; see `iter_zip`."""
+
+    def __init__(self, level: int):
+        self.level = level
+        self.position = 0
+        self.members: List[_Member] = []
+
+    def _emit(self, data: bytes) -> bytes:
+        self.position += len(data)
+        return data
+
+    def local_header(self, m: _Member) -> bytes:
+        m.offset = self.position
+        version = 45 if m.zip64 else 20
+        extra = struct.pack("<2H2Q", 1, 16, 0, 0) if m.zip64 else b""
+        sizes = _ZIP64_LIMIT if m.zip64 else 0
+        header = _LOCAL_HEADER.pack(b"PK\x03\x04", version, m.flags, m.method, _DOS_TIME, _DOS_DATE,
+                                    0, sizes, sizes, len(m.name), len(extra))
+        return self._emit(header + m.name + extra)
+
+    def data(self, m: _Member, block: bytes) -> bytes:
+        m.csize += len(block)
+        return self._emit(block)
+
+    def descriptor(self, m: _Member) -> bytes:
+        if m.zip64:
+            return self._emit(struct.pack("<4sL2Q", b"PK\x07\x08", m.crc, m.csize, m.size))
+        if m.size > _ZIP64_LIMIT or m.csize > _ZIP64_LIMIT:
+            raise ValueError(f"{m.path} grew past 4 GiB while being archived")
+        return self._emit(struct.pack("<4s3L", b"PK\x07\x08", m.crc, m.csize, m.size))
+
+    def central_directory(self) -> bytes:
+        start = self.position
+        records = []
+        for m in self.members:
+            fields64 = [v for v in (m.size, m.csize) if m.zip64] + ([m.offset] if m.offset >= _ZIP64_LIMIT else [])
+            extra = struct.pack(f"<2H{len(fields64)}Q", 1, 8 * len(fields64), *fields64) if fields64 else b""
+            version = 45 if extra else 20
+            records.append(_CENTRAL_HEADER.pack(
+                b"PK\x01\x02", version, 3, version, 0, m.flags, m.method, _DOS_TIME, _DOS_DATE,
+                m.crc, _ZIP64_LIMIT if m.zip64 else m.csize, _ZIP64_LIMIT if m.zip64 else m.size,
+                len(m.name), len(extra), 0, 0, 0, 0o644 << 16, min(m.offset, _ZIP64_LIMIT),
+            ) + m.name + extra)
+        directory = b"".join(records)
+        count, size = len(self.members), len(directory)
+        end = b""
+        if count >= 0xFFFF or size >= _ZIP64_LIMIT or start >= _ZIP64_LIMIT:
+            end64_offset = start + size
+            end += _END_RECORD64.pack(b"PK\x06\x06", _END_RECORD64.size - 12, 45, 45, 0, 0, count, count, size, start)
+            end += _END_LOCATOR64.pack(b"PK\x06\x07", 0, end64_offset, 1)
+        end += _END_RECORD.pack(b"PK\x05\x06", 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                                min(size, _ZIP64_LIMIT), min(start, _ZIP64_LIMIT), 0)
+        return self._emit(directory + end)
+
+    def pieces(self, entries: List[Tuple[str, str]], pool: ThreadPoolExecutor, block_size: int) -> Iterator[Callable[[], bytes]]:
+        """Callables producing the archive's bytes when called in order.
+
+        Files are read (and CRC'd) here, in order; deflate work is submitted to
+        `pool` as soon as a block is read, so it runs ahead of the consumer.
+        """
+        for arcname, path in entries:
+            m = _Member(arcname, path, self.level)
+            self.members.append(m)
+            yield lambda m=m: self.local_header(m)
+            window = b""
+            with open(path, "rb") as f:
+                block = f.read(block_size)
+                while True:
+                    following = f.read(block_size) if block else b""
+                    last = not following
+                    m.crc = zlib.crc32(block, m.crc)
+                    m.size += len(block)
+                    if m.method == _DEFLATED:
+                        future = pool.submit(_deflate_block, block, window, self.level, last)
+                        yield lambda m=m, future=future: self.data(m, future.result())
+                        window = (window + block)[-_WINDOW:]
+                    elif block:
+                        yield lambda m=m, block=block: self.data(m, block)
+                    if last:
+                        break
+                    block = following
+            yield lambda m=m: self.descriptor(m)
+        yield self.central_directory
+
+
+def iter_zip(
+    entries: List[Tuple[str, str]],
+    compresslevel: int = DEFAULT_COMPRESSLEVEL,
+    workers: Optional[int] = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Yield a ZIP of `entries` (from `expand_inputs`) as it is built.
+
+    Members are deflated in `block_size` blocks on `workers` threads (zlib
+    releases the GIL); each block is primed with the 32 KiB before it, so the
+    blocks join into one standard deflate stream, as pigz does. At most a few
+    blocks per worker are in flight, so memory use does not grow with the
+    input. Sizes and CRCs follow each member in a data descriptor, with ZIP64
+    records where needed.
+
+    The output only depends on the inputs, `compresslevel` and `block_size`:
+    members get a fixed timestamp and permissions, so the same files always
+    produce the same bytes and SHA-256. Level 0 stores members uncompressed;
+    files with an already-compressed suffix (`STORE_SUFFIXES`) are always stored.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    stream = _ZipStream(compresslevel)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for piece in stream.pieces(entries, pool, block_size):
+            pending.append(piece)
+            if len(pending) > 2 * workers:
+                yield pending.popleft()()
+        while pending:
+            yield pending.popleft()()
+
+
+class SpooledZip:
+    """A ZIP built once into a spooled temp file (in memory up to `max_memory`, then on disk).
+
+    Used when the archive's size and SHA-256 are needed before sending it
+    (deduplication pre-flight, resumable uploads). Ranges can be read from
+    several threads.
+    """
+
+    def __init__(
+        self,
+        entries: List[Tuple[str, str]],
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
+        workers: Optional[int] = None,
+        max_memory: int = SPOOL_MAX_BYTES,
+    ):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._lock = threading.Lock()
+        digest = hashlib.sha256()
+        try:
+            for chunk in iter_zip(entries, compresslevel, workers):
+                digest.update(chunk)
+                self._file.write(chunk)
+        except BaseException:
+            self._file.close()
+            raise
+        self.size = self._file.tell()
+        self.sha256 = digest.hexdigest()
+
+    def read_range(self, start: int, end: int) -> bytes:
+        with self._lock:
+            self._file.seek(start)
+            return self._file.read(end - start)
+
+    def iter_chunks(self, chunk_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+        for start in range(0, self.size, chunk_size):
+            yield self.read_range(start, min(start + chunk_size, self.size))
+
+    def getvalue(self) -> bytes:
+        return self.read_range(0, self.size)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "SpooledZip":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,9 +1,40 @@
-import argparse, base64
-from flask import Flask, request, jsonify
-from sqlalchemy import select, desc
+import argparse, base64, json, mimetypes, os, posixpath, re, time, zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import quote
+from flask import Flask, Response, request, jsonify
+from sqlalchemy import select, desc, func, and_, or_
 from .config import Config
-from .db import make_engine, make_session_factory
+from .db import make_engine, make_session_factory, iter_blob_chunks
 from .models import Base, Calibration, Result,BestRun
+from .migrate import upgrade_schema
+from .storage import BlobInfo, blob_key, make_blob_store
+from .uploads import SUGGESTED_CHUNK_SIZE, UploadSessions
+from .cache import make_metadata_cache
+from .events import EVENT_TYPES, EventHub, encode_event_cursor, decode_event_cursor
+from .archives import find_member, index_archive, open_member, read_members
+from .metrics import Metrics, MetricsMiddleware
+from .compression import available_encodings, choose_encoding, compress
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EVENTS_DEFAULT_TIMEOUT = 25.0
+EVENTS_MAX_TIMEOUT = 60.0
+EVENTS_MAX_BATCH = 100
+MAX_BLOB_LOOKUP = 1000
+_SHA256_RE = re.compile(r"[0-9a-f]{64}")
+# form fields kept by resumable upload sessions, per kind
+_UPLOAD_FIELDS = {
+    "calibrations": ("hashID", "notes", "filename"),
+    "results": ("hashID", "name", "runID", "notes", "filename"),
+}
+# endpoints receiving archive bytes, tracked by the qibo_uploads_in_flight gauge
+_UPLOAD_ENDPOINTS = frozenset({"cal_upload", "results_upload", "uploads_put_chunk", "results_upload_many"})
+LIST_FORMATS = ("json", "columns", "msgpack")
+MSGPACK_MIMETYPE = "application/msgpack"
+# only metadata is compressed; archives are ZIPs already
+_COMPRESSIBLE_MIMETYPES = frozenset({"application/json", MSGPACK_MIMETYPE})
+_EPOCH = datetime(1970, 1, 1)
 
 
 
@@ -16,14 +47,459 @@ def _check_auth(req, api_token) -> bool:
     token = auth.split(" ", 1)[1].strip()
     return token == api_token
 
+CACHE_CONTROL = "private, no-cache"
+
+def _not_modified(etag: str, headers: Optional[dict] = None) -> Optional[Response]:
+    """Return a 304 response if the request's If-None-Match matches `etag`."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    resp = Response(status=304, headers=headers or {})
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = CACHE_CONTROL
+    return resp
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise RuntimeError("format=msgpack requires msgpack on the server (pip install msgpack).") from e
+    return msgpack
+
+def _list_format(args) -> str:
+    """The listing format asked for with ?format=: `json` rows (default), `columns` or `msgpack`.
+
+    Raises:
+        ValueError: On an unknown format.
+        RuntimeError: If msgpack is asked for but not installed.
+    """
+    fmt = (args.get("format") or "json").strip().lower()
+    if fmt not in LIST_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(LIST_FORMATS)}")
+    if fmt == "msgpack":
+        _msgpack()
+    return fmt
+
+def _format_response(payload: dict, fmt: str = "json") -> Response:
+    if fmt == "msgpack":
+        return Response(_msgpack().packb(payload, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload)
+
+def _conditional_json(payload: dict, etag: str, fmt: str = "json") -> Response:
+    """Serialize `payload` with validators, or answer 304 if the client's copy is current."""
+    resp = _not_modified(etag)
+    if resp is None:
+        resp = _format_response(payload, fmt)
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = CACHE_CONTROL
+    return resp
+
+def _requested_range(size: int, etag: str):
+    """The byte range asked for by the request's Range header, as ``(start, end)``.
+
+    Returns None to send the whole archive: no Range header, several ranges
+    (allowed to be ignored), or an If-Range validator that no longer matches.
+
+    Raises:
+        ValueError: If the range cannot be satisfied.
+    """
+    rng = request.range
+    if rng is None or rng.units != "bytes" or len(rng.ranges) != 1:
+        return None
+    if_range = request.if_range
+    if (if_range.etag or if_range.date) and if_range.etag != etag:
+        return None
+    start, stop = rng.ranges[0]
+    if stop is None and start < 0 and size > 0:
+        # a suffix longer than the archive selects all of it (RFC 9110 14.1.2); werkzeug rejects it
+        return max(size + start, 0), size
+    bounds = rng.range_for_length(size)
+    if bounds is None:
+        raise ValueError("range not satisfiable")
+    return bounds
+
+def _archive_response(open_body, filename: str, size: int, etag: str, **meta) -> Response:
+    """Build a streamed `application/zip` response with metadata in X-Qibo-* headers.
+
+    `open_body(start, end)` returns a chunk iterator over that byte range.
+    `etag` is the archive's content hash; a matching If-None-Match yields a
+    bodiless 304 that still carries the metadata headers. A single-range
+    Range request is answered with 206 Partial Content.
+    """
+    headers = {
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+        "X-Qibo-Filename": quote(filename),
+        "Accept-Ranges": "bytes",
+    }
+    for key, value in meta.items():
+        if value is not None:
+            header = "X-Qibo-" + "-".join(part.capitalize() for part in key.split("_"))
+            headers[header] = quote(str(value))
+    resp = _not_modified(etag, headers)
+    if resp is not None:
+        return resp
+    try:
+        bounds = _requested_range(size, etag)
+    except ValueError:
+        return Response(status=416, headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"})
+    start, end = bounds or (0, size)
+    headers["Content-Length"] = str(end - start)
+    if bounds:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    resp = Response(open_body(start, end), status=206 if bounds else 200, mimetype="application/zip",
+                    headers=headers, direct_passthrough=True)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = CACHE_CONTROL
+    return resp
+
+def _encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of the last row on a page."""
+    raw = json.dumps([created_at.strftime("%Y-%m-%d %H:%M:%S.%f"), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S.%f"), int(row_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+def _parse_time(value: Optional[str], field: str) -> Optional[datetime]:
+    """Parse an ISO-8601 query parameter into a naive UTC datetime."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO-8601 timestamp")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def _page_query(stmt, model, args):
+    """Apply limit/cursor/since/until query args to a listing ordered newest first.
+
+    Pagination is keyset-based on (created_at, id), so every page costs the same
+    regardless of how deep into the history it is.
+
+    Returns:
+        (stmt, limit): The statement fetching limit + 1 rows, and the page size.
+
+    Raises:
+        ValueError: On malformed arguments.
+    """
+    raw_limit = (args.get("limit") or "").strip()
+    try:
+        limit = int(raw_limit) if raw_limit else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    since = _parse_time(args.get("since"), "since")
+    until = _parse_time(args.get("until"), "until")
+    if since is not None:
+        stmt = stmt.where(model.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(model.created_at < until)
+
+    cursor = (args.get("cursor") or "").strip()
+    if cursor:
+        c_created_at, c_id = _decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            model.created_at < c_created_at,
+            and_(model.created_at == c_created_at, model.id < c_id),
+        ))
+    return stmt.order_by(desc(model.created_at), desc(model.id)).limit(limit + 1), limit
+
+def _page_items(rows, limit: int, to_item):
+    """Split fetched rows into (items, next_cursor)."""
+    more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id) if more else None
+    return [to_item(r) for r in rows], next_cursor
+
+def _epoch_us(dt: datetime) -> int:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+def _page_columns(rows, limit: int, names):
+    """Split fetched rows into (columns, next_cursor) for the columnar listing formats.
+
+    `names` are the output names of the selected columns, in select order.
+    Each becomes one list of values, so keys are not repeated per row;
+    `created_at` is sent as integer microseconds since the Unix epoch (UTC)
+    instead of a formatted string.
+    """
+    more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id) if more else None
+    columns = dict(zip(names, map(list, zip(*rows)))) if rows else {name: [] for name in names}
+    if rows and "created_at" in columns:
+        columns["created_at"] = [_epoch_us(v) for v in columns["created_at"]]
+    return columns, next_cursor
+
 def create_app(cfg) -> Flask:
     app = Flask(__name__)
     app.config["MAX_CONTENT_LENGTH"] = cfg.MAX_CONTENT_LENGTH
 
-    engine = make_engine(cfg.DB_URI, echo=cfg.DEBUG)
+    engine = make_engine(cfg.DB_URI, echo=cfg.DEBUG, cfg=cfg)
     SessionLocal = make_session_factory(engine)
     with engine.begin() as conn:
         Base.metadata.create_all(bind=conn)
+    upgrade_schema(engine)
+    store = make_blob_store(cfg)
+    cache = make_metadata_cache(cfg)
+    hub = EventHub()
+    uploads = UploadSessions(cfg.UPLOAD_DIR, ttl=cfg.UPLOAD_SESSION_TTL)
+    metrics = Metrics()
+    metrics.instrument_engine(engine)
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics)
+
+    @app.before_request
+    def _start_request_metrics():
+        metrics.start_request()
+        rule = request.url_rule
+        # label by URL rule, not path, so per-hash URLs don't create new series
+        request.environ["qibo.route"] = rule.rule if rule is not None else "unmatched"
+        if request.endpoint in _UPLOAD_ENDPOINTS:
+            request.environ["qibo.upload"] = True
+            metrics.uploads_in_flight.inc(route=rule.rule)
+            if request.mimetype == "multipart/form-data" and _check_auth(request, cfg.API_TOKEN):
+                with metrics.phase("parse"):
+                    request.form  # parse the upload up front so its cost is reported separately
+
+    @app.after_request
+    def _add_server_timing(resp):
+        timings = metrics.current()
+        if cfg.SERVER_TIMING and timings is not None:
+            resp.headers["Server-Timing"] = timings.server_timing()
+        return resp
+
+    encodings = available_encodings(cfg.RESPONSE_ENCODINGS)
+
+    # registered after _add_server_timing so it runs first and shows up in its header
+    @app.after_request
+    def _compress_response(resp):
+        if resp.mimetype not in _COMPRESSIBLE_MIMETYPES or resp.is_streamed or "Content-Encoding" in resp.headers:
+            return resp
+        resp.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings, encodings)
+        if encoding is None or (resp.content_length or 0) < cfg.COMPRESS_MIN_SIZE:
+            return resp
+        with metrics.phase("compress"):
+            resp.set_data(compress(resp.get_data(), encoding))
+        resp.headers["Content-Encoding"] = encoding
+        etag, weak = resp.get_etag()
+        if etag and not weak:
+            # the compressed bytes differ from the identity ones; If-None-Match compares weakly
+            resp.set_etag(etag, weak=True)
+        return resp
+
+    def _committed(namespace: str) -> None:
+        """Invalidate cached metadata and wake up /events waiters after a write."""
+        cache.invalidate(namespace)
+        hub.notify()
+
+    def _archive_bytes(r) -> bytes:
+        """Full archive of a Calibration/Result row, from the blob store or inline."""
+        return store.read_bytes(r.storage_key) if r.storage_key else r.data
+
+    def _archive_body(model, r):
+        """Opener of chunk iterators over byte ranges of an archive, from the blob store or inline."""
+        def open_range(start: int, end: int):
+            if r.storage_key:
+                return store.iter_range(r.storage_key, start, end)
+            return iter_blob_chunks(SessionLocal, model.data, model.id, r.id, end, start=start)
+        return open_range
+
+    def _index_blob(blob: BlobInfo) -> None:
+        """Index the members of a newly stored archive; uploads that are not ZIPs stay unindexed."""
+        try:
+            with metrics.phase("index"):
+                index_archive(SessionLocal, blob.sha256,
+                              lambda start, end: store.iter_range(blob.key, start, end), blob.size)
+        except zipfile.BadZipFile:
+            pass
+        except Exception:
+            # indexing is an optimisation; the member endpoints index lazily on first use
+            app.logger.exception("indexing archive %s failed", blob.sha256)
+
+    def _archive_members(model, r) -> list:
+        """Member index of a row's archive, built on first use for archives stored before indexing.
+
+        Raises:
+            zipfile.BadZipFile: If the archive is not a ZIP file.
+        """
+        if r.sha256:
+            return index_archive(SessionLocal, r.sha256, _archive_body(model, r), r.size)
+        return read_members(_archive_body(model, r), r.size)
+
+    def _members_response(model, r) -> Response:
+        try:
+            members = _archive_members(model, r)
+        except zipfile.BadZipFile:
+            return jsonify({"status": "error", "error": "archive is not a ZIP file"}), 422
+        payload = {
+            "status": "ok",
+            "sha256": r.sha256,
+            "members": [
+                {k: m[k] for k in ("name", "size", "compressed_size", "crc32")}
+                for m in members if not m["name"].endswith("/")
+            ],
+        }
+        if not r.sha256:
+            return jsonify(payload)
+        return _conditional_json(payload, f"members-{r.sha256}")
+
+    def _member_response(model, r, name: str) -> Response:
+        """Stream one archive member, decompressed, using the member index."""
+        try:
+            member = find_member(_archive_members(model, r), name)
+        except zipfile.BadZipFile:
+            return jsonify({"status": "error", "error": "archive is not a ZIP file"}), 422
+        if member is None or name.endswith("/"):
+            return jsonify({"status": "error", "error": "member not found"}), 404
+        etag = f"{r.sha256 or f'{model.__tablename__}-{r.id}'}.{member['position']}"
+        headers = {"X-Qibo-Crc32": f"{member['crc32']:08x}", "Cache-Control": CACHE_CONTROL}
+        not_modified = _not_modified(etag, headers)
+        if not_modified is not None:
+            return not_modified
+        try:
+            body = open_member(_archive_body(model, r), r.size, member)
+        except (zipfile.BadZipFile, ValueError) as e:
+            return jsonify({"status": "error", "error": str(e)}), 422
+        basename = posixpath.basename(name)
+        resp = Response(body, mimetype=mimetypes.guess_type(basename)[0] or "application/octet-stream")
+        resp.headers["Content-Length"] = str(member["size"])
+        resp.headers["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(basename)}"
+        resp.headers.update(headers)
+        resp.set_etag(etag)
+        return resp
+
+    def _store_archive(file, sha256: Optional[str]) -> BlobInfo:
+        """Store an uploaded archive, or resolve an upload by reference.
+
+        Uploads may omit the archive and send only its `sha256`, which is
+        accepted when the blob store already holds that content. With both,
+        the archive is checked against the hash.
+
+        Raises:
+            ValueError: No archive and no hash, a malformed hash, or a mismatch.
+            LookupError: The referenced content is not stored.
+        """
+        sha256 = (sha256 or "").strip().lower()
+        if sha256 and not _SHA256_RE.fullmatch(sha256):
+            raise ValueError("sha256 must be 64 hex digits")
+        if file and file.filename:
+            # streamed in bounded chunks; identical content is stored only once
+            with metrics.phase("store"):
+                blob = store.put_stream(file.stream)
+            if sha256 and blob.sha256 != sha256:
+                raise ValueError("archive does not match sha256")
+            _index_blob(blob)
+            return blob
+        if not sha256:
+            raise ValueError("archive file is required")
+        size = store.size(blob_key(sha256))
+        if size is None:
+            raise LookupError("unknown archive sha256; upload the archive itself")
+        return BlobInfo(sha256=sha256, size=size, key=blob_key(sha256))
+
+    def _discard_new_blobs(blobs) -> None:
+        """Delete archives this request stored whose rows were not committed.
+
+        Only blobs the request itself wrote (`BlobInfo.created`) are
+        considered, and only if no committed row references their content,
+        since an identical archive may have been uploaded concurrently.
+        """
+        shas = {b.sha256 for b in blobs if b.created}
+        if not shas:
+            return
+        try:
+            with SessionLocal() as ses:
+                used = set()
+                for model in (Calibration, Result):
+                    used.update(ses.execute(select(model.sha256).where(model.sha256.in_(shas))).scalars())
+            for sha256 in shas - used:
+                store.delete(blob_key(sha256))
+        except Exception:
+            app.logger.exception("discarding unreferenced archives failed")
+
+    def _insert_calibration(hash_id: str, notes: str, filename: str, blob: BlobInfo) -> dict:
+        with SessionLocal() as ses:
+            row = Calibration(hash_id=hash_id, notes=notes or None, filename=filename,
+                              sha256=blob.sha256, size_bytes=blob.size, storage_key=blob.key)
+            ses.add(row); ses.commit(); ses.refresh(row)
+            created = {"status": "ok", "id": row.id, "created_at": str(row.created_at)}
+        _committed("calibrations")
+        return created
+
+    def _insert_result(hash_id: str, name: str, run_id: str, notes: str, filename: str, blob: BlobInfo) -> dict:
+        with SessionLocal() as ses:
+            row = Result(
+                hash_id=hash_id,
+                name=name,
+                run_id=run_id or None,
+                notes=notes or None,
+                filename=filename,
+                sha256=blob.sha256,
+                size_bytes=blob.size,
+                storage_key=blob.key,
+            )
+            ses.add(row)
+            ses.commit()
+            ses.refresh(row)
+            return {
+                "status": "ok",
+                "id": row.id,
+                "created_at": str(row.created_at),
+                "run_id": row.run_id,
+            }
+
+    def _latest_calibration(hash_id: str):
+        """Newest calibration row for `hashID`, without loading inline archive data."""
+        with SessionLocal() as ses:
+            return ses.execute(
+                select(Calibration.id, Calibration.notes, Calibration.filename, Calibration.created_at,
+                       Calibration.storage_key, Calibration.sha256,
+                       func.coalesce(Calibration.size_bytes, func.length(Calibration.data)).label("size"))
+                .where(Calibration.hash_id == hash_id).order_by(desc(Calibration.created_at), desc(Calibration.id)).limit(1)
+            ).one_or_none()
+
+    def _latest_result(hash_id: str, name: str, run_id: str, row_id: Optional[int] = None):
+        """Newest result row for (`hashID`, `name`[, `runID`][, `id`]), without loading inline archive data."""
+        with SessionLocal() as ses:
+            stmt = select(
+                Result.id, Result.notes, Result.filename, Result.created_at, Result.run_id,
+                Result.storage_key, Result.sha256,
+                func.coalesce(Result.size_bytes, func.length(Result.data)).label("size"),
+            ).where(
+                Result.hash_id == hash_id,
+                Result.name == name
+            )
+            if run_id:
+                stmt = stmt.where(Result.run_id == run_id)
+            if row_id is not None:
+                stmt = stmt.where(Result.id == row_id)
+            stmt = stmt.order_by(desc(Result.created_at), desc(Result.id)).limit(1)
+            return ses.execute(stmt).one_or_none()
+
+    @app.post("/blobs/lookup")
+    def blobs_lookup():
+        # pre-flight for uploads: which of these archives does the server already have?
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        hashes = (request.get_json(silent=True) or {}).get("sha256")
+        if not isinstance(hashes, list) or len(hashes) > MAX_BLOB_LOOKUP:
+            return jsonify({"status": "error", "error": f"sha256 must be a list of at most {MAX_BLOB_LOOKUP} hashes"}), 400
+        present = {}
+        for sha256 in {str(h).strip().lower() for h in hashes}:
+            if _SHA256_RE.fullmatch(sha256):
+                size = store.size(blob_key(sha256))
+                if size is not None:
+                    present[sha256] = size
+        return jsonify({"status": "ok", "present": present})
 
     @app.post("/bestruns/set")
     def bestruns_set():
@@ -48,6 +524,7 @@ def create_app(cfg) -> Flask:
                 ses.add(row)
                 ses.commit()
                 ses.refresh(row)
+                _committed("bestruns")
 
                 return jsonify({
                     "status": "ok",
@@ -64,23 +541,28 @@ def create_app(cfg) -> Flask:
         if not _check_auth(request, cfg.API_TOKEN):
             return jsonify({"status": "error", "error": "Unauthorized"}), 401
 
-        with SessionLocal() as ses:
-            row = ses.execute(
-                select(BestRun)
-                .order_by(desc(BestRun.id))
-                .limit(1)
-            ).scalar_one_or_none()
+        def load():
+            with SessionLocal() as ses:
+                row = ses.execute(
+                    select(BestRun)
+                    .order_by(desc(BestRun.id))
+                    .limit(1)
+                ).scalar_one_or_none()
+                if row is None:
+                    return None
+                return {
+                    "status": "ok",
+                    "id": row.id,
+                    "calibration_hash_id": row.calibration_hash_id,
+                    "run_id": row.run_id,
+                    "created_at": str(row.created_at),
+                }
 
-            if row is None:
-                return jsonify({"status": "error", "error": "no best run set"}), 404
+        payload = cache.get_or_load("bestruns:get", load)
+        if payload is None:
+            return jsonify({"status": "error", "error": "no best run set"}), 404
+        return _conditional_json(payload, f"bestrun-{payload['id']}")
 
-            return jsonify({
-                "status": "ok",
-                "id": row.id,
-                "calibration_hash_id": row.calibration_hash_id,
-                "run_id": row.run_id,
-                "created_at": str(row.created_at),
-            })
     @app.get("/bestruns/list")
     def bestruns_list():
         if not _check_auth(request, cfg.API_TOKEN):
@@ -98,28 +580,42 @@ def create_app(cfg) -> Flask:
             limit = 1
         if limit > 100:
             limit = 100
+        try:
+            fmt = _list_format(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"status": "error", "error": str(e)}), 406
 
-        with SessionLocal() as ses:
-            rows = ses.execute(
-                select(BestRun)
-                .order_by(desc(BestRun.id))
-                .limit(limit)
-            ).scalars().all()
-
-            items = [
-                {
-                    "id": r.id,
-                    "calibration_hash_id": r.calibration_hash_id,
-                    "run_id": r.run_id,
-                    "created_at": str(r.created_at),
-                }
-                for r in rows
-            ]
+        def load():
+            with SessionLocal() as ses:
+                rows = ses.execute(
+                    select(BestRun)
+                    .order_by(desc(BestRun.id))
+                    .limit(limit)
+                ).scalars().all()
+                return [
+                    {
+                        "id": r.id,
+                        "calibration_hash_id": r.calibration_hash_id,
+                        "run_id": r.run_id,
+                        "created_at": str(r.created_at),
+                    }
+                    for r in rows
+                ]
 
-            return jsonify({
-                "status": "ok",
-                "items": items,
-            })
+        items = cache.get_or_load(f"bestruns:list:{limit}", load)
+        # bestruns are append-only, so the newest id identifies the listing
+        etag = f"bestruns-{items[0]['id'] if items else 0}-{limit}"
+        if fmt != "json":
+            names = ("id", "calibration_hash_id", "run_id", "created_at")
+            columns = {name: [it[name] for it in items] for name in names}
+            columns["created_at"] = [_epoch_us(datetime.fromisoformat(v)) for v in columns["created_at"]]
+            return _conditional_json({"status": "ok", "columns": columns}, f"{etag}-{fmt}", fmt)
+        return _conditional_json({
+            "status": "ok",
+            "items": items,
+        }, etag)
 
     @app.post("/calibrations/upload")
     def cal_upload():
@@ -130,38 +626,73 @@ def create_app(cfg) -> Flask:
         file = request.files.get("archive")
         if not hash_id:
             return jsonify({"status": "error", "error": "hashID is required"}), 400
-        if not file or file.filename == "":
-            return jsonify({"status": "error", "error": "archive file is required"}), 400
-        data = file.read()
+        filename = file.filename if file and file.filename else (request.form.get("filename") or "calibration_bundle.zip")
         try:
-            with SessionLocal() as ses:
-                row = Calibration(hash_id=hash_id, notes=notes or None, filename=file.filename, data=data)
-                ses.add(row); ses.commit(); ses.refresh(row)
-                return jsonify({"status": "ok", "id": row.id, "created_at": str(row.created_at)})
+            # the row is only committed once the blob is complete
+            blob = _store_archive(file, request.form.get("sha256"))
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        except LookupError as e:
+            return jsonify({"status": "error", "error": str(e)}), 404
         except Exception as e:
             return jsonify({"status": "error", "error": str(e)}), 500
+        try:
+            return jsonify(_insert_calibration(hash_id, notes, filename, blob))
+        except Exception as e:
+            _discard_new_blobs([blob])
+            return jsonify({"status": "error", "error": str(e)}), 500
 
     @app.get("/calibrations/list")
     def cal_list():
         if not _check_auth(request, cfg.API_TOKEN):
             return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        stmt = select(Calibration.id, Calibration.hash_id, Calibration.notes, Calibration.created_at,
+                      Calibration.filename, Calibration.sha256,
+                      func.coalesce(Calibration.size_bytes, func.length(Calibration.data)).label("size"))
+        hash_prefix = (request.args.get("hashPrefix") or "").strip()
+        notes = (request.args.get("notes") or "").strip()
+        if hash_prefix:
+            stmt = stmt.where(Calibration.hash_id.startswith(hash_prefix, autoescape=True))
+        if notes:
+            stmt = stmt.where(Calibration.notes.contains(notes, autoescape=True))
+        try:
+            stmt, limit = _page_query(stmt, Calibration, request.args)
+            fmt = _list_format(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"status": "error", "error": str(e)}), 406
         with SessionLocal() as ses:
-            rows = ses.execute(select(Calibration).order_by(desc(Calibration.created_at))).scalars().all()
-            items = [{
-                "id": r.id, "hashID": r.hash_id, "notes": r.notes,
-                "created_at": str(r.created_at), "filename": r.filename, "size": len(r.data) if r.data else 0
-            } for r in rows]
-            return jsonify({"items": items})
+            rows = ses.execute(stmt).all()
+        if fmt != "json":
+            columns, next_cursor = _page_columns(
+                rows, limit, ("id", "hashID", "notes", "created_at", "filename", "sha256", "size"))
+            return _format_response({"columns": columns, "next_cursor": next_cursor}, fmt)
+        items, next_cursor = _page_items(rows, limit, lambda r: {
+            "id": r.id, "hashID": r.hash_id, "notes": r.notes,
+            "created_at": str(r.created_at), "filename": r.filename, "size": r.size, "sha256": r.sha256
+        })
+        return jsonify({"items": items, "next_cursor": next_cursor})
 
     @app.get("/calibrations/latest")
     def cal_latest():
         if not _check_auth(request, cfg.API_TOKEN):
             return jsonify({"status": "error", "error": "Unauthorized"}), 401
-        with SessionLocal() as ses:
-            r = ses.execute(select(Calibration).order_by(desc(Calibration.created_at)).limit(1)).scalar_one_or_none()
-            if not r:
-                return jsonify({"error": "no calibrations"}), 404
-            return jsonify({"hashID": r.hash_id, "notes": r.notes, "created_at": str(r.created_at)})
+        def load():
+            with SessionLocal() as ses:
+                r = ses.execute(
+                    select(Calibration.id, Calibration.hash_id, Calibration.notes, Calibration.created_at)
+                    .order_by(desc(Calibration.created_at), desc(Calibration.id)).limit(1)
+                ).one_or_none()
+                if not r:
+                    return None
+                return [{"hashID": r.hash_id, "notes": r.notes, "created_at": str(r.created_at)}, f"cal-{r.id}"]
+
+        cached = cache.get_or_load("calibrations:latest", load)
+        if cached is None:
+            return jsonify({"error": "no calibrations"}), 404
+        payload, etag = cached
+        return _conditional_json(payload, etag)
 
     @app.post("/calibrations/download")
     def cal_download():
@@ -173,17 +704,60 @@ def create_app(cfg) -> Flask:
             return jsonify({"status": "error", "error": "hashID is required"}), 400
         with SessionLocal() as ses:
             r = ses.execute(
-                select(Calibration).where(Calibration.hash_id == hash_id).order_by(desc(Calibration.created_at)).limit(1)
+                select(Calibration).where(Calibration.hash_id == hash_id).order_by(desc(Calibration.created_at), desc(Calibration.id)).limit(1)
             ).scalar_one_or_none()
             if not r:
                 return jsonify({"error": "not found"}), 404
+            with metrics.phase("b64"):
+                data_b64 = base64.b64encode(_archive_bytes(r)).decode("ascii")
             return jsonify({
                 "notes": r.notes,
                 "filename": r.filename,
                 "created_at": str(r.created_at),
-                "data_b64": base64.b64encode(r.data).decode("ascii")
+                "data_b64": data_b64
             })
 
+    @app.get("/calibrations/download/raw")
+    def cal_download_raw():
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        hash_id = (request.args.get("hashID") or "").strip()
+        if not hash_id:
+            return jsonify({"status": "error", "error": "hashID is required"}), 400
+        r = _latest_calibration(hash_id)
+        if not r:
+            return jsonify({"error": "not found"}), 404
+        body = _archive_body(Calibration, r)
+        return _archive_response(body, r.filename, r.size, r.sha256 or f"cal-{r.id}",
+                                 notes=r.notes, created_at=r.created_at, sha256=r.sha256)
+
+    @app.get("/calibrations/members")
+    def cal_members():
+        """List the files inside the latest calibration archive of `hashID`."""
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        hash_id = (request.args.get("hashID") or "").strip()
+        if not hash_id:
+            return jsonify({"status": "error", "error": "hashID is required"}), 400
+        r = _latest_calibration(hash_id)
+        if not r:
+            return jsonify({"error": "not found"}), 404
+        return _members_response(Calibration, r)
+
+    @app.get("/calibrations/member")
+    def cal_member():
+        """Stream one file (`member`) from the latest calibration archive of `hashID`, decompressed."""
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        hash_id = (request.args.get("hashID") or "").strip()
+        member = request.args.get("member") or ""
+        if not hash_id or not member:
+            return jsonify({"status": "error", "error": "hashID and member are required"}), 400
+        r = _latest_calibration(hash_id)
+        if not r:
+            return jsonify({"error": "not found"}), 404
+        return _member_response(Calibration, r, member)
+
     @app.post("/results/upload")
     def results_upload():
         if not _check_auth(request, cfg.API_TOKEN):
@@ -199,32 +773,193 @@ def create_app(cfg) -> Flask:
             return jsonify({"status": "error", "error": "hashID is required"}), 400
         if not name:
             return jsonify({"status": "error", "error": "name is required"}), 400
-        if not file or file.filename == "":
-            return jsonify({"status": "error", "error": "archive file is required"}), 400
+        filename = file.filename if file and file.filename else (request.form.get("filename") or "bundle.zip")
 
-        data = file.read()
         try:
-            with SessionLocal() as ses:
-                row = Result(
-                    hash_id=hash_id,
-                    name=name,
-                    run_id=run_id or None,
-                    notes=notes or None,
-                    filename=file.filename,
-                    data=data,
-                )
-                ses.add(row)
-                ses.commit()
-                ses.refresh(row)
+            # the row is only committed once the blob is complete
+            blob = _store_archive(file, request.form.get("sha256"))
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        except LookupError as e:
+            return jsonify({"status": "error", "error": str(e)}), 404
+        except Exception as e:
+            return jsonify({"status": "error", "error": str(e)}), 500
 
-                return jsonify({
-                    "status": "ok",
-                    "id": row.id,
-                    "created_at": str(row.created_at),
-                    "run_id": row.run_id,
-                })
+        try:
+            return jsonify(_insert_result(hash_id, name, run_id, notes, filename, blob))
+        except Exception as e:
+            _discard_new_blobs([blob])
+            return jsonify({"status": "error", "error": str(e)}), 500
+
+    @app.post("/uploads")
+    def uploads_create():
+        """Start (or resume) a resumable upload session.
+
+        json: ``{"kind": "calibrations"|"results", "size", "sha256", "fields": {...}}``
+        where ``fields`` are the form fields of the matching upload endpoint.
+        Creating the same upload again returns the existing session.
+        """
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        payload = request.get_json(silent=True) or {}
+        kind = payload.get("kind")
+        if kind not in _UPLOAD_FIELDS:
+            return jsonify({"status": "error", "error": "kind must be 'calibrations' or 'results'"}), 400
+        raw_fields = payload.get("fields") if isinstance(payload.get("fields"), dict) else {}
+        fields = {k: str(raw_fields.get(k) or "").strip() for k in _UPLOAD_FIELDS[kind]}
+        for required in ("hashID", "name"):
+            if required in fields and not fields[required]:
+                return jsonify({"status": "error", "error": f"{required} is required"}), 400
+        size = payload.get("size")
+        if not isinstance(size, int) or size < 0 or size > cfg.MAX_CONTENT_LENGTH:
+            return jsonify({"status": "error", "error": f"size must be an integer between 0 and {cfg.MAX_CONTENT_LENGTH}"}), 400
+        sha256 = str(payload.get("sha256") or "").strip().lower()
+        if not _SHA256_RE.fullmatch(sha256):
+            return jsonify({"status": "error", "error": "sha256 must be 64 hex digits"}), 400
+        meta = uploads.create(kind, fields, size, sha256)
+        return jsonify({
+            "status": "ok",
+            "upload_id": meta["upload_id"],
+            "size": size,
+            "received": uploads.received(meta["upload_id"]),
+            "chunk_size": SUGGESTED_CHUNK_SIZE,
+        })
+
+    @app.get("/uploads/<upload_id>")
+    def uploads_status(upload_id: str):
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        try:
+            meta = uploads.get(upload_id)
+        except KeyError:
+            return jsonify({"status": "error", "error": "unknown upload"}), 404
+        return jsonify({"status": "ok", **meta, "received": uploads.received(upload_id)})
+
+    @app.put("/uploads/<upload_id>")
+    def uploads_put_chunk(upload_id: str):
+        # raw chunk body at ?offset=N; re-sending a chunk simply replaces it
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        try:
+            offset = int(request.args.get("offset", ""))
+        except ValueError:
+            return jsonify({"status": "error", "error": "offset must be an integer"}), 400
+        try:
+            written = uploads.write_chunk(upload_id, offset, request.stream)
+        except KeyError:
+            return jsonify({"status": "error", "error": "unknown upload"}), 404
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        return jsonify({"status": "ok", "offset": offset, "size": written})
+
+    @app.post("/uploads/<upload_id>/finalize")
+    def uploads_finalize(upload_id: str):
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        try:
+            meta = uploads.get(upload_id)
+        except KeyError:
+            return jsonify({"status": "error", "error": "unknown upload"}), 404
+        received = uploads.received(upload_id)
+        if received != ([[0, meta["size"]]] if meta["size"] else []):
+            return jsonify({"status": "error", "error": "upload is incomplete", "received": received}), 409
+        try:
+            blob = store.put_chunks(uploads.iter_content(upload_id))
         except Exception as e:
             return jsonify({"status": "error", "error": str(e)}), 500
+        if blob.sha256 != meta["sha256"]:
+            _discard_new_blobs([blob])
+            uploads.delete(upload_id)
+            return jsonify({"status": "error", "error": "checksum mismatch; upload discarded"}), 400
+        _index_blob(blob)
+        fields = meta["fields"]
+        try:
+            if meta["kind"] == "calibrations":
+                created = _insert_calibration(fields["hashID"], fields["notes"], fields["filename"] or "calibration_bundle.zip", blob)
+            else:
+                created = _insert_result(fields["hashID"], fields["name"], fields["runID"], fields["notes"],
+                                         fields["filename"] or "bundle.zip", blob)
+        except Exception as e:
+            _discard_new_blobs([blob])
+            return jsonify({"status": "error", "error": str(e)}), 500
+        uploads.delete(upload_id)
+        return jsonify(created)
+
+    @app.delete("/uploads/<upload_id>")
+    def uploads_abort(upload_id: str):
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        try:
+            uploads.get(upload_id)
+        except KeyError:
+            return jsonify({"status": "error", "error": "unknown upload"}), 404
+        uploads.delete(upload_id)
+        return jsonify({"status": "ok"})
+
+    @app.post("/results/upload_many")
+    def results_upload_many():
+        """Store many result archives in one request and one transaction.
+
+        form field ``items``: JSON list of ``{"hashID", "name", "runID"?, "notes"?, "archive"}``
+        where ``archive`` names the multipart file field holding that item's ZIP.
+        An item may instead reference already stored content by ``sha256``
+        (plus an optional ``filename``) and send no file. Invalid items are reported individually; all valid items are committed together.
+        Archives stored for the batch are deleted again if the transaction fails.
+        """
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+
+        try:
+            manifest = json.loads(request.form.get("items") or "")
+            if not isinstance(manifest, list) or not manifest:
+                raise ValueError
+        except ValueError:
+            return jsonify({"status": "error", "error": "items must be a non-empty JSON list"}), 400
+
+        statuses = []
+        pending = []
+        for idx, item in enumerate(manifest):
+            item = item if isinstance(item, dict) else {}
+            hash_id = str(item.get("hashID") or "").strip()
+            name = str(item.get("name") or "").strip()
+            file = request.files.get(str(item.get("archive") or ""))
+            if not hash_id or not name:
+                statuses.append({"index": idx, "status": "error", "error": "hashID and name are required"})
+                continue
+            try:
+                blob = _store_archive(file, item.get("sha256"))
+            except Exception as e:
+                statuses.append({"index": idx, "status": "error", "error": str(e)})
+                continue
+            row = Result(
+                hash_id=hash_id,
+                name=name,
+                run_id=str(item.get("runID") or "").strip() or None,
+                notes=str(item.get("notes") or "").strip() or None,
+                filename=file.filename if file and file.filename else str(item.get("filename") or "bundle.zip"),
+                sha256=blob.sha256,
+                size_bytes=blob.size,
+                storage_key=blob.key,
+            )
+            status = {"index": idx, "status": "ok"}
+            statuses.append(status)
+            pending.append((status, row, blob))
+
+        try:
+            with SessionLocal() as ses:
+                ses.add_all([row for _status, row, _blob in pending])
+                ses.commit()
+                for status, row, _blob in pending:
+                    ses.refresh(row)
+                    status.update({"id": row.id, "created_at": str(row.created_at), "run_id": row.run_id})
+        except Exception as e:
+            _discard_new_blobs([blob for _status, _row, blob in pending])
+            for status, _row, _blob in pending:
+                status.update({"status": "error", "error": str(e)})
+
+        ok = sum(1 for st in statuses if st["status"] == "ok")
+        overall = "ok" if ok == len(statuses) else ("partial" if ok else "error")
+        return jsonify({"status": overall, "items": statuses}), (200 if ok else 400)
 
     @app.get("/results/list")
     def results_list():
@@ -235,23 +970,41 @@ def create_app(cfg) -> Flask:
         if not hash_id:
             return jsonify({"status": "error", "error": "hashID is required"}), 400
 
+        stmt = select(Result.id, Result.name, Result.run_id, Result.notes, Result.created_at).where(
+            Result.hash_id == hash_id
+        )
+        name_prefix = (request.args.get("namePrefix") or "").strip()
+        run_id = (request.args.get("runID") or "").strip()
+        notes = (request.args.get("notes") or "").strip()
+        if name_prefix:
+            stmt = stmt.where(Result.name.startswith(name_prefix, autoescape=True))
+        if run_id:
+            stmt = stmt.where(Result.run_id == run_id)
+        if notes:
+            stmt = stmt.where(Result.notes.contains(notes, autoescape=True))
+        try:
+            stmt, limit = _page_query(stmt, Result, request.args)
+            fmt = _list_format(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"status": "error", "error": str(e)}), 406
+
         with SessionLocal() as ses:
-            rows = ses.execute(
-                select(Result)
-                .where(Result.hash_id == hash_id)
-                .order_by(desc(Result.created_at))
-            ).scalars().all()
-
-            items = [
-                {
-                    "name": r.name,
-                    "run_id": r.run_id,
-                    "notes": r.notes,
-                    "created_at": str(r.created_at),
-                }
-                for r in rows
-            ]
-            return jsonify({"items": items})
+            rows = ses.execute(stmt).all()
+
+        if fmt != "json":
+            columns, next_cursor = _page_columns(rows, limit, ("id", "name", "run_id", "notes", "created_at"))
+            return _format_response({"columns": columns, "next_cursor": next_cursor}, fmt)
+
+        items, next_cursor = _page_items(rows, limit, lambda r: {
+            "id": r.id,
+            "name": r.name,
+            "run_id": r.run_id,
+            "notes": r.notes,
+            "created_at": str(r.created_at),
+        })
+        return jsonify({"items": items, "next_cursor": next_cursor})
 
     @app.post("/results/download")
     def results_download():
@@ -275,24 +1028,152 @@ def create_app(cfg) -> Flask:
                 stmt = stmt.where(Result.run_id == run_id)
 
 
-            stmt = stmt.order_by(desc(Result.created_at)).limit(1)
+            stmt = stmt.order_by(desc(Result.created_at), desc(Result.id)).limit(1)
             r = ses.execute(stmt).scalar_one_or_none()
 
             if not r:
                 return jsonify({"error": "not found"}), 404
 
+            with metrics.phase("b64"):
+                data_b64 = base64.b64encode(_archive_bytes(r)).decode("ascii")
             return jsonify({
                 "notes": r.notes,
                 "filename": r.filename,
                 "created_at": str(r.created_at),
                 "run_id": r.run_id,
-                "data_b64": base64.b64encode(r.data).decode("ascii"),
+                "data_b64": data_b64,
             })
 
+    @app.get("/results/download/raw")
+    def results_download_raw():
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+
+        hash_id = (request.args.get("hashID") or "").strip()
+        name = (request.args.get("name") or "").strip()
+        run_id = (request.args.get("runID") or "").strip()
+
+        if not hash_id or not name:
+            return jsonify({"status": "error", "error": "hashID and name are required"}), 400
+        try:
+            # a specific row, as listed by /results/list
+            row_id = int(request.args["id"]) if request.args.get("id") else None
+        except ValueError:
+            return jsonify({"status": "error", "error": "id must be an integer"}), 400
+
+        r = _latest_result(hash_id, name, run_id, row_id)
+        if not r:
+            return jsonify({"error": "not found"}), 404
+
+        body = _archive_body(Result, r)
+        return _archive_response(body, r.filename, r.size, r.sha256 or f"result-{r.id}",
+                                 notes=r.notes, created_at=r.created_at, run_id=r.run_id, sha256=r.sha256)
+
+    @app.get("/results/members")
+    def results_members():
+        """List the files inside the latest result archive of (`hashID`, `name`[, `runID`])."""
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        hash_id = (request.args.get("hashID") or "").strip()
+        name = (request.args.get("name") or "").strip()
+        if not hash_id or not name:
+            return jsonify({"status": "error", "error": "hashID and name are required"}), 400
+        r = _latest_result(hash_id, name, (request.args.get("runID") or "").strip())
+        if not r:
+            return jsonify({"error": "not found"}), 404
+        return _members_response(Result, r)
+
+    @app.get("/results/member")
+    def results_member():
+        """Stream one file (`member`) from the latest matching result archive, decompressed."""
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        hash_id = (request.args.get("hashID") or "").strip()
+        name = (request.args.get("name") or "").strip()
+        member = request.args.get("member") or ""
+        if not hash_id or not name or not member:
+            return jsonify({"status": "error", "error": "hashID, name and member are required"}), 400
+        r = _latest_result(hash_id, name, (request.args.get("runID") or "").strip())
+        if not r:
+            return jsonify({"error": "not found"}), 404
+        return _member_response(Result, r, member)
+
+    def _events_head():
+        with SessionLocal() as ses:
+            return (
+                ses.execute(select(func.coalesce(func.max(BestRun.id), 0))).scalar_one(),
+                ses.execute(select(func.coalesce(func.max(Calibration.id), 0))).scalar_one(),
+            )
+
+    def _load_events(since, types):
+        """Rows inserted after the cursor `since`, each with the cursor just past it."""
+        bestrun_id, calibration_id = since
+        events = []
+        with SessionLocal() as ses:
+            if "bestrun" in types:
+                rows = ses.execute(
+                    select(BestRun).where(BestRun.id > bestrun_id).order_by(BestRun.id).limit(EVENTS_MAX_BATCH)
+                ).scalars().all()
+                for r in rows:
+                    bestrun_id = r.id
+                    events.append({
+                        "type": "bestrun", "cursor": encode_event_cursor(bestrun_id, calibration_id),
+                        "id": r.id, "calibration_hash_id": r.calibration_hash_id,
+                        "run_id": r.run_id, "created_at": str(r.created_at),
+                    })
+            if "calibration" in types:
+                rows = ses.execute(
+                    select(Calibration.id, Calibration.hash_id, Calibration.notes, Calibration.created_at)
+                    .where(Calibration.id > calibration_id).order_by(Calibration.id).limit(EVENTS_MAX_BATCH)
+                ).all()
+                for r in rows:
+                    calibration_id = r.id
+                    events.append({
+                        "type": "calibration", "cursor": encode_event_cursor(bestrun_id, calibration_id),
+                        "id": r.id, "hashID": r.hash_id, "notes": r.notes, "created_at": str(r.created_at),
+                    })
+        return events, encode_event_cursor(bestrun_id, calibration_id)
+
+    @app.get("/events")
+    def events_poll():
+        # long-poll: answers as soon as there is an event after `since`, or empty on timeout
+        if not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        try:
+            since = decode_event_cursor(request.args.get("since"))
+            timeout = float(request.args.get("timeout") or EVENTS_DEFAULT_TIMEOUT)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        timeout = min(max(timeout, 0.0), EVENTS_MAX_TIMEOUT)
+        types = [t.strip() for t in (request.args.get("types") or ",".join(EVENT_TYPES)).split(",") if t.strip()]
+        unknown = sorted(set(types) - set(EVENT_TYPES))
+        if unknown:
+            return jsonify({"status": "error", "error": f"unknown event type(s): {', '.join(unknown)}"}), 400
+        if since is None:
+            since = _events_head()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = hub.seq
+            events, cursor = _load_events(since, types)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return jsonify({"status": "ok", "events": events, "cursor": cursor})
+            # writes in this process wake us immediately; re-check for other workers' writes
+            hub.wait(seq, min(cfg.EVENTS_RECHECK_INTERVAL, remaining))
+
     @app.get("/health")
     def health():
         return {"status": "ok"}
 
+    @app.get("/metrics")
+    def metrics_endpoint():
+        # route names, volumes and timings reveal how the service is used, so they need the
+        # token unless METRICS_PUBLIC opts in for scrapers that cannot send one
+        if not cfg.METRICS_PUBLIC and not _check_auth(request, cfg.API_TOKEN):
+            return jsonify({"status": "error", "error": "Unauthorized"}), 401
+        return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
     return app
 
 def create_app_from_env():
@@ -305,12 +1186,28 @@ def main_cli():
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", default=5050, type=int)
     parser.add_argument("--api-token", default=None, help="Set API token and persist to server config file.")
+    parser.add_argument("--mode", choices=("dev", "asgi"), default="dev",
+                        help="dev: Flask's threaded server; asgi: uvicorn, for many concurrent slow transfers.")
+    parser.add_argument("--workers", default=1, type=int, help="Worker processes (asgi mode).")
     args = parser.parse_args()
 
     C = Config.load(cli_api_token=args.api_token)
     if args.api_token:
         Config.persist(api_token=args.api_token)
 
+    if args.mode == "asgi":
+        try:
+            import uvicorn
+        except ImportError:
+            parser.error("--mode asgi requires uvicorn (poetry install -E asgi)")
+        # workers load their config from env/files like create_app_from_env; pass the CLI token
+        # on directly in case persisting it failed
+        if args.api_token:
+            os.environ["QIBO_API_TOKEN"] = args.api_token
+        uvicorn.run("server.asgi:create_asgi_app_from_env", factory=True, host=args.host, port=args.port,
+                    workers=args.workers, log_level="debug" if C.DEBUG else "info")
+        return
+
     app = create_app(C)
     app.run(host=args.host, port=args.port, debug=C.DEBUG)
 
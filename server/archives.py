@@ -0,0 +1,178 @@
+import io, struct, zipfile, zlib
+from typing import Callable, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from .models import ArchiveMember
+
+READ_BLOCK_SIZE = 64 * 1024
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+# open_range(start, end) -> iterator over bytes [start, end) of one archive
+RangeOpener = Callable[[int, int], Iterator[bytes]]
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable read-only file over an archive that is only accessible by byte ranges.
+
+    Lets `zipfile` parse archives in the blob store (or inline legacy rows)
+    without reading them whole: small reads are rounded up to `block_size`.
+    """
+
+    def __init__(self, open_range: RangeOpener, size: int, block_size: int = READ_BLOCK_SIZE):
+        super().__init__()
+        self._open_range, self.size, self._block_size = open_range, size, block_size
+        self._pos = 0
+        self._block_start, self._block = 0, b""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(base + offset, 0)
+        return self._pos
+
+    def read(self, n: int = -1) -> bytes:
+        end = self.size if n is None or n < 0 else min(self._pos + n, self.size)
+        if end <= self._pos:
+            return b""
+        if not (self._block_start <= self._pos and end <= self._block_start + len(self._block)):
+            self._block_start = self._pos
+            self._block = b"".join(self._open_range(self._pos, min(max(end, self._pos + self._block_size), self.size)))
+        data = self._block[self._pos - self._block_start:end - self._block_start]
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def read_members(open_range: RangeOpener, size: int) -> List[dict]:
+    """Parse an archive's central directory.
+
+    Raises:
+        zipfile.BadZipFile: If the archive is not a ZIP file.
+    """
+    with zipfile.ZipFile(RangeReader(open_range, size)) as zf:
+        return [
+            {
+                "position": position,
+                "name": info.filename,
+                "size": info.file_size,
+                "compressed_size": info.compress_size,
+                "header_offset": info.header_offset,
+                "crc32": info.CRC,
+                "compress_type": info.compress_type,
+            }
+            for position, info in enumerate(zf.infolist())
+        ]
+
+
+def load_index(ses, sha256: str) -> List[dict]:
+    """Indexed members of the archive with this content hash, in archive order."""
+    rows = ses.execute(
+        select(ArchiveMember).where(ArchiveMember.sha256 == sha256).order_by(ArchiveMember.position)
+    ).scalars().all()
+    return [
+        {c: getattr(m, c) for c in ("position", "name", "size", "compressed_size", "header_offset", "crc32", "compress_type")}
+        for m in rows
+    ]
+
+
+def save_index(SessionLocal, sha256: str, members: List[dict]) -> None:
+    """Store an archive's members; a concurrent indexing of the same content wins silently."""
+    if not members:
+        return
+    with SessionLocal() as ses:
+        ses.add_all([ArchiveMember(sha256=sha256, **m) for m in members])
+        try:
+            ses.commit()
+        except IntegrityError:
+            ses.rollback()
+
+
+def index_archive(SessionLocal, sha256: str, open_range: RangeOpener, size: int) -> List[dict]:
+    """Return the member index for an archive, building and storing it if needed.
+
+    Raises:
+        zipfile.BadZipFile: If the archive is not a ZIP file.
+    """
+    with SessionLocal() as ses:
+        members = load_index(ses, sha256)
+    if not members:
+        members = read_members(open_range, size)
+        save_index(SessionLocal, sha256, members)
+    return members
+
+
+def find_member(members: List[dict], name: str) -> Optional[dict]:
+    # like zipfile, the last entry wins if a name occurs twice
+    matches = [m for m in members if m["name"] == name]
+    return matches[-1] if matches else None
+
+
+def open_member(open_range: RangeOpener, size: int, member: dict, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Return an iterator over the decompressed contents of one indexed member.
+
+    Stored and deflated members are read straight from their byte range using
+    the indexed offsets; other compression methods go through `zipfile`. The
+    local header is checked eagerly, so errors surface before streaming starts.
+
+    Raises:
+        zipfile.BadZipFile: If the member's local header is invalid.
+        ValueError: If the member is encrypted.
+    """
+    offset = member["header_offset"]
+    header = b"".join(open_range(offset, offset + _LOCAL_HEADER.size))
+    if len(header) != _LOCAL_HEADER.size:
+        raise zipfile.BadZipFile("truncated local header")
+    signature, _v, _os, flags, method, _t, _d, _crc, _cs, _us, name_len, extra_len = _LOCAL_HEADER.unpack(header)
+    if signature != b"PK\x03\x04":
+        raise zipfile.BadZipFile("bad local header signature")
+    if flags & 0x1:
+        raise ValueError("member is encrypted")
+    if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        return _iter_with_zipfile(open_range, size, member, chunk_size)
+    start = offset + _LOCAL_HEADER.size + name_len + extra_len
+    return _iter_raw(open_range(start, start + member["compressed_size"]), method, member["crc32"], chunk_size)
+
+
+def _iter_raw(chunks: Iterator[bytes], method: int, crc32: int, chunk_size: int) -> Iterator[bytes]:
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS) if method == zipfile.ZIP_DEFLATED else None
+    crc = 0
+    for chunk in chunks:
+        while chunk:
+            if inflater is None:
+                out, chunk = chunk, b""
+            else:
+                # bound the output per step so a highly compressed member cannot blow up memory
+                out = inflater.decompress(chunk, chunk_size)
+                chunk = inflater.unconsumed_tail
+            if out:
+                crc = zlib.crc32(out, crc)
+                yield out
+    if inflater is not None:
+        out = inflater.flush()
+        if out:
+            crc = zlib.crc32(out, crc)
+            yield out
+    if crc != crc32:
+        raise zipfile.BadZipFile("CRC mismatch in archive member")
+
+
+def _iter_with_zipfile(open_range: RangeOpener, size: int, member: dict, chunk_size: int) -> Iterator[bytes]:
+    with zipfile.ZipFile(RangeReader(open_range, size)) as zf:
+        with zf.open(zf.infolist()[member["position"]]) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
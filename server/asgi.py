@@ -0,0 +1,200 @@
+import asyncio, contextvars, sys, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from .config import Config
+
+SPOOL_MAX_MEMORY = 1024 * 1024
+# routes whose handlers block while waiting for something to happen, not on I/O
+LONG_POLL_PATHS = ("/events",)
+_DONE = object()
+
+
+class WSGIBridge:
+    """Serve a WSGI app (the Flask app) over ASGI without a thread per connection.
+
+    A sync server gives every connection a thread (or worker) for its whole
+    life, so slow clients moving large archives pin them for minutes. Here
+    all network I/O happens on the event loop:
+
+    - request bodies are received asynchronously into a spooled temp file (in
+      memory up to `spool_max_memory`, then on disk) before the app is called,
+      so the app never waits on a slow uploader;
+    - response bodies are produced one chunk at a time on the thread pool and
+      sent asynchronously, so a thread is only busy while a chunk is read,
+      not while a slow downloader drains it.
+
+    Request handling, including its database work, runs on a pool of
+    `threads` threads; size it like the database connection pool, since a
+    handler holds a connection for about as long as it holds a thread.
+    Long-polls (`LONG_POLL_PATHS`) sit idle in their handler for up to a
+    minute, so they get a separate pool of `long_poll_threads` threads:
+    however many subscribers wait, the other routes keep all their threads.
+    Each request keeps one `contextvars` context across its steps.
+    """
+
+    def __init__(self, wsgi_app, threads: int, max_body: Optional[int] = None,
+                 spool_max_memory: int = SPOOL_MAX_MEMORY, long_poll_threads: int = 64):
+        self.wsgi_app = wsgi_app
+        self.max_body = max_body
+        self.spool_max_memory = spool_max_memory
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="qibo-asgi")
+        self.long_poll_pool = ThreadPoolExecutor(max_workers=long_poll_threads, thread_name_prefix="qibo-asgi-poll")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.pool.shutdown(wait=False)
+                self.long_poll_pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send) -> None:
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_max_memory)
+        try:
+            if not await self._receive_body(scope, receive, body):
+                await self._send_simple(send, 413, b'{"status":"error","error":"Request body too large"}')
+                return
+            await self._run(scope, receive, send, body)
+        finally:
+            body.close()
+
+    async def _receive_body(self, scope, receive, body) -> bool:
+        """Spool the request body; False if it exceeds `max_body`."""
+        declared = _header(scope, b"content-length")
+        if self.max_body is not None and declared is not None and declared.isdigit() and int(declared) > self.max_body:
+            return False
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return True  # the app sees a short body; nobody reads the answer
+            chunk = message.get("body", b"")
+            if chunk:
+                size += len(chunk)
+                if self.max_body is not None and size > self.max_body:
+                    return False
+                body.write(chunk)
+            if not message.get("more_body", False):
+                body.seek(0)
+                return True
+
+    async def _run(self, scope, receive, send, body) -> None:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        environ = _environ(scope, body)
+        pool = self.long_poll_pool if scope["path"] in LONG_POLL_PATHS else self.pool
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            started["status"], started["headers"] = status, headers
+            return lambda data: None  # the legacy write() callable is not supported
+
+        def step(fn, *args):
+            return loop.run_in_executor(pool, context.run, fn, *args)
+
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        result = await step(self.wsgi_app, environ, start_response)
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            chunks = iter(result)
+            while not disconnected.is_set():
+                chunk = await step(next, chunks, _DONE)
+                if not started.get("sent"):
+                    await send({
+                        "type": "http.response.start",
+                        "status": int(started["status"].split(" ", 1)[0]),
+                        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in started["headers"]],
+                    })
+                    started["sent"] = True
+                if chunk is _DONE:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            watcher.cancel()
+            if hasattr(result, "close"):
+                await step(result.close)
+
+    @staticmethod
+    async def _send_simple(send, status: int, body: bytes) -> None:
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _environ(scope, body) -> dict:
+    """WSGI environ for an ASGI HTTP scope whose body was spooled into `body`."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    body.seek(0, 2)
+    length = body.tell()
+    body.seek(0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": str(client[0]),
+        "REMOTE_PORT": str(client[1]),
+        # the body is complete, so chunked uploads get a length too
+        "CONTENT_LENGTH": str(length),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for key, value in scope["headers"]:
+        name = key.decode("latin-1").upper().replace("-", "_")
+        if name in ("CONTENT_LENGTH", "TRANSFER_ENCODING"):
+            continue
+        if name != "CONTENT_TYPE":
+            name = "HTTP_" + name
+        value = value.decode("latin-1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def create_asgi_app(cfg):
+    """The app of `server.app.create_app(cfg)` wrapped for ASGI servers such as uvicorn."""
+    from .app import create_app
+    threads = cfg.ASGI_THREADS or cfg.DB_POOL_SIZE + cfg.DB_MAX_OVERFLOW
+    return WSGIBridge(create_app(cfg), threads=threads, max_body=cfg.MAX_CONTENT_LENGTH,
+                      long_poll_threads=cfg.ASGI_LONG_POLL_THREADS)
+
+
+def create_asgi_app_from_env():
+    """uvicorn/gunicorn factory that loads config from env/files."""
+    return create_asgi_app(Config.load(cli_api_token=None))
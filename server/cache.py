@@ -0,0 +1,173 @@
+import json, sqlite3, threading, time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+DEFAULT_TTL = 5.0
+
+
+class MetadataCache(ABC):
+    """Cache for small, hot JSON responses (latest calibration, best runs).
+
+    Keys are ``"<namespace>:<rest>"`` strings; a write endpoint calls
+    `invalidate(namespace)` to drop every entry of that namespace. Each
+    namespace also carries a generation counter, bumped on invalidation, so a
+    value loaded from the database concurrently with a write is never stored
+    over the newer state. Entries additionally expire after `ttl` seconds,
+    which bounds staleness when other worker processes write and cannot reach
+    this process' cache.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def _put(self, key: str, value: Any, generation: int) -> None:
+        """Store `value` unless the key's namespace has moved past `generation`."""
+        ...
+
+    @abstractmethod
+    def _generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    def invalidate(self, namespace: str) -> None:
+        ...
+
+    def get_or_load(self, key: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Return the cached value for `key`, calling `loader` on a miss.
+
+        `loader` must return a JSON-serialisable value; None results (e.g.
+        "nothing found") are returned but not cached.
+        """
+        value = self._get(key)
+        if value is not None:
+            return value
+        generation = self._generation(key.split(":", 1)[0])
+        value = loader()
+        if value is not None:
+            self._put(key, value, generation)
+        return value
+
+
+class NullCache(MetadataCache):
+    """Disables caching: every lookup goes to the loader."""
+
+    def get_or_load(self, key, loader):
+        return loader()
+
+    def _get(self, key):
+        return None
+
+    def _put(self, key, value, generation):
+        pass
+
+    def _generation(self, namespace):
+        return 0
+
+    def invalidate(self, namespace):
+        pass
+
+
+class MemoryCache(MetadataCache):
+    """Per-process cache; invalidations only reach the process doing the write."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generations = {}
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _put(self, key, value, generation):
+        with self._lock:
+            if self._generations.get(key.split(":", 1)[0], 0) == generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def _generation(self, namespace):
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [k for k in self._entries if k.startswith(namespace + ":")]:
+                del self._entries[key]
+
+
+class SqliteCache(MetadataCache):
+    """Cache shared by all worker processes on one host, kept in a small SQLite file.
+
+    Reads are a primary-key lookup on a local file in WAL mode, which is far
+    cheaper than the query against the main database, and an invalidation by
+    any worker is seen by all of them immediately.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS generations (namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _generation(self, namespace):
+        row = self._conn().execute(
+            "SELECT generation FROM generations WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _put(self, key, value, generation):
+        namespace = key.split(":", 1)[0]
+        # the generation check and the write happen in one statement, so they are atomic
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) "
+                "SELECT ?, ?, ? WHERE coalesce((SELECT generation FROM generations WHERE namespace = ?), 0) = ?",
+                (key, json.dumps(value), time.time() + self.ttl, namespace, generation),
+            )
+
+    def invalidate(self, namespace):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO generations (namespace, generation) VALUES (?, 1) "
+                "ON CONFLICT(namespace) DO UPDATE SET generation = generation + 1",
+                (namespace,),
+            )
+            conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(namespace) + 1, namespace + ":"))
+
+
+def make_metadata_cache(cfg) -> MetadataCache:
+    """Build the cache selected by `cfg.CACHE_BACKEND` ("memory", "sqlite" or "none")."""
+    backend = (cfg.CACHE_BACKEND or "memory").lower()
+    if backend == "memory":
+        return MemoryCache(cfg.CACHE_TTL)
+    if backend == "sqlite":
+        return SqliteCache(cfg.CACHE_PATH, cfg.CACHE_TTL)
+    if backend == "none":
+        return NullCache(cfg.CACHE_TTL)
+    raise ValueError(f"Unknown cache backend: {cfg.CACHE_BACKEND}")
@@ -0,0 +1,53 @@
+import gzip
+from typing import List, Optional
+
+# fast levels: listings are compressed per request, so CPU matters more than the last few percent
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+SUPPORTED_ENCODINGS = ("zstd", "gzip")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def available_encodings(preferred: str) -> List[str]:
+    """Encodings from the comma-separated `preferred` list that this server can produce.
+
+    ``zstd`` needs the optional `zstandard` package and is dropped without it;
+    ``none`` (or an empty list) disables response compression.
+
+    Raises:
+        ValueError: On an unknown encoding.
+    """
+    names = [e.strip().lower() for e in (preferred or "").split(",") if e.strip()]
+    if names == ["none"]:
+        return []
+    unknown = [e for e in names if e not in SUPPORTED_ENCODINGS]
+    if unknown:
+        raise ValueError(f"Unsupported response encoding(s): {', '.join(unknown)}")
+    return [e for e in names if e != "zstd" or _zstandard() is not None]
+
+
+def choose_encoding(accept_encodings, available: List[str]) -> Optional[str]:
+    """The first of `available` (server preference order) the client accepts, if any.
+
+    Args:
+        accept_encodings: The request's parsed ``Accept-Encoding`` header
+            (`werkzeug.datastructures.Accept`).
+    """
+    for encoding in available:
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return _zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    # mtime=0 keeps the output, and so any cached copy, identical for identical bodies
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
@@ -37,6 +37,35 @@ class Config:
     API_TOKEN: Optional[str] = None
     DEBUG: bool = False
     MAX_CONTENT_LENGTH: int = int(os.getenv("QIBO_MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+    BLOB_BACKEND: str = "local"
+    BLOB_ROOT: str = "qibo_blobs"
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None
+    CACHE_BACKEND: str = "memory"
+    CACHE_PATH: str = "qibo_cache.sqlite"
+    CACHE_TTL: float = 5.0
+    EVENTS_RECHECK_INTERVAL: float = 1.0
+    UPLOAD_DIR: str = "qibo_uploads"
+    UPLOAD_SESSION_TTL: float = 24 * 3600
+    DB_PROFILE: str = "tuned"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = 64 * 1024  # KiB
+    SERVER_TIMING: bool = False
+    METRICS_PUBLIC: bool = False  # serve /metrics without the API token
+    RESPONSE_ENCODINGS: str = "zstd,gzip"  # server preference; "none" disables
+    COMPRESS_MIN_SIZE: int = 1024
+    ASGI_THREADS: int = 0  # 0: DB_POOL_SIZE + DB_MAX_OVERFLOW
+    ASGI_LONG_POLL_THREADS: int = 64  # /events waiters, kept apart from ASGI_THREADS
+    COLD_CACHE_DIR: str = "qibo_cold_cache"
+    COLD_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
 
     @classmethod
     def load(cls, cli_api_token: Optional[str] = None):
@@ -51,6 +80,37 @@ class Config:
         C.API_TOKEN = api_token
         C.DEBUG = debug
         C.MAX_CONTENT_LENGTH = cls.MAX_CONTENT_LENGTH
+        C.BLOB_BACKEND = os.getenv("QIBO_BLOB_BACKEND") or cfg.get("blob_backend") or cls.BLOB_BACKEND
+        C.BLOB_ROOT = os.getenv("QIBO_BLOB_ROOT") or cfg.get("blob_root") or cls.BLOB_ROOT
+        C.S3_BUCKET = os.getenv("QIBO_S3_BUCKET") or cfg.get("s3_bucket") or cls.S3_BUCKET
+        C.S3_PREFIX = os.getenv("QIBO_S3_PREFIX") or cfg.get("s3_prefix") or cls.S3_PREFIX
+        C.S3_ENDPOINT_URL = os.getenv("QIBO_S3_ENDPOINT_URL") or cfg.get("s3_endpoint_url") or cls.S3_ENDPOINT_URL
+        C.CACHE_BACKEND = os.getenv("QIBO_CACHE_BACKEND") or cfg.get("cache_backend") or cls.CACHE_BACKEND
+        C.CACHE_PATH = os.getenv("QIBO_CACHE_PATH") or cfg.get("cache_path") or cls.CACHE_PATH
+        C.CACHE_TTL = float(os.getenv("QIBO_CACHE_TTL") or cfg.get("cache_ttl") or cls.CACHE_TTL)
+        C.EVENTS_RECHECK_INTERVAL = float(os.getenv("QIBO_EVENTS_RECHECK_INTERVAL") or cfg.get("events_recheck_interval") or cls.EVENTS_RECHECK_INTERVAL)
+        C.UPLOAD_DIR = os.getenv("QIBO_UPLOAD_DIR") or cfg.get("upload_dir") or cls.UPLOAD_DIR
+        C.UPLOAD_SESSION_TTL = float(os.getenv("QIBO_UPLOAD_SESSION_TTL") or cfg.get("upload_session_ttl") or cls.UPLOAD_SESSION_TTL)
+        C.DB_PROFILE = os.getenv("QIBO_DB_PROFILE") or cfg.get("db_profile") or cls.DB_PROFILE
+        C.DB_POOL_SIZE = int(os.getenv("QIBO_DB_POOL_SIZE") or cfg.get("db_pool_size") or cls.DB_POOL_SIZE)
+        C.DB_MAX_OVERFLOW = int(os.getenv("QIBO_DB_MAX_OVERFLOW") or cfg.get("db_max_overflow") or cls.DB_MAX_OVERFLOW)
+        C.DB_POOL_TIMEOUT = float(os.getenv("QIBO_DB_POOL_TIMEOUT") or cfg.get("db_pool_timeout") or cls.DB_POOL_TIMEOUT)
+        C.DB_POOL_RECYCLE = int(os.getenv("QIBO_DB_POOL_RECYCLE") or cfg.get("db_pool_recycle") or cls.DB_POOL_RECYCLE)
+        C.SQLITE_JOURNAL_MODE = os.getenv("QIBO_SQLITE_JOURNAL_MODE") or cfg.get("sqlite_journal_mode") or cls.SQLITE_JOURNAL_MODE
+        C.SQLITE_SYNCHRONOUS = os.getenv("QIBO_SQLITE_SYNCHRONOUS") or cfg.get("sqlite_synchronous") or cls.SQLITE_SYNCHRONOUS
+        C.SQLITE_BUSY_TIMEOUT = int(os.getenv("QIBO_SQLITE_BUSY_TIMEOUT") or cfg.get("sqlite_busy_timeout") or cls.SQLITE_BUSY_TIMEOUT)
+        C.SQLITE_MMAP_SIZE = int(os.getenv("QIBO_SQLITE_MMAP_SIZE") or cfg.get("sqlite_mmap_size") or cls.SQLITE_MMAP_SIZE)
+        C.SQLITE_CACHE_SIZE = int(os.getenv("QIBO_SQLITE_CACHE_SIZE") or cfg.get("sqlite_cache_size") or cls.SQLITE_CACHE_SIZE)
+        timing_env = os.getenv("QIBO_SERVER_TIMING", "0")
+        C.SERVER_TIMING = (timing_env in {"1","true","True","yes","on"}) or bool(cfg.get("server_timing", cls.SERVER_TIMING))
+        metrics_env = os.getenv("QIBO_METRICS_PUBLIC", "0")
+        C.METRICS_PUBLIC = (metrics_env in {"1","true","True","yes","on"}) or bool(cfg.get("metrics_public", cls.METRICS_PUBLIC))
+        C.RESPONSE_ENCODINGS = os.getenv("QIBO_RESPONSE_ENCODINGS") or cfg.get("response_encodings") or cls.RESPONSE_ENCODINGS
+        C.COMPRESS_MIN_SIZE = int(os.getenv("QIBO_COMPRESS_MIN_SIZE") or cfg.get("compress_min_size") or cls.COMPRESS_MIN_SIZE)
+        C.ASGI_THREADS = int(os.getenv("QIBO_ASGI_THREADS") or cfg.get("asgi_threads") or cls.ASGI_THREADS)
+        C.ASGI_LONG_POLL_THREADS = int(os.getenv("QIBO_ASGI_LONG_POLL_THREADS") or cfg.get("asgi_long_poll_threads") or cls.ASGI_LONG_POLL_THREADS)
+        C.COLD_CACHE_DIR = os.getenv("QIBO_COLD_CACHE_DIR") or cfg.get("cold_cache_dir") or cls.COLD_CACHE_DIR
+        C.COLD_CACHE_MAX_BYTES = int(os.getenv("QIBO_COLD_CACHE_MAX_BYTES") or cfg.get("cold_cache_max_bytes") or cls.COLD_CACHE_MAX_BYTES)
         return C
 
     @staticmethod
@@ -1,8 +1,114 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select, func
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from .config import Config
 
-def make_engine(db_uri: str, echo: bool):
-    return create_engine(db_uri, echo=echo, future=True)
+BLOB_CHUNK_SIZE = 1024 * 1024
+_SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _sqlite_pragmas(cfg) -> list:
+    journal_mode = str(cfg.SQLITE_JOURNAL_MODE).upper()
+    synchronous = str(cfg.SQLITE_SYNCHRONOUS).upper()
+    if journal_mode not in _SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unknown SQLite journal mode: {cfg.SQLITE_JOURNAL_MODE}")
+    if synchronous not in _SQLITE_SYNCHRONOUS:
+        raise ValueError(f"Unknown SQLite synchronous setting: {cfg.SQLITE_SYNCHRONOUS}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(cfg.SQLITE_BUSY_TIMEOUT)}",
+        f"PRAGMA mmap_size={int(cfg.SQLITE_MMAP_SIZE)}",
+        # negative: size in KiB rather than in pages
+        f"PRAGMA cache_size={-int(cfg.SQLITE_CACHE_SIZE)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def make_engine(db_uri: str, echo: bool, cfg=None):
+    """Create the engine, applying the performance profile selected by `cfg.DB_PROFILE`.
+
+    With the default ``"tuned"`` profile, file-backed SQLite databases run in
+    WAL mode (readers no longer block on a writer streaming a large blob and
+    vice versa), with ``synchronous=NORMAL``, a busy timeout instead of
+    immediate "database is locked" errors, memory-mapped reads and a larger
+    page cache, all set on every new connection. Other backends (e.g.
+    PostgreSQL via psycopg) get a sized connection pool with pre-ping and
+    recycling, so connections dropped by the server or a proxy are replaced
+    transparently. ``"plain"`` keeps SQLAlchemy's defaults.
+
+    Args:
+        db_uri: SQLAlchemy database URL.
+        echo: Log all SQL statements.
+        cfg: Loaded config; defaults to the `Config` class defaults.
+
+    Raises:
+        ValueError: On an unknown profile or SQLite pragma value.
+    """
+    cfg = cfg or Config
+    profile = (cfg.DB_PROFILE or "tuned").lower()
+    if profile == "plain":
+        return create_engine(db_uri, echo=echo, future=True)
+    if profile != "tuned":
+        raise ValueError(f"Unknown database profile: {cfg.DB_PROFILE}")
+
+    url = make_url(db_uri)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            db_uri,
+            echo=echo,
+            future=True,
+            pool_size=cfg.DB_POOL_SIZE,
+            max_overflow=cfg.DB_MAX_OVERFLOW,
+            pool_timeout=cfg.DB_POOL_TIMEOUT,
+            pool_recycle=cfg.DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    if url.database in (None, "", ":memory:"):
+        # in-memory databases live in a single connection; pooling and WAL do not apply
+        return create_engine(db_uri, echo=echo, future=True)
+    pragmas = _sqlite_pragmas(cfg)
+    engine = create_engine(
+        db_uri,
+        echo=echo,
+        future=True,
+        pool_size=cfg.DB_POOL_SIZE,
+        max_overflow=cfg.DB_MAX_OVERFLOW,
+        pool_timeout=cfg.DB_POOL_TIMEOUT,
+        connect_args={"timeout": cfg.SQLITE_BUSY_TIMEOUT / 1000.0},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
 
 def make_session_factory(engine):
     return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+def iter_blob_chunks(SessionLocal, column, pk_column, row_id: int, size: int, chunk_size: int = BLOB_CHUNK_SIZE,
+                     start: int = 0):
+    """Yield a LargeBinary column value in `chunk_size` slices via SQL substr().
+
+    Only one slice is held in memory at a time, so arbitrarily large archives
+    can be streamed without loading the whole blob into the worker. Yields
+    bytes ``[start, size)``; pass a smaller `size` to read a byte range.
+    """
+    with SessionLocal() as ses:
+        offset = start
+        while offset < size:
+            chunk = ses.execute(
+                select(func.substr(column, offset + 1, min(chunk_size, size - offset))).where(pk_column == row_id)
+            ).scalar_one()
+            if not chunk:
+                break
+            yield bytes(chunk)
+            offset += len(chunk)
@@ -0,0 +1,58 @@
+import threading
+from typing import Optional, Tuple
+
+EVENT_TYPES = ("bestrun", "calibration")
+
+
+class EventHub:
+    """Wakes up long-polling `/events` requests when a watched table changes.
+
+    The write endpoints call `notify()` after committing. Waiters only learn
+    *that* something changed and then read the new rows from the database,
+    so the hub carries no state that could diverge between worker processes;
+    writes handled by another process are picked up by the waiters' periodic
+    re-check instead.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+
+    @property
+    def seq(self) -> int:
+        """Counter of notifications so far; pass it to `wait`."""
+        with self._cond:
+            return self._seq
+
+    def notify(self) -> None:
+        with self._cond:
+            self._seq += 1
+            self._cond.notify_all()
+
+    def wait(self, seq: int, timeout: float) -> bool:
+        """Block until a notification newer than `seq` arrives or `timeout` passes.
+
+        Returns:
+            bool: True if notified, False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._seq != seq, timeout)
+
+
+def encode_event_cursor(bestrun_id: int, calibration_id: int) -> str:
+    return f"{bestrun_id}.{calibration_id}"
+
+
+def decode_event_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse an events cursor; None means "start at the current head".
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        bestrun_id, calibration_id = (int(part) for part in cursor.split("."))
+    except ValueError:
+        raise ValueError("invalid cursor") from None
+    return bestrun_id, calibration_id
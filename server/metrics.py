@@ -0,0 +1,278 @@
+import contextvars, threading, time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import event
+
+# seconds; spans cache hits (sub-ms) to large archive transfers
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+_DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {value}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # per-bucket (non-cumulative) counts, then +Inf, count and sum
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, counts in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {counts[-2]}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {counts[-1]}"
+
+
+class RequestTimings:
+    """Time spent in the database and in named phases while handling one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.phases: Dict[str, float] = {}
+
+    def server_timing(self) -> str:
+        """Value of a ``Server-Timing`` header, durations in milliseconds."""
+        parts = [f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"']
+        parts += [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        parts.append(f"app;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("qibo_request_timings", default=None)
+
+
+class Metrics:
+    """Per-process metrics of one app, rendered in the Prometheus text format.
+
+    Each worker process keeps its own values; with several workers, every
+    scrape of `/metrics` reports the worker that happened to serve it.
+    """
+
+    def __init__(self):
+        self.requests = Counter("qibo_http_requests_total", "HTTP requests by route, method and status.",
+                                ("route", "method", "status"))
+        self.duration = Histogram("qibo_http_request_duration_seconds",
+                                  "Time from receiving a request until its response is fully sent.", ("route", "method"))
+        self.bytes_in = Counter("qibo_http_request_bytes_total", "Request body bytes read.", ("route",))
+        self.bytes_out = Counter("qibo_http_response_bytes_total", "Response body bytes sent.", ("route",))
+        self.in_flight = Gauge("qibo_http_requests_in_flight", "Requests being handled or streamed.")
+        self.uploads_in_flight = Gauge("qibo_uploads_in_flight", "Archive uploads being received.", ("route",))
+        self.db = Histogram("qibo_db_query_duration_seconds", "Database statement execution time.", ("operation",))
+        self.phase_duration = Histogram("qibo_phase_duration_seconds",
+                                        "Time spent in named request phases (parse, store, b64, ...).", ("phase",))
+        self._all = [self.requests, self.duration, self.bytes_in, self.bytes_out, self.in_flight,
+                     self.uploads_in_flight, self.db, self.phase_duration]
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._all for line in metric.render()) + "\n"
+
+    def start_request(self) -> RequestTimings:
+        timings = RequestTimings()
+        _current.set(timings)
+        return timings
+
+    @staticmethod
+    def current() -> Optional[RequestTimings]:
+        return _current.get()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as phase `name` of the current request (and in `qibo_phase_duration_seconds`)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phase_duration.observe(elapsed, phase=name)
+            timings = _current.get()
+            if timings is not None:
+                timings.phases[name] = timings.phases.get(name, 0.0) + elapsed
+
+    def instrument_engine(self, engine) -> None:
+        """Time every statement executed through `engine`."""
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("qibo_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["qibo_query_start"].pop()
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+            self.db.observe(elapsed, operation=operation if operation in _DB_OPERATIONS else "OTHER")
+            timings = _current.get()
+            if timings is not None:
+                timings.db_seconds += elapsed
+                timings.db_queries += 1
+
+        @event.listens_for(engine, "handle_error")
+        def _error(context):
+            # a failed statement gets no after_cursor_execute; drop its start time
+            if context.connection is not None and context.connection.info.get("qibo_query_start"):
+                context.connection.info["qibo_query_start"].pop()
+
+
+class _CountingInput:
+    """wsgi.input wrapper counting the body bytes the app reads."""
+
+    def __init__(self, stream):
+        self._stream, self.count = stream, 0
+
+    def read(self, *args):
+        data = self._stream.read(*args)
+        self.count += len(data)
+        return data
+
+    def readline(self, *args):
+        data = self._stream.readline(*args)
+        self.count += len(data)
+        return data
+
+    def readlines(self, *args):
+        lines = self._stream.readlines(*args)
+        self.count += sum(len(line) for line in lines)
+        return lines
+
+    def __iter__(self):
+        for line in self._stream:
+            self.count += len(line)
+            yield line
+
+
+class MetricsMiddleware:
+    """WSGI middleware recording request metrics once each response is fully sent.
+
+    Counting at the WSGI layer measures what actually crosses the wire,
+    including chunked upload bodies and streamed archive downloads. The Flask
+    app labels the request by setting ``environ["qibo.route"]`` (the URL rule,
+    so label cardinality stays bounded) and ``environ["qibo.upload"]``.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app, self.metrics = app, metrics
+
+    def __call__(self, environ, start_response):
+        m = self.metrics
+        start = time.perf_counter()
+        counting = _CountingInput(environ["wsgi.input"])
+        environ["wsgi.input"] = counting
+        status = ["500"]
+
+        def _start_response(status_line, headers, exc_info=None):
+            status[0] = status_line.split(" ", 1)[0]
+            return start_response(status_line, headers, exc_info)
+
+        m.in_flight.inc()
+        try:
+            body = self.app(environ, _start_response)
+        except BaseException:
+            m.in_flight.dec()
+            raise
+        return _ClosingIterator(body, lambda sent: self._finish(environ, start, counting, status[0], sent))
+
+    def _finish(self, environ, start: float, counting: _CountingInput, status: str, sent: int) -> None:
+        m = self.metrics
+        route = environ.get("qibo.route", "unmatched")
+        method = environ.get("REQUEST_METHOD", "")
+        m.in_flight.dec()
+        if environ.get("qibo.upload"):
+            m.uploads_in_flight.dec(route=route)
+        m.requests.inc(route=route, method=method, status=status)
+        m.duration.observe(time.perf_counter() - start, route=route, method=method)
+        m.bytes_in.inc(counting.count, route=route)
+        m.bytes_out.inc(sent, route=route)
+
+
+class _ClosingIterator:
+    def __init__(self, body, on_close):
+        self._body, self._on_close = body, on_close
+        self._sent = 0
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self._body:
+            self._sent += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            self._on_close(self._sent)
@@ -0,0 +1,491 @@
+import argparse, hashlib, os, sys, tempfile, zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import inspect, select, text, func, or_, desc, case, delete, union_all
+from .config import Config
+from .db import make_engine, make_session_factory, iter_blob_chunks
+from .models import Base, ArchiveMember, Calibration, ColdBlob, Result, BestRun, SchemaVersion
+from .storage import blob_key, iter_file, make_blob_store
+from .archives import index_archive
+from .tiering import (DEFAULT_ZSTD_LEVEL, cold_key, dict_key, dictionary_samples, restore_cold_blob,
+                      train_dictionary, write_cold_blob)
+
+# archives sampled to train the cold tier's zstd dictionary, and the sample budget
+DICT_SAMPLE_ARCHIVES = 100
+DICT_SAMPLE_BYTES = 16 * 1024 * 1024
+
+
+def _create_model_indexes(conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(bind=conn, checkfirst=True)
+
+
+def _m1_query_indexes(conn) -> None:
+    """Composite indexes for the hot query shapes; drop the superseded single-column ones."""
+    _create_model_indexes(conn)
+    for name in ("ix_calibrations_hash_id", "ix_results_hash_id", "ix_results_name", "ix_results_run_id"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+# Ordered, idempotent schema migrations: (version, description, fn(conn)).
+# Fresh databases run them too, so each step must tolerate an up-to-date schema.
+MIGRATIONS = [
+    (1, "composite indexes for download/latest/list queries", _m1_query_indexes),
+]
+
+
+def schema_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(SchemaVersion.version), 0))).scalar_one()
+
+
+def _add_missing_columns(engine) -> None:
+    """Add model columns that are missing from existing tables.
+
+    `Base.metadata.create_all` only creates missing tables, so databases created
+    by an older release never gain new columns. New columns are always nullable
+    (or have a default), which lets them be added with a plain ALTER TABLE.
+    """
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}"))
+
+
+def upgrade_schema(engine) -> list:
+    """Bring an existing database up to the current schema.
+
+    Adds missing columns, then applies pending entries of `MIGRATIONS` in
+    order, recording each applied version in the `schema_version` table.
+
+    Returns:
+        list: Versions applied by this call.
+    """
+    _add_missing_columns(engine)
+    current = schema_version(engine)
+    applied = []
+    for version, _description, fn in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(SchemaVersion.__table__.insert().values(version=version))
+        applied.append(version)
+    return applied
+
+
+def hot_queries() -> dict:
+    """The latency-critical statement shapes issued by the API endpoints.
+
+    Maps a name to ``(statement, pk_ordered)``, where `pk_ordered` marks queries
+    that are expected to walk the primary key rather than a secondary index.
+    """
+    return {
+        "calibrations/download": (select(Calibration.id).where(Calibration.hash_id == "h")
+            .order_by(desc(Calibration.created_at), desc(Calibration.id)).limit(1), False),
+        "calibrations/latest": (select(Calibration.id)
+            .order_by(desc(Calibration.created_at), desc(Calibration.id)).limit(1), False),
+        "calibrations/list": (select(Calibration.id)
+            .order_by(desc(Calibration.created_at), desc(Calibration.id)).limit(101), False),
+        "results/download": (select(Result.id).where(Result.hash_id == "h", Result.name == "n")
+            .order_by(desc(Result.created_at), desc(Result.id)).limit(1), False),
+        "results/download?runID": (select(Result.id).where(Result.hash_id == "h", Result.name == "n", Result.run_id == "r")
+            .order_by(desc(Result.created_at), desc(Result.id)).limit(1), False),
+        "results/list": (select(Result.id).where(Result.hash_id == "h")
+            .order_by(desc(Result.created_at), desc(Result.id)).limit(101), False),
+        "bestruns/get": (select(BestRun.id).order_by(desc(BestRun.id)).limit(1), True),
+    }
+
+
+def explain_hot_queries(engine) -> list:
+    """EXPLAIN every hot query and check that it is served by an index without a sort.
+
+    Supports SQLite (EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN, with sequential
+    scans disabled so small test tables still show the index-based plan).
+
+    Returns:
+        list of (name, plan_text, ok) tuples.
+    """
+    dialect = engine.dialect.name
+    report = []
+    with engine.connect() as conn:
+        if dialect == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        elif dialect == "sqlite":
+            # EXPLAIN never reads the schema cookie; a real read refreshes a pooled
+            # connection's cached schema after a migration on another connection.
+            conn.execute(text("SELECT count(*) FROM sqlite_master")).scalar_one()
+        for name, (stmt, pk_ordered) in hot_queries().items():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            if dialect == "sqlite":
+                plan = "\n".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+                # a bare "SCAN <table>" is fine when it walks the rowid (primary key) order
+                ok = "TEMP B-TREE" not in plan and ("USING" in plan or pk_ordered)
+            else:
+                plan = "\n".join(row[0] for row in conn.execute(text("EXPLAIN " + sql)))
+                ok = "Sort" not in plan and ("Index" in plan or pk_ordered)
+            report.append((name, plan, ok))
+    return report
+
+
+def migrate_blobs(engine, store, batch_size: int = 50) -> int:
+    """Move inline `data` archives into the blob store.
+
+    Archives are streamed out of the database in chunks, one row at a time,
+    and committed in batches; each migrated row keeps only its hash, size and
+    storage key.
+
+    Returns:
+        int: Number of migrated rows.
+    """
+    SessionLocal = make_session_factory(engine)
+    moved = 0
+    for model in (Calibration, Result):
+        with SessionLocal() as ses:
+            ids = ses.execute(select(model.id).where(model.storage_key.is_(None))).scalars().all()
+        for start in range(0, len(ids), batch_size):
+            with SessionLocal() as ses:
+                for row_id in ids[start:start + batch_size]:
+                    size = ses.execute(select(func.length(model.data)).where(model.id == row_id)).scalar_one()
+                    blob = store.put_chunks(iter_blob_chunks(SessionLocal, model.data, model.id, row_id, size or 0))
+                    ses.execute(
+                        model.__table__.update()
+                        .where(model.id == row_id)
+                        .values(sha256=blob.sha256, size_bytes=blob.size, storage_key=blob.key, data=b"")
+                    )
+                    moved += 1
+                ses.commit()
+    return moved
+
+
+def backfill_metadata(engine) -> int:
+    """Populate `size_bytes` and `sha256` for rows that still hold inline archives.
+
+    Each archive is hashed by streaming it out of the database in chunks, so
+    memory use stays bounded regardless of archive size.
+
+    Returns:
+        int: Number of updated rows.
+    """
+    SessionLocal = make_session_factory(engine)
+    updated = 0
+    for model in (Calibration, Result):
+        with SessionLocal() as ses:
+            rows = ses.execute(
+                select(model.id, func.length(model.data).label("size"))
+                .where(model.storage_key.is_(None), or_(model.size_bytes.is_(None), model.sha256.is_(None)))
+            ).all()
+        for row_id, size in rows:
+            digest = hashlib.sha256()
+            for chunk in iter_blob_chunks(SessionLocal, model.data, model.id, row_id, size or 0):
+                digest.update(chunk)
+            with SessionLocal() as ses:
+                ses.execute(
+                    model.__table__.update()
+                    .where(model.id == row_id)
+                    .values(size_bytes=size or 0, sha256=digest.hexdigest())
+                )
+                ses.commit()
+            updated += 1
+    return updated
+
+
+def index_archives(engine, store) -> tuple:
+    """Build the member index for stored archives that do not have one yet.
+
+    Rows without a `sha256` (inline archives not yet backfilled) are skipped;
+    run `backfill` first. Archives that are not ZIP files are counted and left
+    unindexed.
+
+    Returns:
+        tuple: (indexed, not_zip) numbers of distinct archives.
+    """
+    SessionLocal = make_session_factory(engine)
+    indexed = not_zip = 0
+    seen = set()
+    for model in (Calibration, Result):
+        with SessionLocal() as ses:
+            rows = ses.execute(
+                select(model.id, model.sha256, model.storage_key,
+                       func.coalesce(model.size_bytes, func.length(model.data)).label("size"))
+                .where(model.sha256.is_not(None), model.sha256.not_in(select(ArchiveMember.sha256)))
+            ).all()
+        for row_id, sha256, storage_key, size in rows:
+            if sha256 in seen:
+                continue
+            seen.add(sha256)
+
+            def open_range(start, end, row_id=row_id, storage_key=storage_key, model=model):
+                if storage_key:
+                    return store.iter_range(storage_key, start, end)
+                return iter_blob_chunks(SessionLocal, model.data, model.id, row_id, end, start=start)
+
+            try:
+                index_archive(SessionLocal, sha256, open_range, size or 0)
+                indexed += 1
+            except zipfile.BadZipFile:
+                not_zip += 1
+    return indexed, not_zip
+
+
+def _stored_archives():
+    """(sha256, created_at, hash_id, size_bytes) of every row whose archive is in the blob store."""
+    return union_all(*(
+        select(model.sha256, model.created_at, model.hash_id, model.size_bytes)
+        .where(model.sha256.is_not(None), model.storage_key.is_not(None))
+        for model in (Calibration, Result)
+    )).subquery()
+
+
+def _cold_candidates(cutoff: datetime, hash_prefix: Optional[str], limit: Optional[int]):
+    """Archives that only rows older than `cutoff` reference, oldest first, with their size.
+
+    Calibrations that have been a best run are kept hot, and so is anything
+    already in the cold tier. With `hash_prefix`, only archives referenced by
+    at least one row of a matching hashID qualify.
+    """
+    rows = _stored_archives()
+    newest = func.max(rows.c.created_at)
+    best_run_archives = select(Calibration.sha256).where(
+        Calibration.sha256.is_not(None), Calibration.hash_id.in_(select(BestRun.calibration_hash_id))
+    )
+    stmt = (
+        select(rows.c.sha256, func.max(rows.c.size_bytes))
+        .where(rows.c.sha256.not_in(select(ColdBlob.sha256)), rows.c.sha256.not_in(best_run_archives))
+        .group_by(rows.c.sha256)
+        .having(newest < cutoff)
+        .order_by(newest)
+    )
+    if hash_prefix:
+        matches = case((rows.c.hash_id.startswith(hash_prefix, autoescape=True), 1), else_=0)
+        stmt = stmt.having(func.max(matches) == 1)
+    return stmt.limit(limit) if limit else stmt
+
+
+def _spool_blob(hot, key: str, f) -> int:
+    for chunk in hot.iter_chunks(key):
+        f.write(chunk)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
+def _train_cold_dictionary(hot, shas: list) -> Optional[tuple]:
+    """Train a zstd dictionary on member contents of some cold archives and store it."""
+    samples, budget = [], DICT_SAMPLE_BYTES
+    for sha256 in shas[:DICT_SAMPLE_ARCHIVES]:
+        with tempfile.TemporaryFile() as f:
+            try:
+                _spool_blob(hot, blob_key(sha256), f)
+            except FileNotFoundError:
+                continue
+            for sample in dictionary_samples(f):
+                samples.append(sample)
+                budget -= len(sample)
+        if budget <= 0:
+            break
+    data = train_dictionary(samples)
+    if data is None:
+        return None
+    sha256 = hashlib.sha256(data).hexdigest()
+    hot.put_chunks_at(dict_key(sha256), [data])
+    return sha256, data
+
+
+def compact_archives(
+    engine,
+    store,
+    older_than_days: float = 90,
+    hash_prefix: Optional[str] = None,
+    level: int = DEFAULT_ZSTD_LEVEL,
+    use_dictionary: bool = True,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Move archives no recent row references into the zstd cold tier.
+
+    Each candidate is rewritten as a cold blob (see `server.tiering`), which
+    is rebuilt and checked against the archive's SHA-256 before the hot copy
+    is deleted; archives that would not shrink stay hot. A zstd dictionary is
+    trained per run on the candidates' files. Cold archives that were uploaded
+    again since (so have a hot copy and a recent row) leave the cold tier.
+    `store` must be the `TieredBlobStore` from `make_blob_store`.
+
+    Returns:
+        dict: Counts and byte totals of the run.
+    """
+    SessionLocal = make_session_factory(engine)
+    hot = store.hot
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=older_than_days)
+    with SessionLocal() as ses:
+        candidates = ses.execute(_cold_candidates(cutoff, hash_prefix, limit)).all()
+    stats = {"candidates": len(candidates), "compacted": 0, "kept_hot": 0, "original_bytes": 0,
+             "stored_bytes": 0, "recompressed_members": 0, "copied_members": 0, "reheated": 0}
+    if dry_run:
+        stats["original_bytes"] = sum(size or 0 for _sha, size in candidates)
+        return stats
+
+    dictionary = _train_cold_dictionary(hot, [sha for sha, _size in candidates]) if use_dictionary and candidates else None
+    load_dictionary = lambda sha: dictionary[1] if dictionary and sha == dictionary[0] else store.load_dictionary(sha)
+    for sha256, _size in candidates:
+        key = blob_key(sha256)
+        with tempfile.TemporaryFile() as src, tempfile.TemporaryFile() as cold:
+            try:
+                size = _spool_blob(hot, key, src)
+            except FileNotFoundError:
+                continue
+            members = write_cold_blob(src, size, cold, level, dictionary)
+            stored = cold.tell()
+            if stored >= size:
+                stats["kept_hot"] += 1
+                continue
+            cold.seek(0)
+            with open(os.devnull, "wb") as sink:
+                rebuilt, rebuilt_size = restore_cold_blob(iter_file(cold), sink, load_dictionary)
+            if rebuilt != sha256 or rebuilt_size != size:
+                raise RuntimeError(f"cold blob of {sha256} does not rebuild the archive; nothing was deleted")
+            cold.seek(0)
+            hot.put_chunks_at(cold_key(key), iter_file(cold))
+        with SessionLocal() as ses:
+            ses.merge(ColdBlob(sha256=sha256, original_size=size, stored_size=stored,
+                               dictionary=dictionary[0] if dictionary else None))
+            ses.commit()
+        hot.delete(key)
+        stats["compacted"] += 1
+        stats["original_bytes"] += size
+        stats["stored_bytes"] += stored
+        stats["recompressed_members"] += members["recompressed"]
+        stats["copied_members"] += members["copied"]
+
+    rows = _stored_archives()
+    with SessionLocal() as ses:
+        recent = ses.execute(
+            select(ColdBlob.sha256).where(ColdBlob.sha256.in_(select(rows.c.sha256).where(rows.c.created_at >= cutoff)))
+        ).scalars().all()
+    for sha256 in recent:
+        if hot.size(blob_key(sha256)) is not None:
+            hot.delete(cold_key(blob_key(sha256)))
+            with SessionLocal() as ses:
+                ses.execute(delete(ColdBlob).where(ColdBlob.sha256 == sha256))
+                ses.commit()
+            stats["reheated"] += 1
+    return stats
+
+
+def tier_report(engine) -> dict:
+    """Archive counts and sizes per storage tier, and the space the cold tier saves."""
+    SessionLocal = make_session_factory(engine)
+    rows = _stored_archives()
+    per_archive = (
+        select(rows.c.sha256, func.max(rows.c.size_bytes).label("size"))
+        .where(rows.c.sha256.not_in(select(ColdBlob.sha256)))
+        .group_by(rows.c.sha256)
+        .subquery()
+    )
+    with SessionLocal() as ses:
+        hot_count, hot_bytes = ses.execute(
+            select(func.count(), func.coalesce(func.sum(per_archive.c.size), 0))
+        ).one()
+        cold_count, original, stored = ses.execute(
+            select(func.count(), func.coalesce(func.sum(ColdBlob.original_size), 0),
+                   func.coalesce(func.sum(ColdBlob.stored_size), 0))
+        ).one()
+    return {"hot_archives": hot_count, "hot_bytes": hot_bytes, "cold_archives": cold_count,
+            "cold_original_bytes": original, "cold_stored_bytes": stored, "saved_bytes": original - stored}
+
+
+def _mib(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MiB"
+
+
+def _percent(part: int, whole: int) -> str:
+    return f"{100 * part / whole:.1f}%" if whole else "0%"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="QIBO DB maintenance commands.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_blobs = sub.add_parser("blobs", help="Move inline archives from the database into the blob store.")
+    p_blobs.add_argument("--batch-size", default=50, type=int)
+    p_blobs.add_argument("--vacuum", action="store_true", help="Run VACUUM afterwards (SQLite) to reclaim space.")
+    sub.add_parser("backfill", help="Fill in size_bytes/sha256 for rows with inline archives.")
+    sub.add_parser("index", help="Index the members of archives uploaded before member indexing existed.")
+    sub.add_parser("upgrade", help="Apply pending schema migrations.")
+    sub.add_parser("status", help="Show the schema version and pending migrations.")
+    sub.add_parser("explain", help="Check that every hot query is served by an index; exits 1 otherwise.")
+    p_compact = sub.add_parser("compact", help="Recompress archives no recent row uses into the zstd cold tier.")
+    p_compact.add_argument("--older-than", default=90, type=float, help="Days since an archive was last uploaded (default 90).")
+    p_compact.add_argument("--hash-prefix", default=None, help="Only archives of hashIDs with this prefix.")
+    p_compact.add_argument("--level", default=DEFAULT_ZSTD_LEVEL, type=int, help="zstd level (default 19).")
+    p_compact.add_argument("--no-dictionary", action="store_true", help="Do not train a zstd dictionary.")
+    p_compact.add_argument("--limit", default=None, type=int, help="At most this many archives per run.")
+    p_compact.add_argument("--dry-run", action="store_true", help="Only report what would be compacted.")
+    sub.add_parser("tiers", help="Show hot/cold tier sizes and the space saved.")
+    args = parser.parse_args()
+
+    C = Config.load(cli_api_token=None)
+    engine = make_engine(C.DB_URI, echo=C.DEBUG, cfg=C)
+    with engine.begin() as conn:
+        Base.metadata.create_all(bind=conn)
+    applied = upgrade_schema(engine) if args.command != "status" else []
+
+    if args.command == "blobs":
+        moved = migrate_blobs(engine, make_blob_store(C), batch_size=args.batch_size)
+        print(f"Migrated {moved} archive(s) to the {C.BLOB_BACKEND} blob store.")
+        if args.vacuum and engine.dialect.name == "sqlite":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
+            print("VACUUM complete.")
+    elif args.command == "backfill":
+        updated = backfill_metadata(engine)
+        print(f"Backfilled size/checksum for {updated} row(s).")
+    elif args.command == "index":
+        indexed, not_zip = index_archives(engine, make_blob_store(C))
+        print(f"Indexed {indexed} archive(s); {not_zip} not a ZIP file.")
+    elif args.command == "upgrade":
+        print(f"Applied migration(s): {applied or 'none'}; schema at version {schema_version(engine)}.")
+    elif args.command == "status":
+        current = schema_version(engine)
+        print(f"Schema version: {current}")
+        for version, description, _fn in MIGRATIONS:
+            print(f"  [{'x' if version <= current else ' '}] {version}: {description}")
+    elif args.command == "explain":
+        failed = False
+        for name, plan, ok in explain_hot_queries(engine):
+            print(f"{'ok  ' if ok else 'FAIL'} {name}")
+            for line in plan.splitlines():
+                print(f"       {line}")
+            failed = failed or not ok
+        sys.exit(1 if failed else 0)
+    elif args.command == "compact":
+        stats = compact_archives(
+            engine, make_blob_store(C), older_than_days=args.older_than, hash_prefix=args.hash_prefix,
+            level=args.level, use_dictionary=not args.no_dictionary, limit=args.limit, dry_run=args.dry_run,
+        )
+        if args.dry_run:
+            print(f"{stats['candidates']} archive(s), {_mib(stats['original_bytes'])}, would be compacted.")
+        else:
+            saved = stats["original_bytes"] - stats["stored_bytes"]
+            print(f"Compacted {stats['compacted']} of {stats['candidates']} archive(s): "
+                  f"{_mib(stats['original_bytes'])} -> {_mib(stats['stored_bytes'])}, "
+                  f"saved {_mib(saved)} ({_percent(saved, stats['original_bytes'])}).")
+            print(f"Members recompressed: {stats['recompressed_members']}; kept deflated: {stats['copied_members']}; "
+                  f"archives kept hot (no gain): {stats['kept_hot']}; moved back to hot: {stats['reheated']}.")
+    elif args.command == "tiers":
+        report = tier_report(engine)
+        print(f"Hot:  {report['hot_archives']} archive(s), {_mib(report['hot_bytes'])}")
+        print(f"Cold: {report['cold_archives']} archive(s), {_mib(report['cold_original_bytes'])} stored in "
+              f"{_mib(report['cold_stored_bytes'])} (saved {_mib(report['saved_bytes'])}, "
+              f"{_percent(report['saved_bytes'], report['cold_original_bytes'])})")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,31 +1,64 @@
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
-from sqlalchemy import Integer, String, LargeBinary, text, DateTime
+from sqlalchemy import Integer, BigInteger, String, LargeBinary, text, DateTime, Index
+from sqlalchemy.dialects import sqlite
 
 Base = declarative_base()
 
+# SQLite stores CURRENT_TIMESTAMP as "YYYY-MM-DD HH:MM:SS"; bind datetimes in the
+# same format so that range and keyset comparisons on created_at are correct.
+Timestamp = DateTime(timezone=False).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 class Calibration(Base):
     __tablename__ = "calibrations"
+    __table_args__ = (
+        # download: WHERE hash_id=? ORDER BY created_at DESC LIMIT 1
+        Index("ix_calibrations_hash_created", "hash_id", "created_at", "id"),
+        # latest / list: ORDER BY created_at DESC, id DESC
+        Index("ix_calibrations_created", "created_at", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    hash_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    hash_id: Mapped[str] = mapped_column(String, nullable=False)
     notes: Mapped[str | None] = mapped_column(String, nullable=True)
-    created_at: Mapped[str] = mapped_column(DateTime(timezone=False), server_default=text("CURRENT_TIMESTAMP"))
+    created_at: Mapped[str] = mapped_column(Timestamp, server_default=text("CURRENT_TIMESTAMP"))
     filename: Mapped[str] = mapped_column(String, nullable=False)
-    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # archive location in the blob store (see server/storage.py)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    storage_key: Mapped[str | None] = mapped_column(String, nullable=True)
+    # legacy inline archive; empty once the row points at the blob store.
+    # Deferred so that loading a row never pulls the blob unless it is accessed.
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, default=b"", deferred=True)
 
 class Result(Base):
     __tablename__ = "results"
+    __table_args__ = (
+        # download: WHERE hash_id=? AND name=? ORDER BY created_at DESC LIMIT 1
+        Index("ix_results_hash_name_created", "hash_id", "name", "created_at", "id"),
+        # download: WHERE hash_id=? AND name=? AND run_id=? ORDER BY created_at DESC LIMIT 1
+        Index("ix_results_hash_name_run_created", "hash_id", "name", "run_id", "created_at", "id"),
+        # list: WHERE hash_id=? ORDER BY created_at DESC, id DESC
+        Index("ix_results_hash_created", "hash_id", "created_at", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    hash_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
-    name: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    hash_id: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
     run_id: Mapped[str | None] = mapped_column(
         String,
         nullable=True,
-        index=True
     )
     notes: Mapped[str | None] = mapped_column(String, nullable=True)
-    created_at: Mapped[str] = mapped_column(DateTime(timezone=False), server_default=text("CURRENT_TIMESTAMP"))
+    created_at: Mapped[str] = mapped_column(Timestamp, server_default=text("CURRENT_TIMESTAMP"))
     filename: Mapped[str] = mapped_column(String, nullable=False)
-    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # archive location in the blob store (see server/storage.py)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    storage_key: Mapped[str | None] = mapped_column(String, nullable=True)
+    # legacy inline archive; empty once the row points at the blob store.
+    # Deferred so that loading a row never pulls the blob unless it is accessed.
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, default=b"", deferred=True)
 
 class BestRun(Base):
     __tablename__ = "bestruns"
@@ -33,7 +66,45 @@ class BestRun(Base):
     calibration_hash_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
     run_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
     created_at: Mapped[str] = mapped_column(
-        DateTime(timezone=False),
+        Timestamp,
+        server_default=text("CURRENT_TIMESTAMP")
+    )
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    applied_at: Mapped[str] = mapped_column(
+        Timestamp,
         server_default=text("CURRENT_TIMESTAMP")
     )
 
+
+class ArchiveMember(Base):
+    """One entry of an archive's ZIP central directory, indexed once per content hash."""
+    __tablename__ = "archive_members"
+    __table_args__ = (
+        # member lookup: WHERE sha256=? AND name=?
+        Index("ix_archive_members_sha_name", "sha256", "name"),
+    )
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    position: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    compressed_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    header_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    crc32: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    compress_type: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ColdBlob(Base):
+    """An archive moved to the zstd cold tier (see server/tiering.py); its hot copy is gone."""
+    __tablename__ = "cold_blobs"
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    original_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    stored_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    dictionary: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    compacted_at: Mapped[str] = mapped_column(
+        Timestamp,
+        server_default=text("CURRENT_TIMESTAMP")
+    )
@@ -0,0 +1,289 @@
+import hashlib, os, tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class BlobInfo:
+    sha256: str
+    size: int
+    key: str
+    # True when this put wrote the blob, False when identical content was already stored
+    created: bool = False
+
+
+def blob_key(sha256: str) -> str:
+    """Sharded storage key for a content hash: ``ab/cd/abcd...``."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def iter_file(fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a file object in bounded chunks."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _spool(chunks: Iterable[bytes], tmp_dir) -> tuple:
+    """Write `chunks` to a temp file in `tmp_dir`, hashing as it goes.
+
+    Returns:
+        (tmp_path, sha256, size)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp, digest.hexdigest(), size
+
+
+class BlobStore(ABC):
+    """Content-addressed archive storage.
+
+    Archives are stored once per SHA-256 digest under `blob_key(digest)`;
+    database rows only keep the digest, size and key. Reading a blob that is
+    not stored raises FileNotFoundError.
+    """
+
+    @abstractmethod
+    def put_chunks(self, chunks: Iterable[bytes]) -> BlobInfo:
+        """Store a blob from an iterable of byte chunks, hashing incrementally.
+
+        Memory use is bounded by the chunk size; the blob only becomes visible
+        under its key once it has been written completely.
+        """
+        ...
+
+    @abstractmethod
+    def put_chunks_at(self, key: str, chunks: Iterable[bytes]) -> BlobInfo:
+        """Store derived data (e.g. cold-tier copies) under an explicit `key`, replacing any blob there."""
+        ...
+
+    def put_stream(self, fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> BlobInfo:
+        return self.put_chunks(iter_file(fileobj, chunk_size))
+
+    def put_bytes(self, data: bytes) -> BlobInfo:
+        return self.put_chunks([data])
+
+    @abstractmethod
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        ...
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield bytes ``[start, end)`` of a blob in chunks."""
+        position = 0
+        for chunk in self.iter_chunks(key, chunk_size):
+            lo, hi = max(start - position, 0), min(end - position, len(chunk))
+            if lo < hi:
+                yield chunk[lo:hi]
+            position += len(chunk)
+            if position >= end:
+                break
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def size(self, key: str) -> Optional[int]:
+        """Size in bytes of the blob under `key`, or None if it is not stored."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def read_bytes(self, key: str) -> bytes:
+        return b"".join(self.iter_chunks(key))
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under `root`, sharded into two levels of sub-directories."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.tmp_dir = self.root / ".tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def put_chunks(self, chunks: Iterable[bytes]) -> BlobInfo:
+        tmp, sha256, size = _spool(chunks, self.tmp_dir)
+        key = blob_key(sha256)
+        path = self._path(key)
+        try:
+            created = not path.exists()
+            if created:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return BlobInfo(sha256=sha256, size=size, key=key, created=created)
+
+    def put_chunks_at(self, key: str, chunks: Iterable[bytes]) -> BlobInfo:
+        tmp, sha256, size = _spool(chunks, self.tmp_dir)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return BlobInfo(sha256=sha256, size=size, key=key)
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self._path(key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore(BlobStore):
+    """Blobs in an S3-compatible bucket (AWS, MinIO, moto server, ...).
+
+    `endpoint_url` points the client at a non-AWS service, e.g. a local MinIO
+    or `moto_server` instance. Requires the optional `boto3` dependency.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, client=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("The S3 blob backend requires boto3 (pip install boto3).") from e
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + key
+
+    def put_chunks(self, chunks: Iterable[bytes]) -> BlobInfo:
+        # the key depends on the digest, so spool locally before uploading
+        tmp, sha256, size = _spool(chunks, None)
+        key = blob_key(sha256)
+        try:
+            created = not self.exists(key)
+            if created:
+                with open(tmp, "rb") as f:
+                    self.client.upload_fileobj(f, self.bucket, self._object_key(key))
+        finally:
+            os.unlink(tmp)
+        return BlobInfo(sha256=sha256, size=size, key=key, created=created)
+
+    def put_chunks_at(self, key: str, chunks: Iterable[bytes]) -> BlobInfo:
+        tmp, sha256, size = _spool(chunks, None)
+        try:
+            with open(tmp, "rb") as f:
+                self.client.upload_fileobj(f, self.bucket, self._object_key(key))
+        finally:
+            os.unlink(tmp)
+        return BlobInfo(sha256=sha256, size=size, key=key)
+
+    def _get_body(self, key: str, **kwargs):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key), **kwargs)["Body"]
+        except Exception as e:
+            if _status(e) == 404:
+                raise FileNotFoundError(key) from e
+            raise
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        body = self._get_body(key)
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        if end <= start:
+            return
+        body = self._get_body(key, Range=f"bytes={start}-{end - 1}")
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def exists(self, key: str) -> bool:
+        return self.size(key) is not None
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if _status(e) == 404:
+                return None
+            raise
+        return head["ContentLength"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+def _status(e: Exception) -> Optional[int]:
+    """HTTP status of a botocore ClientError."""
+    return getattr(e, "response", {}).get("ResponseMetadata", {}).get("HTTPStatusCode")
+
+
+def make_blob_store(cfg) -> BlobStore:
+    """Build the blob store selected by `cfg.BLOB_BACKEND` ("local" or "s3").
+
+    It is wrapped in a `TieredBlobStore`, so archives moved to the cold tier
+    by ``qibodb-migrate compact`` stay readable under their usual keys.
+    """
+    from .tiering import TieredBlobStore
+    backend = (cfg.BLOB_BACKEND or "local").lower()
+    if backend == "local":
+        hot = LocalBlobStore(cfg.BLOB_ROOT)
+    elif backend == "s3":
+        if not cfg.S3_BUCKET:
+            raise ValueError("QIBO_S3_BUCKET is required for the s3 blob backend")
+        hot = S3BlobStore(cfg.S3_BUCKET, prefix=cfg.S3_PREFIX, endpoint_url=cfg.S3_ENDPOINT_URL)
+    else:
+        raise ValueError(f"Unknown blob backend: {cfg.BLOB_BACKEND}")
+    return TieredBlobStore(hot, cfg.COLD_CACHE_DIR, cfg.COLD_CACHE_MAX_BYTES)
@@ -0,0 +1,440 @@
+import hashlib, io, json, os, struct, tempfile, threading, zipfile, zlib
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .storage import CHUNK_SIZE, BlobInfo, BlobStore, iter_file
+
+COLD_PREFIX = "cold/"
+DICT_PREFIX = "dicts/"
+DEFAULT_ZSTD_LEVEL = 19
+DICT_SIZE = 112 * 1024
+# members are re-deflated in memory; larger ones are kept as compressed bytes
+MAX_RECOMPRESS_MEMBER = 64 * 1024 * 1024
+_MAGIC = b"QIBOCLD1"
+_HEADER_LEN = struct.Struct("<L")
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_WINDOW = 32 * 1024
+_PIECE = 64 * 1024
+# zipfile's default is level 6; clients may pick any level
+_LEVELS = (6, 9, 1, 2, 3, 4, 5, 7, 8, 0)
+# block size of the client's parallel deflate (client/zipstream.py)
+_CLIENT_BLOCK_SIZE = 1024 * 1024
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("The cold storage tier requires zstandard (pip install zstandard).") from e
+    return zstandard
+
+
+def cold_key(key: str) -> str:
+    return COLD_PREFIX + key
+
+
+def dict_key(sha256: str) -> str:
+    return DICT_PREFIX + sha256
+
+
+# --- reproducing deflate streams -------------------------------------------
+
+def _deflate(raw: bytes, recipe: dict) -> Iterator[bytes]:
+    """Re-create a deflate stream from its input and the recipe found by `_find_recipe`."""
+    level = recipe["level"]
+    if recipe["kind"] == "zlib":
+        # one stream, as written by zipfile (and any plain zlib user)
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        for start in range(0, len(raw), _PIECE):
+            yield compressor.compress(raw[start:start + _PIECE])
+        yield compressor.flush()
+        return
+    # independent blocks primed with the previous window, as written by client/zipstream.py
+    block_size, window = recipe["block_size"], b""
+    for start in range(0, max(len(raw), 1), block_size):
+        block = raw[start:start + block_size]
+        last = start + block_size >= len(raw)
+        if window:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=window)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        yield compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        window = (window + block)[-_WINDOW:]
+
+
+def _reproduces(raw: bytes, compressed: bytes, recipe: dict) -> bool:
+    position = 0
+    for piece in _deflate(raw, recipe):
+        if compressed[position:position + len(piece)] != piece:
+            return False  # most wrong recipes diverge within the first piece
+        position += len(piece)
+    return position == len(compressed)
+
+
+def _find_recipe(raw: bytes, compressed: bytes) -> Optional[dict]:
+    """The zlib settings that turn `raw` into exactly `compressed`, if any known ones do."""
+    candidates = [{"kind": "zlib", "level": level} for level in _LEVELS]
+    if len(raw) > _CLIENT_BLOCK_SIZE:
+        candidates += [{"kind": "blocks", "level": level, "block_size": _CLIENT_BLOCK_SIZE} for level in _LEVELS]
+    return next((r for r in candidates if _reproduces(raw, compressed, r)), None)
+
+
+# --- cold blob container ----------------------------------------------------
+#
+#   _MAGIC | u32 header length | JSON header | one zstd frame (the payload)
+#
+# The header lists segments that rebuild the original archive in order:
+# {"copy": n} takes n payload bytes verbatim (ZIP headers, directory, members
+# that cannot be re-created); {"deflate": n, "recipe": ...} takes n payload
+# bytes of member content and deflates them with the recipe. Member content
+# is thus stored uncompressed and left to zstd, which (with a dictionary
+# trained on similar files) compresses JSON far better than per-file deflate.
+
+def _plan_segments(f: BinaryIO, size: int) -> List[Tuple[int, int, bool]]:
+    """(start, end, deflated) byte ranges covering an archive; deflated marks member data."""
+    try:
+        with zipfile.ZipFile(f) as zf:
+            infos = sorted(zf.infolist(), key=lambda i: i.header_offset)
+    except zipfile.BadZipFile:
+        return [(0, size, False)]
+    segments, position = [], 0
+    for info in infos:
+        if info.compress_type != zipfile.ZIP_DEFLATED or info.flag_bits & 0x1 or info.file_size > MAX_RECOMPRESS_MEMBER:
+            continue
+        f.seek(info.header_offset)
+        header = f.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size or header[:4] != b"PK\x03\x04":
+            return [(0, size, False)]
+        name_len, extra_len = _LOCAL_HEADER.unpack(header)[-2:]
+        start = info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+        end = start + info.compress_size
+        if start < position or end > size:
+            return [(0, size, False)]  # overlapping or truncated members: keep the bytes as they are
+        segments += [(position, start, False), (start, end, True)]
+        position = end
+    segments.append((position, size, False))
+    return [s for s in segments if s[1] > s[0]]
+
+
+def write_cold_blob(src: BinaryIO, size: int, out: BinaryIO, level: int = DEFAULT_ZSTD_LEVEL,
+                    dictionary: Optional[Tuple[str, bytes]] = None) -> dict:
+    """Write the cold-tier container of the archive in `src` to `out`.
+
+    Deflated members are stored as their uncompressed content when one of the
+    known zlib settings reproduces their compressed bytes exactly; everything
+    else is copied verbatim. The whole payload is one zstd frame at `level`,
+    using `dictionary` (``(sha256, bytes)``) if given.
+
+    Returns:
+        dict: ``{"recompressed": members stored uncompressed, "copied": members kept deflated}``.
+    """
+    zstd = _zstd()
+    dict_data = zstd.ZstdCompressionDict(dictionary[1]) if dictionary else None
+    compressor = zstd.ZstdCompressor(level=level, dict_data=dict_data).compressobj()
+    segments = []
+    recompressed = copied = 0
+    # the header lists the segments, so the payload is spooled until they are all known
+    with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 8) as payload:
+        for start, end, deflated in _plan_segments(src, size):
+            src.seek(start)
+            if deflated:
+                data = src.read(end - start)
+                recipe = None
+                try:
+                    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+                    raw = inflater.decompress(data, MAX_RECOMPRESS_MEMBER + 1)
+                    if inflater.eof and not inflater.unconsumed_tail:
+                        recipe = _find_recipe(raw, data)
+                except zlib.error:
+                    pass
+                if recipe is not None:
+                    segments.append({"deflate": len(raw), "recipe": recipe})
+                    payload.write(compressor.compress(raw))
+                    recompressed += 1
+                    continue
+                copied += 1
+                chunks = [data]
+            else:
+                chunks = iter_file(_Limited(src, end - start))
+            if segments and "copy" in segments[-1]:
+                segments[-1]["copy"] += end - start
+            else:
+                segments.append({"copy": end - start})
+            for chunk in chunks:
+                payload.write(compressor.compress(chunk))
+        payload.write(compressor.flush())
+        header = json.dumps({
+            "size": size,
+            "dictionary": dictionary[0] if dictionary else None,
+            "zlib": zlib.ZLIB_RUNTIME_VERSION,
+            "segments": segments,
+        }).encode()
+        out.write(_MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        payload.seek(0)
+        for chunk in iter_file(payload):
+            out.write(chunk)
+    return {"recompressed": recompressed, "copied": copied}
+
+
+class _Limited(io.RawIOBase):
+    def __init__(self, f: BinaryIO, length: int):
+        self._f, self._left = f, length
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, n: int = -1) -> bytes:
+        n = self._left if n is None or n < 0 else min(n, self._left)
+        data = self._f.read(n)
+        self._left -= len(data)
+        return data
+
+
+class _ChunkReader(io.RawIOBase):
+    """File-like object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks, self._buffer = iter(chunks), b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b""
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def _read_exactly(f, n: int) -> bytes:
+    data = f.read(n)
+    while len(data) < n:
+        more = f.read(n - len(data))
+        if not more:
+            raise ValueError("truncated cold blob")
+        data += more
+    return data
+
+
+def read_cold_header(chunks: Iterable[bytes]) -> Tuple[dict, BinaryIO]:
+    """Parse a cold blob's header; returns it with a reader positioned at the payload.
+
+    Raises:
+        ValueError: If the data is not a cold blob.
+    """
+    reader = io.BufferedReader(_ChunkReader(chunks), CHUNK_SIZE)
+    if reader.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("not a cold blob")
+    (length,) = _HEADER_LEN.unpack(_read_exactly(reader, _HEADER_LEN.size))
+    return json.loads(_read_exactly(reader, length)), reader
+
+
+def restore_cold_blob(chunks: Iterable[bytes], out: BinaryIO,
+                      load_dictionary: Callable[[str], bytes]) -> Tuple[str, int]:
+    """Rebuild the original archive from a cold blob into `out`.
+
+    Returns:
+        (sha256, size) of the rebuilt bytes, for the caller to verify.
+    """
+    zstd = _zstd()
+    header, reader = read_cold_header(chunks)
+    dict_data = zstd.ZstdCompressionDict(load_dictionary(header["dictionary"])) if header["dictionary"] else None
+    payload = zstd.ZstdDecompressor(dict_data=dict_data).stream_reader(reader)
+    digest, size = hashlib.sha256(), 0
+    for segment in header["segments"]:
+        if "copy" in segment:
+            left = segment["copy"]
+            while left:
+                data = _read_exactly(payload, min(left, CHUNK_SIZE))
+                left -= len(data)
+                digest.update(data); out.write(data); size += len(data)
+        else:
+            raw = _read_exactly(payload, segment["deflate"])
+            for data in _deflate(raw, segment["recipe"]):
+                digest.update(data); out.write(data); size += len(data)
+    return digest.hexdigest(), size
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = DICT_SIZE) -> Optional[bytes]:
+    """Train a zstd dictionary on member contents; None if there is too little to learn from."""
+    zstd = _zstd()
+    if len(samples) < 8:
+        return None
+    try:
+        return zstd.train_dictionary(dict_size, samples).as_bytes()
+    except zstd.ZstdError:
+        return None
+
+
+def dictionary_samples(f: BinaryIO, limit: int = 128 * 1024) -> List[bytes]:
+    """Up to `limit` leading bytes of each member of a ZIP, as dictionary training samples."""
+    try:
+        with zipfile.ZipFile(f) as zf:
+            samples = []
+            for info in zf.infolist():
+                if info.is_dir() or info.flag_bits & 0x1:
+                    continue
+                with zf.open(info) as member:
+                    samples.append(member.read(limit))
+            return samples
+    except (zipfile.BadZipFile, NotImplementedError):
+        return []
+
+
+# --- tiered store ------------------------------------------------------------
+
+class TieredBlobStore(BlobStore):
+    """A blob store with a cold tier of recompressed archives, read transparently.
+
+    Blobs are written to and read from `hot` as usual. When a blob is missing
+    there, its cold copy (``cold/<key>``, written by ``qibodb-migrate compact``)
+    is rebuilt into a local cache directory, checked against its SHA-256, and
+    served from there; the cache keeps the most recently used archives up to
+    `cache_max_bytes`. Hot reads cost nothing extra.
+    """
+
+    def __init__(self, hot: BlobStore, cache_dir: str, cache_max_bytes: int):
+        self.hot = hot
+        self.cache_dir = Path(cache_dir)
+        self.cache_max_bytes = cache_max_bytes
+        self._lock = threading.Lock()
+        self._thawing: Dict[str, threading.Lock] = {}
+        self._dictionaries: Dict[str, bytes] = {}
+
+    def put_chunks(self, chunks: Iterable[bytes]) -> BlobInfo:
+        return self.hot.put_chunks(chunks)
+
+    def put_chunks_at(self, key: str, chunks: Iterable[bytes]) -> BlobInfo:
+        return self.hot.put_chunks_at(key, chunks)
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        return self._tiered(lambda: self.hot.iter_chunks(key, chunk_size),
+                            key, lambda f: iter_file(f, chunk_size))
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        def cold(f):
+            f.seek(start)
+            return iter_file(_Limited(f, max(end - start, 0)), chunk_size)
+        return self._tiered(lambda: self.hot.iter_range(key, start, end, chunk_size), key, cold)
+
+    def _tiered(self, open_hot, key: str, read_thawed) -> Iterator[bytes]:
+        chunks = open_hot()
+        try:
+            first = next(chunks, None)
+        except FileNotFoundError:
+            with self.thaw(key) as f:
+                yield from read_thawed(f)
+            return
+        if first is not None:
+            yield first
+            yield from chunks
+
+    def exists(self, key: str) -> bool:
+        return self.size(key) is not None
+
+    def size(self, key: str) -> Optional[int]:
+        size = self.hot.size(key)
+        if size is not None:
+            return size
+        try:
+            return (self.cache_dir / _cache_name(key)).stat().st_size
+        except FileNotFoundError:
+            pass
+        try:
+            header, _reader = read_cold_header(self.hot.iter_chunks(cold_key(key), 64 * 1024))
+        except FileNotFoundError:
+            return None
+        return header["size"]
+
+    def delete(self, key: str) -> None:
+        self.hot.delete(key)
+        self.hot.delete(cold_key(key))
+        try:
+            (self.cache_dir / _cache_name(key)).unlink()
+        except FileNotFoundError:
+            pass
+
+    def load_dictionary(self, sha256: str) -> bytes:
+        if sha256 not in self._dictionaries:
+            self._dictionaries[sha256] = self.hot.read_bytes(dict_key(sha256))
+        return self._dictionaries[sha256]
+
+    def restore(self, key: str, out: BinaryIO) -> None:
+        """Rebuild the cold blob of `key` into `out`, verifying its content hash.
+
+        Raises:
+            FileNotFoundError: If there is no cold copy.
+            ValueError: If the rebuilt archive does not match its hash.
+        """
+        sha256, _size = restore_cold_blob(self.hot.iter_chunks(cold_key(key)), out, self.load_dictionary)
+        if sha256 != key.rsplit("/", 1)[-1]:
+            raise ValueError(f"cold blob {key} does not rebuild to its original content")
+
+    def thaw(self, key: str) -> BinaryIO:
+        """Open the rebuilt archive of a cold blob, from the cache or rebuilding it.
+
+        Raises:
+            FileNotFoundError: If the blob is in neither tier.
+            ValueError: If the rebuilt archive does not match its hash.
+        """
+        path = self.cache_dir / _cache_name(key)
+        f = self._open_cached(path)
+        if f is not None:
+            return f
+        with self._lock:
+            lock = self._thawing.setdefault(key, threading.Lock())
+        try:
+            with lock:  # concurrent readers of the same archive rebuild it once
+                f = self._open_cached(path)
+                if f is not None:
+                    return f
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+                try:
+                    with os.fdopen(fd, "wb") as out:
+                        self.restore(key, out)
+                    os.replace(tmp, path)
+                finally:
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+                f = open(path, "rb")
+        finally:
+            with self._lock:
+                self._thawing.pop(key, None)
+        self._evict(keep=path)
+        return f
+
+    @staticmethod
+    def _open_cached(path: Path) -> Optional[BinaryIO]:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # most recently used
+        return f
+
+    def _evict(self, keep: Path) -> None:
+        """Drop least recently used rebuilt archives beyond `cache_max_bytes` (open readers keep theirs)."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".part"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if total <= self.cache_max_bytes:
+                break
+            if path != str(keep):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+def _cache_name(key: str) -> str:
+    return key.rsplit("/", 1)[-1]
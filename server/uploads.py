@@ -0,0 +1,151 @@
+import hashlib, json, os, re, shutil, tempfile, time
+from pathlib import Path
+from typing import Iterator, List
+
+CHUNK_SIZE = 1024 * 1024
+SUGGESTED_CHUNK_SIZE = 8 * 1024 * 1024
+_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+class UploadSessions:
+    """Resumable upload sessions staged on the local filesystem.
+
+    Each session is a directory under `root` holding ``session.json`` and one
+    file per received chunk, named by its zero-padded byte offset. Chunks are
+    written to a temp file and renamed into place, so a chunk is either fully
+    present or absent, and concurrent PUTs (from threads or worker processes
+    sharing `root`) need no locking. Session ids are derived from the upload's
+    kind, fields, size and SHA-256, so creating the same upload again returns
+    the existing session and lets a restarted client resume it.
+
+    Args:
+        root: Staging directory; must be shared by all workers of one server.
+        ttl: Seconds after which abandoned sessions are purged.
+    """
+
+    def __init__(self, root: str, ttl: float = 24 * 3600):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _dir(self, upload_id: str) -> Path:
+        if not _ID_RE.fullmatch(upload_id or ""):
+            raise KeyError(upload_id)
+        return self.root / upload_id
+
+    def create(self, kind: str, fields: dict, size: int, sha256: str) -> dict:
+        """Create (or return the matching existing) session and its metadata."""
+        self.purge_expired()
+        identity = json.dumps([kind, fields, size, sha256], sort_keys=True)
+        upload_id = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        path = self.root / upload_id
+        meta = {"upload_id": upload_id, "kind": kind, "fields": fields, "size": size, "sha256": sha256}
+        if not (path / "session.json").exists():
+            staging = Path(tempfile.mkdtemp(dir=self.root, prefix=".new-"))
+            with open(staging / "session.json", "w") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(staging, path)
+            except OSError:
+                # created concurrently by another request
+                shutil.rmtree(staging, ignore_errors=True)
+        os.utime(path)
+        return meta
+
+    def get(self, upload_id: str) -> dict:
+        """Session metadata.
+
+        Raises:
+            KeyError: If the session does not exist (or has been finalized).
+        """
+        try:
+            with open(self._dir(upload_id) / "session.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id) from None
+
+    def write_chunk(self, upload_id: str, offset: int, stream, chunk_size: int = CHUNK_SIZE) -> int:
+        """Store the bytes read from `stream` at `offset`; returns the number of bytes written.
+
+        Raises:
+            KeyError: If the session does not exist.
+            ValueError: If the chunk does not fit inside the declared size.
+        """
+        meta = self.get(upload_id)
+        path = self._dir(upload_id)
+        if offset < 0 or offset >= max(meta["size"], 1):
+            raise ValueError("offset out of range")
+        written = 0
+        fd, tmp = tempfile.mkstemp(dir=path, prefix=".chunk-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    block = stream.read(chunk_size)
+                    if not block:
+                        break
+                    written += len(block)
+                    if offset + written > meta["size"]:
+                        raise ValueError("chunk extends past the declared size")
+                    f.write(block)
+            os.replace(tmp, path / f"{offset:020d}")
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        os.utime(path)
+        return written
+
+    def _chunks(self, upload_id: str) -> List[tuple]:
+        """(offset, length, path) of every stored chunk, by offset."""
+        path = self._dir(upload_id)
+        chunks = []
+        for entry in os.scandir(path):
+            if entry.name.isdigit():
+                try:
+                    chunks.append((int(entry.name), entry.stat().st_size, Path(entry.path)))
+                except FileNotFoundError:
+                    continue
+        return sorted(chunks)
+
+    def received(self, upload_id: str) -> List[List[int]]:
+        """Merged ``[start, end)`` byte ranges received so far."""
+        ranges: List[List[int]] = []
+        for offset, length, _path in self._chunks(upload_id):
+            if ranges and offset <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], offset + length)
+            elif length:
+                ranges.append([offset, offset + length])
+        return ranges
+
+    def iter_content(self, upload_id: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the assembled upload in order, skipping overlapping bytes.
+
+        Raises:
+            ValueError: If the received chunks do not cover the declared size.
+        """
+        size = self.get(upload_id)["size"]
+        if self.received(upload_id) != ([[0, size]] if size else []):
+            raise ValueError("upload is incomplete")
+        position = 0
+        for offset, length, path in self._chunks(upload_id):
+            if offset + length <= position:
+                continue
+            with open(path, "rb") as f:
+                f.seek(position - offset)
+                while True:
+                    block = f.read(chunk_size)
+                    if not block:
+                        break
+                    position += len(block)
+                    yield block
+
+    def delete(self, upload_id: str) -> None:
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+
+    def purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.root):
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except FileNotFoundError:
+                continue
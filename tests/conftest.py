@@ -0,0 +1,86 @@
+import io, threading, zipfile
+import pytest
+from werkzeug.serving import make_server
+from client.client import QiboDBClient
+from server.app import create_app
+from server.config import Config
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    """Server config with every file the app writes under `tmp_path`."""
+    c = Config()
+    c.DB_URI = f"sqlite:///{tmp_path / 'qibo.db'}"
+    c.API_TOKEN = TOKEN
+    c.BLOB_ROOT = str(tmp_path / "blobs")
+    c.UPLOAD_DIR = str(tmp_path / "uploads")
+    c.COLD_CACHE_DIR = str(tmp_path / "cold_cache")
+    c.CACHE_BACKEND = "none"
+    return c
+
+
+@pytest.fixture
+def app(cfg):
+    return create_app(cfg)
+
+
+@pytest.fixture
+def client(app):
+    """Flask test client sending the API token with every request."""
+    c = app.test_client()
+    c.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {TOKEN}"
+    return c
+
+
+@pytest.fixture
+def live_server(app):
+    """Serve the app on a free local port for the real clients; yields its base URL."""
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def db(live_server, monkeypatch):
+    """QiboDBClient talking to `live_server`, without an archive cache."""
+    monkeypatch.delenv("QIBO_CLIENT_CACHE", raising=False)
+    with QiboDBClient(live_server, TOKEN, max_retries=0) as c:
+        yield c
+
+
+def make_zip(files: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in files.items():
+            z.writestr(name, data)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def upload_calibration(client):
+    """Upload a calibration archive made of `files` ({name: bytes}); returns the JSON response."""
+    def upload(hash_id: str, files: dict, notes: str = "") -> dict:
+        r = client.post("/calibrations/upload", content_type="multipart/form-data", data={
+            "hashID": hash_id, "notes": notes, "archive": (io.BytesIO(make_zip(files)), "calibration_bundle.zip"),
+        })
+        assert r.status_code == 200, r.get_json()
+        return r.get_json()
+    return upload
+
+
+@pytest.fixture
+def upload_result(client):
+    """Upload a result archive made of `files` ({name: bytes}); returns the JSON response."""
+    def upload(hash_id: str, name: str, files: dict, run_id: str = None, notes: str = "") -> dict:
+        data = {"hashID": hash_id, "name": name, "notes": notes, "archive": (io.BytesIO(make_zip(files)), "bundle.zip")}
+        if run_id is not None:
+            data["runID"] = run_id
+        r = client.post("/results/upload", content_type="multipart/form-data", data=data)
+        assert r.status_code == 200, r.get_json()
+        return r.get_json()
+    return upload
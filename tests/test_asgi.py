@@ -0,0 +1,173 @@
+import asyncio, random, threading
+from urllib.parse import unquote
+import pytest
+from server.asgi import WSGIBridge
+from conftest import TOKEN, make_zip
+
+try:
+    import httpx
+except ImportError:  # the httpx tests skip themselves
+    httpx = None
+
+
+def _scope(path: str) -> dict:
+    return {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": [],
+            "http_version": "1.1", "scheme": "http", "server": ("test", 80), "client": ("127.0.0.1", 1)}
+
+
+async def _call(bridge, path: str) -> dict:
+    sent, done = {}, asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+        elif not message.get("more_body"):
+            sent["body"] = sent.get("body", b"") + message.get("body", b"")
+            done.set()
+        else:
+            sent["body"] = sent.get("body", b"") + message["body"]
+
+    await bridge(_scope(path), receive, send)
+    return sent
+
+
+def test_long_polls_do_not_take_request_threads():
+    release = threading.Event()
+
+    def app(environ, start_response):
+        if environ["PATH_INFO"] == "/events":
+            release.wait(10)  # a subscriber waiting for an event
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [environ["PATH_INFO"].encode()]
+
+    async def scenario():
+        bridge = WSGIBridge(app, threads=1, long_poll_threads=4)
+        polls = [asyncio.create_task(_call(bridge, "/events")) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        # the only request thread is still free while every poll waits
+        other = await asyncio.wait_for(_call(bridge, "/calibrations/list"), timeout=2)
+        assert all(not p.done() for p in polls)
+        release.set()
+        return other, await asyncio.gather(*polls)
+
+    other, polls = asyncio.run(scenario())
+    assert other == {"status": 200, "body": b"/calibrations/list"}
+    assert all(p == {"status": 200, "body": b"/events"} for p in polls)
+
+
+def _bridge_client(app, **kwargs):
+    bridge = WSGIBridge(app, threads=4, long_poll_threads=2, **kwargs)
+    transport = httpx.ASGITransport(app=bridge)
+    return bridge, httpx.AsyncClient(transport=transport, base_url="http://testserver",
+                                     headers={"Authorization": f"Bearer {TOKEN}"})
+
+
+def _through_bridge(app, requests, **kwargs):
+    """Send `requests(http)` through the bridge with httpx; returns its result."""
+    async def main():
+        bridge, http = _bridge_client(app, **kwargs)
+        async with http:
+            try:
+                return await requests(http)
+            finally:
+                bridge.pool.shutdown()
+                bridge.long_poll_pool.shutdown()
+    return asyncio.run(main())
+
+
+def test_requests_and_uploads_through_the_bridge(app):
+    pytest.importorskip("httpx")
+    archive = make_zip({"c.json": b'{"qubits": [0, 1]}' * 500})
+
+    async def requests(http):
+        r = await http.post("/calibrations/upload", data={"hashID": "h", "notes": "via asgi"},
+                            files={"archive": ("calibration_bundle.zip", archive)})
+        assert r.status_code == 200, r.text
+        latest = await http.get("/calibrations/latest")
+        raw = await http.get("/calibrations/download/raw", params={"hashID": "h"})
+        missing = await http.get("/calibrations/download/raw", params={"hashID": "nope"})
+        return latest, raw, missing
+
+    latest, raw, missing = _through_bridge(app, requests)
+    assert latest.status_code == 200
+    assert latest.headers["content-type"] == "application/json"
+    assert latest.json()["notes"] == "via asgi"
+    assert raw.status_code == 200 and raw.content == archive
+    assert raw.headers["content-type"] == "application/zip"
+    assert raw.headers["content-length"] == str(len(archive))
+    assert unquote(raw.headers["x-qibo-notes"]) == "via asgi"
+    assert missing.status_code == 404 and missing.json() == {"error": "not found"}
+
+
+def test_ranged_download_through_the_bridge(app):
+    pytest.importorskip("httpx")
+    archive = make_zip({"c.bin": random.Random(0).randbytes(5000)})
+
+    async def requests(http):
+        await http.post("/calibrations/upload", data={"hashID": "h"}, files={"archive": ("c.zip", archive)})
+        params = {"hashID": "h"}
+        return (await http.get("/calibrations/download/raw", params=params, headers={"Range": "bytes=100-1099"}),
+                await http.get("/calibrations/download/raw", params=params, headers={"Range": "bytes=-10"}),
+                await http.get("/calibrations/download/raw", params=params, headers={"Range": f"bytes={len(archive)}-"}))
+
+    part, suffix, unsatisfiable = _through_bridge(app, requests)
+    assert part.status_code == 206 and part.content == archive[100:1100]
+    assert part.headers["content-range"] == f"bytes 100-1099/{len(archive)}"
+    assert suffix.status_code == 206 and suffix.content == archive[-10:]
+    assert unsatisfiable.status_code == 416
+
+
+def test_oversized_bodies_are_refused(app):
+    pytest.importorskip("httpx")
+
+    async def requests(http):
+        return await http.post("/calibrations/upload", content=b"x" * 2000)
+
+    r = _through_bridge(app, requests, max_body=1000)
+    assert r.status_code == 413
+
+
+def test_client_disconnect_stops_the_response():
+    produced, closed = [], threading.Event()
+    first_chunk_sent = asyncio.Event()
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "application/zip")])
+
+        def body():
+            try:
+                for i in range(1000):
+                    produced.append(i)
+                    yield b"x" * 1024
+            finally:
+                closed.set()
+        return body()
+
+    async def scenario():
+        bridge = WSGIBridge(app, threads=1, long_poll_threads=1)
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await first_chunk_sent.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                first_chunk_sent.set()
+                await asyncio.sleep(0.01)  # a slow client
+
+        await asyncio.wait_for(bridge(_scope("/calibrations/download/raw"), receive, send), timeout=5)
+
+    asyncio.run(scenario())
+    # the generator was closed long before it finished, freeing its thread
+    assert closed.is_set()
+    assert len(produced) < 1000
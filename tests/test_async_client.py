@@ -0,0 +1,100 @@
+import asyncio, io, zipfile
+from datetime import datetime
+import pytest
+import requests
+
+httpx = pytest.importorskip("httpx")
+
+from client.async_client import AsyncQiboDBClient
+from client.client import _auth_headers
+from conftest import TOKEN
+from server.asgi import WSGIBridge
+
+BASE_URL = "http://testserver"
+
+
+def _run(app, test):
+    """Run `test(db)` with an AsyncQiboDBClient served by `app` through the ASGI bridge."""
+    async def main():
+        bridge = WSGIBridge(app, threads=4, long_poll_threads=2)
+        db = AsyncQiboDBClient(BASE_URL, TOKEN)
+        await db._http.aclose()
+        db._http = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=bridge), base_url=BASE_URL, headers=_auth_headers(TOKEN)
+        )
+        try:
+            async with db:
+                return await test(db)
+        finally:
+            bridge.pool.shutdown()
+            bridge.long_poll_pool.shutdown()
+    return asyncio.run(main())
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_upload_download_and_list(app, tmp_path):
+    cal = _write(tmp_path, "calibration.json", b'{"qubits": [0, 1]}' * 100)
+    res = _write(tmp_path, "results.json", b'{"fidelity": 0.99}')
+
+    async def test(db):
+        up = await db.calibrations_upload("h", "first", [cal])
+        assert up["status"] == "ok"
+        await asyncio.gather(*(db.results_upload("h", f"sweep{i}", "", [res], runID=f"r{i}") for i in range(3)))
+
+        notes, filename, _, data = await db.calibrations_download("h")
+        assert notes == "first" and filename == "calibration_bundle.zip"
+        assert zipfile.ZipFile(io.BytesIO(data)).read("calibration.json") == b'{"qubits": [0, 1]}' * 100
+
+        buf = io.BytesIO()
+        meta = await db.results_download_to("h", "sweep1", buf)
+        assert meta[3] == "r1"
+        assert zipfile.ZipFile(buf).read("results.json") == b'{"fidelity": 0.99}'
+
+        dest = tmp_path / "out" / "cal.zip"
+        assert (await db.calibrations_download_to("h", dest))[0] == "first"
+        assert dest.read_bytes() == data
+        assert not (tmp_path / "out" / "cal.zip.part").exists()
+
+        assert [c["hashID"] for c in await db.calibrations_list()] == ["h"]
+        assert (await db.calibrations_get_latest())["notes"] == "first"
+        rows = await db.results_list("h")
+        assert sorted((r["name"], r["run_id"]) for r in rows) == [(f"sweep{i}", f"r{i}") for i in range(3)]
+        # columnar pages are turned back into rows with str(datetime) timestamps
+        assert all(datetime.fromisoformat(r["created_at"]) for r in rows)
+
+    _run(app, test)
+
+
+def test_identical_upload_is_sent_by_reference(app, tmp_path):
+    res = _write(tmp_path, "results.json", b'{"fidelity": 0.99}')
+    seen = []
+
+    async def test(db):
+        db._http.event_hooks["request"].append(lambda req: _record(seen, req))
+        first = await db.results_upload("h", "sweep", "", [res], runID="r1")
+        seen.clear()
+        second = await db.results_upload("h", "sweep", "", [res], runID="r2")
+        assert second["id"] != first["id"]
+        assert [content_type.split(";")[0] for content_type in seen] == ["application/x-www-form-urlencoded"]
+
+    _run(app, test)
+
+
+async def _record(seen, request):
+    seen.append(request.headers.get("Content-Type", ""))
+
+
+def test_errors_raise_http_error(app, tmp_path):
+    async def test(db):
+        with pytest.raises(requests.HTTPError, match="404"):
+            await db.calibrations_download("missing")
+        with pytest.raises(requests.HTTPError, match="hashID is required"):
+            await db.calibrations_upload("", "", [_write(tmp_path, "c.json", b"{}")])
+        assert await db.calibrations_get_latest() == {}
+
+    _run(app, test)
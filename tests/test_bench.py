@@ -0,0 +1,27 @@
+import json
+import pytest
+from benchmarks import bench
+
+
+def test_smoke_run_with_tiny_sizes(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    report = bench.main(["--calibrations", "3", "--results", "20", "--bestruns", "5", "--archive-size", "2048",
+                         "--distinct-archives", "2", "-c", "2", "-n", "4", "-o", str(out),
+                         "--scenarios", ",".join(bench.SCENARIOS)])
+    assert json.loads(out.read_text()) == report
+    assert report["meta"]["database"] == "sqlite (temporary)"
+    assert report["meta"]["params"]["results"] == 20
+    assert list(report["scenarios"]) == list(bench.SCENARIOS)
+    for name, r in report["scenarios"].items():
+        assert r["errors"] == {}, name
+        assert r["requests"] == 4 and r["concurrency"] == 2
+        assert r["throughput_rps"] > 0 and r["latency_ms"]["p50"] <= r["latency_ms"]["max"]
+    # progress goes to stderr, stdout stays empty when writing to a file
+    captured = capsys.readouterr()
+    assert captured.out == "" and "member" in captured.err
+
+
+def test_unknown_scenarios_are_rejected(capsys):
+    with pytest.raises(SystemExit):
+        bench.main(["--scenarios", "latest,nope"])
+    assert "unknown scenario(s): nope" in capsys.readouterr().err
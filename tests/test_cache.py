@@ -0,0 +1,105 @@
+import sqlite3
+import pytest
+from server.app import create_app
+from server.cache import MemoryCache, SqliteCache
+from conftest import TOKEN
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cached_cfg(request, cfg, tmp_path):
+    cfg.CACHE_BACKEND = request.param
+    cfg.CACHE_PATH = str(tmp_path / "cache.sqlite")
+    cfg.CACHE_TTL = 60.0
+    return cfg
+
+
+def _client(cfg):
+    c = create_app(cfg).test_client()
+    c.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {TOKEN}"
+    return c
+
+
+@pytest.fixture
+def client(cached_cfg):
+    return _client(cached_cfg)
+
+
+def _db_execute(cfg, sql, *args):
+    """Change rows behind the app's back, so only a cache miss can see it."""
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        db.execute(sql, args)
+
+
+def _latest_notes(client):
+    r = client.get("/calibrations/latest")
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["notes"]
+
+
+def _best_run(client):
+    r = client.get("/bestruns/get")
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["run_id"]
+
+
+def _set_best_run(client, run_id):
+    assert client.post("/bestruns/set", json={"calibrationHashID": "h", "runID": run_id}).status_code == 200
+
+
+def test_latest_calibration_is_served_from_cache_until_an_upload(cached_cfg, client, upload_calibration):
+    upload_calibration("h1", {"c.json": b"1"}, notes="first")
+    assert _latest_notes(client) == "first"
+    _db_execute(cached_cfg, "UPDATE calibrations SET notes = 'edited'")
+    assert _latest_notes(client) == "first"
+
+    upload_calibration("h2", {"c.json": b"2"}, notes="second")
+    assert _latest_notes(client) == "second"
+
+
+def test_best_run_is_served_from_cache_until_set(cached_cfg, client):
+    _set_best_run(client, "r1")
+    assert _best_run(client) == "r1"
+    _db_execute(cached_cfg, "UPDATE bestruns SET run_id = 'edited'")
+    assert _best_run(client) == "r1"
+    assert [i["run_id"] for i in client.get("/bestruns/list", query_string={"limit": 5}).get_json()["items"]] == ["edited"]
+
+    _set_best_run(client, "r2")
+    assert _best_run(client) == "r2"
+
+
+def test_misses_are_not_cached(client):
+    assert client.get("/bestruns/get").status_code == 404
+    _set_best_run(client, "r1")
+    assert _best_run(client) == "r1"
+
+
+def test_sqlite_cache_is_shared_between_processes(cfg, tmp_path):
+    cfg.CACHE_BACKEND, cfg.CACHE_PATH, cfg.CACHE_TTL = "sqlite", str(tmp_path / "cache.sqlite"), 60.0
+    # two apps stand in for two worker processes on the same host
+    first, second = _client(cfg), _client(cfg)
+    _set_best_run(first, "r1")
+    assert _best_run(first) == "r1"
+    _db_execute(cfg, "UPDATE bestruns SET run_id = 'edited'")
+    assert _best_run(second) == "r1"
+    _set_best_run(first, "r2")
+    assert _best_run(second) == "r2"
+
+
+@pytest.mark.parametrize("make", [lambda tmp: MemoryCache(60), lambda tmp: SqliteCache(str(tmp / "c.sqlite"), 60)])
+def test_load_racing_an_invalidation_is_not_stored(tmp_path, make):
+    cache = make(tmp_path)
+
+    def stale_load():
+        cache.invalidate("bestruns")  # a write commits while the value is loaded
+        return {"run_id": "stale"}
+
+    assert cache.get_or_load("bestruns:get", stale_load) == {"run_id": "stale"}
+    assert cache.get_or_load("bestruns:get", lambda: {"run_id": "fresh"}) == {"run_id": "fresh"}
+    assert cache.get_or_load("bestruns:get", lambda: {"run_id": "later"}) == {"run_id": "fresh"}
+
+
+@pytest.mark.parametrize("make", [lambda tmp: MemoryCache(0), lambda tmp: SqliteCache(str(tmp / "c.sqlite"), 0)])
+def test_entries_expire_after_the_ttl(tmp_path, make):
+    cache = make(tmp_path)
+    cache.get_or_load("calibrations:latest", lambda: ["old"])
+    assert cache.get_or_load("calibrations:latest", lambda: ["new"]) == ["new"]
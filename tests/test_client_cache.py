@@ -0,0 +1,123 @@
+import hashlib, io, os, zipfile
+import pytest
+from client.cache import ArchiveCache
+from client.client import QiboDBClient
+from conftest import TOKEN, make_zip
+
+BLOB = 10_000
+
+
+def _blob(i: int) -> bytes:
+    return bytes([i]) * BLOB
+
+
+def _age(cache, sha256, seconds_ago):
+    path = cache.root / "blobs" / f"{sha256}.zip"
+    t = path.stat().st_mtime - seconds_ago
+    os.utime(path, (t, t))
+
+
+def _cached_bytes(cache):
+    return sum(size for _mtime, size, _path in cache._entries())
+
+
+def test_put_blob_is_content_addressed(tmp_path):
+    cache = ArchiveCache(str(tmp_path), max_bytes=10 * BLOB)
+    sha256 = cache.put_blob(iter([_blob(1)[:100], _blob(1)[100:]]))
+    assert sha256 == hashlib.sha256(_blob(1)).hexdigest()
+    with cache.open_blob(sha256) as f:
+        assert f.read() == _blob(1)
+    assert cache.put_blob([_blob(1)]) == sha256
+    assert _cached_bytes(cache) == BLOB
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        cache.put_blob([_blob(2)], expected_sha256=sha256)
+    assert not any((cache.root / "tmp").iterdir())
+    assert _cached_bytes(cache) == BLOB
+
+
+def test_least_recently_used_blobs_are_evicted_to_fit_the_budget(tmp_path):
+    cache = ArchiveCache(str(tmp_path), max_bytes=int(2.5 * BLOB))
+    first, second = cache.put_blob([_blob(1)]), cache.put_blob([_blob(2)])
+    _age(cache, first, 20)
+    _age(cache, second, 10)
+    cache.open_blob(first).close()  # reading marks it as recently used
+
+    third = cache.put_blob([_blob(3)])
+    assert _cached_bytes(cache) <= cache.max_bytes
+    with pytest.raises(FileNotFoundError):
+        cache.open_blob(second)
+    for sha256 in (first, third):
+        cache.open_blob(sha256).close()
+
+
+def test_newest_entry_is_kept_even_if_it_alone_exceeds_the_budget(tmp_path):
+    cache = ArchiveCache(str(tmp_path), max_bytes=BLOB // 2)
+    old = cache.put_blob([_blob(1)])
+    new = cache.put_blob([_blob(2)])
+    cache.open_blob(new).close()
+    with pytest.raises(FileNotFoundError):
+        cache.open_blob(old)
+    assert _cached_bytes(cache) == BLOB
+
+
+def test_extracted_trees_count_towards_the_budget(tmp_path):
+    archive = make_zip({"a.bin": _blob(1), "sub/b.bin": _blob(2)})
+    cache = ArchiveCache(str(tmp_path), max_bytes=10 * BLOB)
+    sha256 = cache.put_blob([archive])
+    target = cache.extracted(sha256)
+    assert (target / "sub" / "b.bin").read_bytes() == _blob(2)
+    assert cache.extracted(sha256) == target
+    assert _cached_bytes(cache) == len(archive) + 2 * BLOB
+
+    cache.max_bytes = 2 * BLOB + 1
+    cache.evict(keep=target)
+    # the blob was the least recently used entry
+    assert not (cache.root / "blobs" / f"{sha256}.zip").exists() and target.exists()
+
+
+def test_refs_are_dropped_with_their_blob(tmp_path):
+    cache = ArchiveCache(str(tmp_path), max_bytes=10 * BLOB)
+    sha256 = cache.put_blob([_blob(1)])
+    key = ArchiveCache.ref_key("http://server", "/calibrations/download/raw", {"hashID": "h"})
+    cache.put_ref(key, {"etag": '"x"', "sha256": sha256, "meta": {}})
+    assert cache.get_ref(key)["sha256"] == sha256
+    cache.clear()
+    assert cache.get_ref(key) is None
+
+
+@pytest.fixture
+def cached_db(live_server, tmp_path):
+    with QiboDBClient(live_server, TOKEN, max_retries=0, cache_dir=str(tmp_path / "client_cache")) as c:
+        statuses = []
+        c.session.hooks["response"].append(lambda r, *args, **kwargs: statuses.append(r.status_code))
+        yield c, statuses
+
+
+def test_repeat_downloads_revalidate_and_use_the_cached_copy(cached_db, upload_calibration):
+    db, statuses = cached_db
+    upload_calibration("h", {"c.json": b'{"qubits": [0, 1]}' * 100}, notes="first")
+
+    notes, _, _, data = db.calibrations_download("h")
+    assert notes == "first" and zipfile.ZipFile(io.BytesIO(data)).read("c.json")
+    assert statuses == [200]
+
+    again = db.calibrations_download("h")
+    assert again[0] == "first" and again[3] == data
+    assert statuses == [200, 304]
+    assert [p.name for p in (db.cache.root / "blobs").iterdir()] == [f"{hashlib.sha256(data).hexdigest()}.zip"]
+
+    upload_calibration("h", {"c.json": b"{}"}, notes="second")
+    newer = db.calibrations_download("h")
+    assert newer[0] == "second" and newer[3] != data
+    assert statuses == [200, 304, 200]
+
+
+def test_unpack_reuses_the_extracted_archive(cached_db, upload_calibration, tmp_path):
+    db, statuses = cached_db
+    upload_calibration("h", {"c.json": b"{}", "sub/p.json": b"[]"})
+    db.calibrations_unpack("h", str(tmp_path / "one"))
+    db.calibrations_unpack("h", str(tmp_path / "two"), link=False)
+    assert statuses == [200, 304]
+    assert (tmp_path / "one" / "sub" / "p.json").read_bytes() == (tmp_path / "two" / "sub" / "p.json").read_bytes() == b"[]"
+    assert len(list((db.cache.root / "extracted").iterdir())) == 1
@@ -0,0 +1,99 @@
+import json, threading
+import pytest
+import requests
+from werkzeug.serving import make_server
+from client import client as client_module
+from client.client import QiboDBClient
+from conftest import TOKEN
+
+
+class _Flaky:
+    """WSGI app answering 503 to the first `failures` requests, then a best run."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.hits = []
+
+    def __call__(self, environ, start_response):
+        self.hits.append((environ["REQUEST_METHOD"], environ["PATH_INFO"]))
+        if len(self.hits) <= self.failures:
+            start_response("503 Service Unavailable", [("Content-Type", "application/json")])
+            return [b'{"status": "error", "error": "busy"}']
+        body = {"status": "ok", "id": 1, "calibration_hash_id": "h", "run_id": "r1", "created_at": "now"}
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [json.dumps(body).encode()]
+
+
+@pytest.fixture
+def flaky():
+    """Start a `_Flaky` server; yields a factory returning (app, base URL)."""
+    servers = []
+
+    def start(failures: int):
+        app = _Flaky(failures)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return app, f"http://127.0.0.1:{server.server_port}"
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_idempotent_requests_are_retried(flaky):
+    app, url = flaky(failures=2)
+    with QiboDBClient(url, TOKEN, max_retries=3, backoff_factor=0) as db:
+        assert db.get_best_run() == ("h", "r1", "now")
+    assert app.hits == [("GET", "/bestruns/get")] * 3
+
+
+def test_retries_are_bounded_and_can_be_disabled(flaky):
+    app, url = flaky(failures=5)
+    with QiboDBClient(url, TOKEN, max_retries=2, backoff_factor=0) as db:
+        with pytest.raises(requests.HTTPError, match="503"):
+            db.get_best_run()
+    assert len(app.hits) == 3
+
+    app, url = flaky(failures=1)
+    with QiboDBClient(url, TOKEN, max_retries=0) as db:
+        with pytest.raises(requests.HTTPError, match="503"):
+            db.get_best_run()
+    assert len(app.hits) == 1
+
+
+def test_posts_are_not_retried(flaky):
+    app, url = flaky(failures=1)
+    with QiboDBClient(url, TOKEN, max_retries=3, backoff_factor=0) as db:
+        with pytest.raises(requests.HTTPError, match="503"):
+            db.set_best_run("h", "r1")
+    assert app.hits == [("POST", "/bestruns/set")]
+
+
+def test_consecutive_calls_reuse_one_connection(db, client):
+    client.post("/bestruns/set", json={"calibrationHashID": "h", "runID": "r1"})
+    for _ in range(5):
+        assert db.get_best_run()[:2] == ("h", "r1")
+        db.calibrations_list()
+    pools = list(db.session.get_adapter(db.server_url).poolmanager.pools._container.values())
+    assert len(pools) == 1
+    assert pools[0].num_connections == 1
+    assert pools[0].num_requests == 10
+    assert db.session.headers["Authorization"] == f"Bearer {TOKEN}"
+
+
+def test_module_functions_share_a_client_per_server(tmp_path, monkeypatch):
+    config = tmp_path / "client.json"
+    monkeypatch.setenv("QIBO_CLIENT_CONFIG", str(config))
+    monkeypatch.setattr(client_module, "CFG_PATHS", [config])
+    monkeypatch.setattr(client_module, "_SHARED_CLIENTS", {})
+
+    client_module.set_server("http://one.example/", "t1")
+    shared = client_module.get_client()
+    assert shared is client_module.get_client()
+    assert (shared.server_url, shared.api_token) == ("http://one.example", "t1")
+    assert client_module.get_client("http://two.example") is not shared
+
+    # new defaults replace the clients that cached the old ones
+    client_module.set_server("http://three.example")
+    assert client_module.get_client() is not shared
+    assert client_module.get_client().server_url == "http://three.example"
@@ -0,0 +1,89 @@
+import gzip, json
+import pytest
+from server.compression import available_encodings
+from conftest import TOKEN
+
+# a listing page comfortably above COMPRESS_MIN_SIZE
+CALIBRATIONS = 30
+
+
+@pytest.fixture
+def listing(client, upload_calibration):
+    for i in range(CALIBRATIONS):
+        upload_calibration(f"h{i}", {"c.json": b"%d" % i}, notes="a fairly long note " * 3)
+
+    def get(fmt="json", **headers):
+        return client.get("/calibrations/list", query_string={"limit": 50, "format": fmt}, headers=headers)
+    return get
+
+
+def test_gzip_when_accepted(listing):
+    plain = listing(**{"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.data) >= 1024
+
+    r = listing(**{"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert len(r.data) < len(plain.data)
+    assert json.loads(gzip.decompress(r.data)) == plain.get_json()
+
+
+def test_zstd_is_preferred_when_available(listing):
+    zstandard = pytest.importorskip("zstandard")
+    plain = listing(**{"Accept-Encoding": "identity"})
+    r = listing(**{"Accept-Encoding": "gzip, zstd"})
+    assert r.headers["Content-Encoding"] == "zstd"
+    assert json.loads(zstandard.ZstdDecompressor().decompress(r.data)) == plain.get_json()
+    # a zero quality refuses the encoding
+    assert listing(**{"Accept-Encoding": "zstd;q=0, gzip"}).headers["Content-Encoding"] == "gzip"
+
+
+def test_configured_encodings_limit_the_choice(cfg, listing):
+    from server.app import create_app
+    cfg.RESPONSE_ENCODINGS = "none"
+    client = create_app(cfg).test_client()
+    r = client.get("/calibrations/list", query_string={"limit": 50},
+                   headers={"Accept-Encoding": "gzip, zstd", "Authorization": f"Bearer {TOKEN}"})
+    assert r.status_code == 200 and "Content-Encoding" not in r.headers
+    with pytest.raises(ValueError):
+        available_encodings("gzip,brotli")
+
+
+def test_small_bodies_are_sent_as_they_are(client, upload_calibration):
+    upload_calibration("h", {"c.json": b"{}"})
+    r = client.get("/calibrations/latest", headers={"Accept-Encoding": "gzip"})
+    assert len(r.data) < 1024
+    assert "Content-Encoding" not in r.headers
+    # caches still need to know the representation depends on the header
+    assert "Accept-Encoding" in r.headers["Vary"]
+
+
+def test_etag_is_weakened_when_compressed(client, upload_calibration):
+    upload_calibration("h", {"c.json": b"{}"}, notes="x" * 2000)
+    plain = client.get("/calibrations/latest")
+    r = client.get("/calibrations/latest", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert r.headers["ETag"] == "W/" + plain.headers["ETag"]
+    # revalidation matches either form
+    assert client.get("/calibrations/latest", headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["ETag"]}).status_code == 304
+
+
+@pytest.mark.parametrize("headers", [{}, {"Range": "bytes=0-99"}])
+def test_archives_are_never_compressed(client, upload_calibration, headers):
+    upload_calibration("h", {"c.json": b'{"qubits": [0, 1, 2]}' * 500})
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"},
+                   headers={"Accept-Encoding": "gzip, zstd", **headers})
+    assert r.status_code == (206 if headers else 200)
+    assert "Content-Encoding" not in r.headers
+    assert r.headers["Content-Type"] == "application/zip"
+    assert "Accept-Encoding" not in r.headers.get("Vary", "")
+
+
+def test_msgpack_pages_are_compressed(listing):
+    msgpack = pytest.importorskip("msgpack")
+    plain = listing("msgpack", **{"Accept-Encoding": "identity"})
+    r = listing("msgpack", **{"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Type"] == plain.headers["Content-Type"]
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert msgpack.unpackb(gzip.decompress(r.data)) == msgpack.unpackb(plain.data)
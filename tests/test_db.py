@@ -0,0 +1,75 @@
+import threading
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from server.config import Config
+from server.db import make_engine
+
+
+def _pragmas(engine) -> dict:
+    with engine.connect() as conn:
+        return {name: conn.execute(text(f"PRAGMA {name}")).scalar()
+                for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store")}
+
+
+def test_tuned_sqlite_pragmas(cfg):
+    engine = make_engine(cfg.DB_URI, echo=False, cfg=cfg)
+    assert _pragmas(engine) == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": cfg.SQLITE_BUSY_TIMEOUT,
+        "mmap_size": cfg.SQLITE_MMAP_SIZE,
+        "cache_size": -cfg.SQLITE_CACHE_SIZE,
+        "temp_store": 2,  # MEMORY
+    }
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == cfg.DB_POOL_SIZE
+
+
+def test_pragmas_apply_to_every_pooled_connection(cfg):
+    cfg.SQLITE_SYNCHRONOUS, cfg.SQLITE_BUSY_TIMEOUT = "FULL", 1234
+    engine = make_engine(cfg.DB_URI, echo=False, cfg=cfg)
+    with engine.connect() as first, engine.connect() as second:
+        for conn in (first, second):
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 2
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+
+
+def test_wal_lets_readers_proceed_during_a_write(cfg):
+    engine = make_engine(cfg.DB_URI, echo=False, cfg=cfg)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    with engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("INSERT INTO t VALUES (2)"))
+        result = []
+
+        def read():
+            with engine.connect() as conn:
+                result.append(conn.execute(text("SELECT count(*) FROM t")).scalar())
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(2)
+        # the reader sees the last committed state instead of waiting for the lock
+        assert result == [1]
+        writer.execute(text("COMMIT"))
+
+
+def test_plain_profile_keeps_sqlite_defaults(cfg):
+    cfg.DB_PROFILE = "plain"
+    assert _pragmas(make_engine(cfg.DB_URI, echo=False, cfg=cfg))["journal_mode"] == "delete"
+
+
+def test_in_memory_databases_are_not_pooled():
+    engine = make_engine("sqlite://", echo=False, cfg=Config())
+    assert _pragmas(engine)["journal_mode"] == "memory"
+
+
+@pytest.mark.parametrize("field,value", [
+    ("DB_PROFILE", "fast"), ("SQLITE_JOURNAL_MODE", "wal; DROP TABLE x"), ("SQLITE_SYNCHRONOUS", "SOMETIMES"),
+])
+def test_invalid_settings_are_rejected(cfg, field, value):
+    setattr(cfg, field, value)
+    with pytest.raises(ValueError):
+        make_engine(cfg.DB_URI, echo=False, cfg=cfg)
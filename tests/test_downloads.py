@@ -0,0 +1,104 @@
+import hashlib
+
+FILES = {"calibration.json": b'{"qubits": [0, 1, 2]}' * 200, "parameters.json": b'{"t1": 1e-5}'}
+
+
+def test_raw_download_etag_is_content_hash(client, upload_calibration):
+    upload_calibration("h", FILES, notes="first")
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"})
+    assert r.status_code == 200
+    assert r.headers["ETag"] == f'"{hashlib.sha256(r.data).hexdigest()}"'
+    assert r.headers["X-Qibo-Sha256"] == hashlib.sha256(r.data).hexdigest()
+
+
+def test_if_none_match_answers_304_with_metadata(client, upload_calibration):
+    upload_calibration("h", FILES, notes="first")
+    etag = client.get("/calibrations/download/raw", query_string={"hashID": "h"}).headers["ETag"]
+
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"}, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.data == b""
+    assert r.headers["ETag"] == etag
+    assert r.headers["X-Qibo-Notes"] == "first"
+
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"}, headers={"If-None-Match": '"other"'})
+    assert r.status_code == 200 and r.data
+
+
+def test_new_upload_changes_etag(client, upload_calibration):
+    upload_calibration("h", FILES)
+    etag = client.get("/calibrations/download/raw", query_string={"hashID": "h"}).headers["ETag"]
+    upload_calibration("h", {**FILES, "extra.json": b"{}"})
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"}, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+def test_result_download_revalidates(client, upload_result):
+    upload_result("h", "sweep", FILES, run_id="r1")
+    params = {"hashID": "h", "name": "sweep", "runID": "r1"}
+    etag = client.get("/results/download/raw", query_string=params).headers["ETag"]
+    assert client.get("/results/download/raw", query_string=params, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_latest_and_bestruns_revalidate(client, upload_calibration):
+    upload_calibration("h1", FILES)
+    latest = client.get("/calibrations/latest")
+    assert client.get("/calibrations/latest", headers={"If-None-Match": latest.headers["ETag"]}).status_code == 304
+    upload_calibration("h2", FILES)
+    r = client.get("/calibrations/latest", headers={"If-None-Match": latest.headers["ETag"]})
+    assert r.status_code == 200 and r.get_json()["hashID"] == "h2"
+
+    assert client.post("/bestruns/set", json={"calibrationHashID": "h2", "runID": "r1"}).status_code == 200
+    best = client.get("/bestruns/get")
+    assert client.get("/bestruns/get", headers={"If-None-Match": best.headers["ETag"]}).status_code == 304
+    listing = client.get("/bestruns/list")
+    assert client.get("/bestruns/list", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+
+
+def _full(client):
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"})
+    return r.data, r.headers["ETag"]
+
+
+def _ranged(client, range_header, **headers):
+    return client.get("/calibrations/download/raw", query_string={"hashID": "h"},
+                      headers={"Range": range_header, **headers})
+
+
+def test_range_returns_partial_content(client, upload_calibration):
+    upload_calibration("h", FILES)
+    data, _etag = _full(client)
+    for header, expected in (("bytes=10-19", data[10:20]), (f"bytes={len(data) - 5}-", data[-5:]),
+                             ("bytes=-7", data[-7:]), ("bytes=0-999999", data)):
+        r = _ranged(client, header)
+        assert r.status_code == 206, header
+        assert r.data == expected, header
+        start = len(data) - len(expected) if header.startswith("bytes=-") else int(header[6:].split("-")[0])
+        assert r.headers["Content-Range"] == f"bytes {start}-{start + len(expected) - 1}/{len(data)}"
+
+
+def test_suffix_range_longer_than_archive_returns_everything(client, upload_calibration):
+    upload_calibration("h", FILES)
+    data, _etag = _full(client)
+    r = _ranged(client, f"bytes=-{len(data) * 10}")
+    assert r.status_code == 206
+    assert r.data == data
+    assert r.headers["Content-Range"] == f"bytes 0-{len(data) - 1}/{len(data)}"
+
+
+def test_unsatisfiable_range_is_416(client, upload_calibration):
+    upload_calibration("h", FILES)
+    data, _etag = _full(client)
+    r = _ranged(client, f"bytes={len(data)}-")
+    assert r.status_code == 416
+    assert r.headers["Content-Range"] == f"bytes */{len(data)}"
+
+
+def test_multiple_ranges_and_stale_if_range_send_the_whole_archive(client, upload_calibration):
+    upload_calibration("h", FILES)
+    data, etag = _full(client)
+    assert _ranged(client, "bytes=0-1,5-6").data == data
+    assert _ranged(client, "bytes=0-9", **{"If-Range": etag}).status_code == 206
+    r = _ranged(client, "bytes=0-9", **{"If-Range": '"stale"'})
+    assert r.status_code == 200 and r.data == data
@@ -0,0 +1,78 @@
+import threading, time
+import pytest
+
+
+def _poll(client, **params):
+    r = client.get("/events", query_string=params)
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()
+
+
+def _set_best_run(client, hash_id, run_id):
+    r = client.post("/bestruns/set", json={"calibrationHashID": hash_id, "runID": run_id})
+    assert r.status_code == 200, r.get_json()
+
+
+def test_pending_events_are_returned_immediately(client, upload_calibration):
+    head = _poll(client, timeout=0)["cursor"]
+    upload_calibration("h", {"c.json": b"{}"}, notes="fresh")
+    _set_best_run(client, "h", "r1")
+
+    start = time.monotonic()
+    body = _poll(client, since=head, timeout=30)
+    assert time.monotonic() - start < 5
+    assert [(e["type"], e.get("hashID") or e.get("calibration_hash_id")) for e in body["events"]] == [
+        ("bestrun", "h"), ("calibration", "h"),
+    ]
+    assert body["events"][0]["run_id"] == "r1"
+    assert body["events"][1]["notes"] == "fresh"
+    assert body["cursor"] == body["events"][-1]["cursor"]
+
+
+def test_timeout_returns_an_empty_batch(client, upload_calibration):
+    upload_calibration("h", {"c.json": b"{}"})
+    start = time.monotonic()
+    body = _poll(client, timeout=0.3)
+    assert time.monotonic() - start >= 0.3
+    # without `since` the poll starts from now, so earlier rows are not replayed
+    assert body["events"] == []
+    assert _poll(client, since=body["cursor"], timeout=0)["cursor"] == body["cursor"]
+
+
+def test_cursor_resumes_after_the_last_seen_event(client, upload_calibration):
+    cursor = _poll(client, timeout=0)["cursor"]
+    upload_calibration("h1", {"c.json": b"1"})
+    first = _poll(client, since=cursor, timeout=0)
+    assert [e["hashID"] for e in first["events"]] == ["h1"]
+
+    upload_calibration("h2", {"c.json": b"2"})
+    _set_best_run(client, "h2", "r2")
+    second = _poll(client, since=first["cursor"], timeout=0)
+    assert [e["type"] for e in second["events"]] == ["bestrun", "calibration"]
+    assert second["events"][1]["hashID"] == "h2"
+    # resuming from an event's own cursor skips it and everything before it
+    resumed = _poll(client, since=second["events"][0]["cursor"], timeout=0)
+    assert [e["type"] for e in resumed["events"]] == ["calibration"]
+    assert _poll(client, since=second["cursor"], timeout=0)["events"] == []
+
+
+def test_write_wakes_a_waiting_poll(client, upload_calibration):
+    cursor = _poll(client, timeout=0)["cursor"]
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(_poll(client, since=cursor, timeout=30, types="bestrun")))
+    start = time.monotonic()
+    waiter.start()
+    time.sleep(0.2)
+    upload_calibration("h", {"c.json": b"{}"})  # filtered out, keeps waiting
+    _set_best_run(client, "h", "r1")
+    waiter.join(10)
+    assert not waiter.is_alive()
+    assert time.monotonic() - start < 10
+    assert [e["run_id"] for e in result["events"]] == ["r1"]
+
+
+@pytest.mark.parametrize("params", [{"since": "bogus"}, {"timeout": "soon"}, {"types": "bestrun,upload"}])
+def test_malformed_arguments_are_rejected(client, params):
+    r = client.get("/events", query_string=params)
+    assert r.status_code == 400
+    assert r.get_json()["status"] == "error"
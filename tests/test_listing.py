@@ -0,0 +1,134 @@
+import sqlite3
+import pytest
+from client.client import _iter_rows
+
+
+def _pages(client, path, **params):
+    """Follow next_cursor through every page; returns the list of pages' items."""
+    pages, cursor = [], None
+    while True:
+        r = client.get(path, query_string={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.get_json()
+        body = r.get_json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def _set_created_at(cfg, table: str, row_id: int, value: str) -> None:
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        db.execute(f"UPDATE {table} SET created_at = ? WHERE id = ?", (value, row_id))
+
+
+def test_calibration_pages_cover_every_row_once_newest_first(client, upload_calibration):
+    # uploads within the same second tie on created_at; the id breaks the tie
+    ids = [upload_calibration(f"h{i}", {"c.json": b"%d" % i})["id"] for i in range(7)]
+    pages = _pages(client, "/calibrations/list", limit=3)
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert [item["id"] for page in pages for item in page] == sorted(ids, reverse=True)
+
+
+def test_cursor_is_stable_when_rows_are_added(client, upload_calibration):
+    for i in range(4):
+        upload_calibration(f"h{i}", {"c.json": b"%d" % i})
+    first = client.get("/calibrations/list", query_string={"limit": 2}).get_json()
+    upload_calibration("newer", {"c.json": b"new"})
+    second = client.get("/calibrations/list", query_string={"limit": 2, "cursor": first["next_cursor"]}).get_json()
+    assert [i["hashID"] for i in first["items"] + second["items"]] == ["h3", "h2", "h1", "h0"]
+
+
+def test_result_pages_with_filters(client, upload_result):
+    for i in range(5):
+        upload_result("h", f"sweep-{i}", {"r.json": b"%d" % i}, run_id="a" if i % 2 else "b")
+    upload_result("h", "other", {"r.json": b"x"}, run_id="a")
+    upload_result("elsewhere", "sweep-9", {"r.json": b"y"})
+    pages = _pages(client, "/results/list", hashID="h", namePrefix="sweep-", runID="a", limit=1)
+    assert [item["name"] for page in pages for item in page] == ["sweep-3", "sweep-1"]
+
+
+def test_since_until_window(cfg, client, upload_calibration):
+    ids = [upload_calibration(f"h{i}", {"c.json": b"%d" % i})["id"] for i in range(3)]
+    for row_id, day in zip(ids, ("2024-01-01", "2024-02-01", "2024-03-01")):
+        _set_created_at(cfg, "calibrations", row_id, f"{day} 12:00:00")
+    items = client.get("/calibrations/list", query_string={
+        "since": "2024-01-15T00:00:00", "until": "2024-03-01T12:00:00",
+    }).get_json()["items"]
+    assert [i["id"] for i in items] == [ids[1]]
+    # timezone-aware bounds are compared in UTC
+    items = client.get("/calibrations/list", query_string={"since": "2024-03-01T13:00:00+02:00"}).get_json()["items"]
+    assert [i["id"] for i in items] == [ids[2]]
+
+
+@pytest.mark.parametrize("params", [{"cursor": "not-a-cursor"}, {"limit": "ten"}, {"since": "yesterday"}])
+def test_malformed_arguments_are_rejected(client, params):
+    r = client.get("/calibrations/list", query_string=params)
+    assert r.status_code == 400
+    assert r.get_json()["status"] == "error"
+
+
+def test_latest_breaks_created_at_ties_by_id(cfg, client, upload_calibration, upload_result):
+    cal_ids = [upload_calibration("h", {"c.json": b"%d" % i}, notes=f"cal{i}")["id"] for i in range(3)]
+    res_ids = [upload_result("h", "sweep", {"r.json": b"%d" % i}, run_id="r1", notes=f"res{i}")["id"] for i in range(3)]
+    for table, ids in (("calibrations", cal_ids), ("results", res_ids)):
+        for row_id in ids:
+            _set_created_at(cfg, table, row_id, "2024-01-01 12:00:00")
+
+    assert client.get("/calibrations/download/raw", query_string={"hashID": "h"}).headers["X-Qibo-Notes"] == "cal2"
+    assert client.post("/calibrations/download", json={"hashID": "h"}).get_json()["notes"] == "cal2"
+    for params in ({"hashID": "h", "name": "sweep"}, {"hashID": "h", "name": "sweep", "runID": "r1"}):
+        assert client.get("/results/download/raw", query_string=params).headers["X-Qibo-Notes"] == "res2"
+        assert client.post("/results/download", json=params).get_json()["notes"] == "res2"
+
+
+def _decode(r):
+    assert r.status_code == 200, r.data
+    if r.mimetype == "application/msgpack":
+        return pytest.importorskip("msgpack").unpackb(r.data, raw=False)
+    return r.get_json()
+
+
+@pytest.mark.parametrize("fmt", ["columns", "msgpack"])
+@pytest.mark.parametrize("path,params", [
+    ("/calibrations/list", {}),
+    ("/results/list", {"hashID": "h"}),
+    ("/bestruns/list", {}),
+])
+def test_compact_formats_decode_to_the_json_rows(cfg, client, upload_calibration, upload_result, fmt, path, params):
+    for i in range(5):
+        upload_calibration(f"h{i}", {"c.json": b"%d" % i}, notes=None if i == 2 else f"n{i}")
+        upload_result("h", f"sweep{i}", {"r.json": b"%d" % i}, run_id=None if i == 3 else f"r{i}")
+        client.post("/bestruns/set", json={"calibrationHashID": f"h{i}", "runID": f"r{i}"})
+    # a whole-second timestamp has no fractional part in str(datetime)
+    for table in ("calibrations", "results", "bestruns"):
+        _set_created_at(cfg, table, 1, "2024-01-01 12:00:00")
+
+    cursor = compact_cursor = None
+    while True:
+        page = _decode(client.get(path, query_string={**params, "limit": 2, **({"cursor": cursor} if cursor else {})}))
+        compact = _decode(client.get(path, query_string={
+            **params, "limit": 2, "format": fmt, **({"cursor": compact_cursor} if compact_cursor else {}),
+        }))
+        assert "items" not in compact
+        assert list(_iter_rows(compact)) == page["items"]
+        # /bestruns/list is a single, unpaginated page
+        assert compact.get("next_cursor") == page.get("next_cursor")
+        cursor = compact_cursor = page.get("next_cursor")
+        if not cursor:
+            break
+
+
+def test_unknown_format_is_rejected(client):
+    for path, params in (("/calibrations/list", {}), ("/results/list", {"hashID": "h"}), ("/bestruns/list", {})):
+        r = client.get(path, query_string={**params, "format": "xml"})
+        assert r.status_code == 400
+        assert "format must be one of" in r.get_json()["error"]
+
+
+def test_client_listings_match_the_json_rows(db, client, upload_calibration, upload_result):
+    for i in range(3):
+        upload_calibration(f"h{i}", {"c.json": b"%d" % i})
+        upload_result("h", f"sweep{i}", {"r.json": b"%d" % i}, run_id=f"r{i}")
+    # the client asks for msgpack (columns without msgpack) pages
+    assert db.calibrations_list() == client.get("/calibrations/list").get_json()["items"]
+    assert list(db.iter_results("h", page_size=2)) == client.get("/results/list", query_string={"hashID": "h"}).get_json()["items"]
@@ -0,0 +1,141 @@
+import hashlib, io, random, sqlite3, zipfile, zlib
+import pytest
+from server.storage import LocalBlobStore
+from conftest import make_zip
+
+BIG = random.Random(0).randbytes(200_000)
+
+
+def _archive() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("calibration.json", b'{"qubits": [0, 1, 2]}' * 100, compress_type=zipfile.ZIP_DEFLATED)
+        z.writestr("data/raw.bin", BIG, compress_type=zipfile.ZIP_STORED)
+        z.writestr("data/", b"")
+        z.writestr("notes.txt", b"tuned by hand", compress_type=zipfile.ZIP_DEFLATED)
+    return buf.getvalue()
+
+
+ARCHIVE = _archive()
+
+
+def _upload(client, path, data, **fields):
+    r = client.post(path, content_type="multipart/form-data",
+                    data={**fields, "archive": (io.BytesIO(data), "bundle.zip")})
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()
+
+
+def test_upload_indexes_the_central_directory(cfg, client):
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h")
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        rows = db.execute("SELECT sha256, position, name, size, crc32 FROM archive_members ORDER BY position").fetchall()
+    sha256 = hashlib.sha256(ARCHIVE).hexdigest()
+    assert [(s, p, n) for s, p, n, _size, _crc in rows] == [
+        (sha256, 0, "calibration.json"), (sha256, 1, "data/raw.bin"), (sha256, 2, "data/"), (sha256, 3, "notes.txt"),
+    ]
+    assert rows[1][3:] == (len(BIG), zlib.crc32(BIG))
+    # identical content is indexed once
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h2")
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        assert db.execute("SELECT count(*) FROM archive_members").fetchone() == (4,)
+
+
+def test_archives_without_rows_are_indexed_on_first_read(cfg, client):
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h")
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        db.execute("DELETE FROM archive_members")
+    r = client.get("/calibrations/member", query_string={"hashID": "h", "member": "notes.txt"})
+    assert r.data == b"tuned by hand"
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        assert db.execute("SELECT count(*) FROM archive_members").fetchone() == (4,)
+
+
+def test_calibration_members_and_member(client):
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h")
+    r = client.get("/calibrations/members", query_string={"hashID": "h"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["sha256"] == hashlib.sha256(ARCHIVE).hexdigest()
+    # directory entries are not listed
+    assert [m["name"] for m in body["members"]] == ["calibration.json", "data/raw.bin", "notes.txt"]
+    assert body["members"][1] == {"name": "data/raw.bin", "size": len(BIG), "compressed_size": len(BIG), "crc32": zlib.crc32(BIG)}
+    assert client.get("/calibrations/members", query_string={"hashID": "h"},
+                      headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+    r = client.get("/calibrations/member", query_string={"hashID": "h", "member": "calibration.json"})
+    assert r.status_code == 200
+    assert r.data == b'{"qubits": [0, 1, 2]}' * 100
+    assert r.mimetype == "application/json"
+    assert r.headers["Content-Length"] == str(len(r.data))
+    assert r.headers["X-Qibo-Crc32"] == f"{zlib.crc32(r.data):08x}"
+    assert client.get("/calibrations/member", query_string={"hashID": "h", "member": "calibration.json"},
+                      headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+    r = client.get("/calibrations/member", query_string={"hashID": "h", "member": "data/raw.bin"})
+    assert r.data == BIG and r.mimetype == "application/octet-stream"
+    assert r.headers["Content-Disposition"] == "inline; filename*=UTF-8''raw.bin"
+
+
+def test_only_the_members_bytes_are_read(client, monkeypatch):
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h")
+    read = []
+    iter_range = LocalBlobStore.iter_range
+
+    def recording(self, key, start, end, *args, **kwargs):
+        read.append(end - start)
+        return iter_range(self, key, start, end, *args, **kwargs)
+    monkeypatch.setattr(LocalBlobStore, "iter_range", recording)
+
+    r = client.get("/calibrations/member", query_string={"hashID": "h", "member": "notes.txt"})
+    assert r.data == b"tuned by hand"
+    assert 0 < sum(read) < len(BIG) // 10
+
+
+def test_result_members_follow_the_run(client):
+    _upload(client, "/results/upload", ARCHIVE, hashID="h", name="sweep", runID="r1")
+    _upload(client, "/results/upload", make_zip({"results.json": b"{}"}), hashID="h", name="sweep", runID="r2")
+    members = lambda **q: [m["name"] for m in client.get("/results/members", query_string={"hashID": "h", "name": "sweep", **q}).get_json()["members"]]
+    assert members() == ["results.json"]
+    assert members(runID="r1") == ["calibration.json", "data/raw.bin", "notes.txt"]
+    r = client.get("/results/member", query_string={"hashID": "h", "name": "sweep", "runID": "r1", "member": "notes.txt"})
+    assert r.data == b"tuned by hand" and r.mimetype == "text/plain"
+
+
+def test_non_zip_archives_answer_422(client):
+    _upload(client, "/calibrations/upload", b"plain bytes, not a zip", hashID="h")
+    _upload(client, "/results/upload", b"plain bytes, not a zip", hashID="h", name="raw")
+    for path, params in (
+        ("/calibrations/members", {"hashID": "h"}),
+        ("/calibrations/member", {"hashID": "h", "member": "x"}),
+        ("/results/members", {"hashID": "h", "name": "raw"}),
+        ("/results/member", {"hashID": "h", "name": "raw", "member": "x"}),
+    ):
+        r = client.get(path, query_string=params)
+        assert r.status_code == 422, path
+        assert r.get_json()["error"] == "archive is not a ZIP file"
+
+
+@pytest.mark.parametrize("path,params,status", [
+    ("/calibrations/member", {"hashID": "h", "member": "missing.json"}, 404),
+    ("/calibrations/member", {"hashID": "h", "member": "data/"}, 404),
+    ("/calibrations/member", {"hashID": "other", "member": "notes.txt"}, 404),
+    ("/calibrations/members", {"hashID": "other"}, 404),
+    ("/results/members", {"hashID": "h", "name": "missing"}, 404),
+    ("/calibrations/member", {"hashID": "h"}, 400),
+    ("/calibrations/members", {}, 400),
+    ("/results/members", {"hashID": "h"}, 400),
+    ("/results/member", {"hashID": "h", "name": "sweep"}, 400),
+])
+def test_missing_members_and_arguments(client, path, params, status):
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h")
+    assert client.get(path, query_string=params).status_code == status
+
+
+def test_client_member_helpers(db, client):
+    _upload(client, "/calibrations/upload", ARCHIVE, hashID="h")
+    _upload(client, "/results/upload", ARCHIVE, hashID="h", name="sweep", runID="r1")
+    assert [m["name"] for m in db.calibrations_list_members("h")] == ["calibration.json", "data/raw.bin", "notes.txt"]
+    assert db.calibrations_read_member("h", "data/raw.bin") == BIG
+    assert [m["name"] for m in db.results_list_members("h", "sweep", runID="r1")][-1] == "notes.txt"
+    assert db.results_read_member("h", "sweep", "notes.txt", runID="r1") == b"tuned by hand"
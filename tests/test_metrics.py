@@ -0,0 +1,86 @@
+import re
+import pytest
+import requests
+from server.app import create_app
+from conftest import TOKEN, make_zip
+
+
+def _samples(http, url):
+    """The scraped samples as {(name, labels): value}."""
+    r = http.get(url + "/metrics")
+    assert r.status_code == 200
+    assert r.headers["Content-Type"].startswith("text/plain")
+    samples = {}
+    for line in r.text.splitlines():
+        if line.startswith("#") or not line:
+            continue
+        m = re.fullmatch(r"(\w+)(?:\{(.*)\})? (\S+)", line)
+        assert m, line
+        labels = tuple(sorted(re.findall(r'(\w+)="([^"]*)"', m.group(2) or "")))
+        samples[m.group(1), labels] = float(m.group(3))
+    return samples
+
+
+def test_requests_are_counted_and_timed(live_server):
+    # a real server closes every response once it is sent, which is when metrics are recorded
+    http = requests.Session()
+    http.headers["Authorization"] = f"Bearer {TOKEN}"
+    archive = make_zip({"c.json": b'{"qubits": [0, 1]}' * 100})
+    r = http.post(live_server + "/calibrations/upload", data={"hashID": "h"}, files={"archive": ("c.zip", archive)})
+    assert r.status_code == 200
+    url = live_server + "/calibrations/download/raw"
+    for _ in range(3):
+        assert http.get(url, params={"hashID": "h"}).status_code == 200
+    assert http.get(url, params={"hashID": "missing"}).status_code == 404
+    http.get(live_server + "/no/such/route")
+    samples = _samples(http, live_server)
+
+    route = "/calibrations/download/raw"
+    assert samples["qibo_http_requests_total", (("method", "GET"), ("route", route), ("status", "200"))] == 3
+    assert samples["qibo_http_requests_total", (("method", "GET"), ("route", route), ("status", "404"))] == 1
+    assert samples["qibo_http_requests_total", (("method", "GET"), ("route", "unmatched"), ("status", "404"))] == 1
+    assert samples["qibo_http_requests_total", (("method", "POST"), ("route", "/calibrations/upload"), ("status", "200"))] == 1
+
+    # histogram: cumulative buckets ending in +Inf, which equals the count
+    labels = (("method", "GET"), ("route", route))
+    buckets = sorted(
+        (float(dict(k)["le"]), v) for (name, k), v in samples.items()
+        if name == "qibo_http_request_duration_seconds_bucket" and tuple(p for p in k if p[0] != "le") == labels
+    )
+    assert buckets[-1] == (float("inf"), 4)
+    assert all(a[1] <= b[1] for a, b in zip(buckets, buckets[1:]))
+    assert samples["qibo_http_request_duration_seconds_count", labels] == 4
+    assert samples["qibo_http_request_duration_seconds_sum", labels] > 0
+
+    assert samples["qibo_http_response_bytes_total", (("route", route),)] >= 3 * len(archive)
+    assert samples["qibo_http_request_bytes_total", (("route", "/calibrations/upload"),)] > len(archive)
+    assert samples["qibo_phase_duration_seconds_count", (("phase", "store"),)] == 1
+    assert samples["qibo_db_query_duration_seconds_count", (("operation", "SELECT"),)] >= 5
+    # the scrape itself is in flight
+    assert samples["qibo_http_requests_in_flight", ()] == 1
+
+
+def test_metrics_need_the_token_unless_public(cfg):
+    client = create_app(cfg).test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    cfg.METRICS_PUBLIC = True
+    assert create_app(cfg).test_client().get("/metrics").status_code == 200
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_server_timing_header(cfg, enabled):
+    cfg.SERVER_TIMING = enabled
+    client = create_app(cfg).test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {cfg.API_TOKEN}"
+    client.post("/bestruns/set", json={"calibrationHashID": "h", "runID": "r1"})
+    r = client.get("/bestruns/get")
+    assert r.status_code == 200
+    if not enabled:
+        assert "Server-Timing" not in r.headers
+        return
+    entries = dict(re.findall(r"(\w+);dur=([\d.]+)", r.headers["Server-Timing"]))
+    assert {"db", "app"} <= set(entries)
+    assert float(entries["db"]) <= float(entries["app"])
+    assert re.search(r'db;dur=[\d.]+;desc="\d+ quer', r.headers["Server-Timing"])
@@ -0,0 +1,126 @@
+import hashlib, sqlite3, sys
+import pytest
+from sqlalchemy import select
+from server import config as config_module
+from server.db import make_engine, make_session_factory
+from server.migrate import backfill_metadata, index_archives, main_cli, migrate_blobs, upgrade_schema
+from server.models import ArchiveMember, Base, Calibration, Result
+from server.storage import LocalBlobStore, blob_key
+from conftest import make_zip
+
+# the schema of databases created before the blob store, with archives inline
+BASELINE_SCHEMA = """
+CREATE TABLE calibrations (id INTEGER PRIMARY KEY AUTOINCREMENT, hash_id VARCHAR NOT NULL, notes VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP, filename VARCHAR NOT NULL, data BLOB NOT NULL);
+CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, hash_id VARCHAR NOT NULL, name VARCHAR NOT NULL,
+    run_id VARCHAR, notes VARCHAR, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, filename VARCHAR NOT NULL,
+    data BLOB NOT NULL);
+CREATE TABLE bestruns (id INTEGER PRIMARY KEY AUTOINCREMENT, calibration_hash_id VARCHAR NOT NULL,
+    run_id VARCHAR NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE INDEX ix_calibrations_hash_id ON calibrations (hash_id);
+CREATE INDEX ix_results_hash_id ON results (hash_id);
+"""
+
+CAL_ZIP = make_zip({"calibration.json": b'{"qubits": [0, 1]}' * 50, "params/t1.json": b"[1e-5]"})
+RES_ZIP = make_zip({"results.json": b'{"fidelity": 0.99}'})
+NOT_A_ZIP = b"not a zip archive"
+
+
+@pytest.fixture
+def baseline(cfg):
+    """A baseline database with inline archives; returns its path."""
+    path = cfg.DB_URI.removeprefix("sqlite:///")
+    with sqlite3.connect(path) as db:
+        db.executescript(BASELINE_SCHEMA)
+        db.execute("INSERT INTO calibrations (hash_id, notes, filename, data) VALUES ('h', 'old', 'c.zip', ?)", (CAL_ZIP,))
+        db.execute("INSERT INTO results (hash_id, name, run_id, filename, data) VALUES ('h', 'sweep', 'r1', 'r.zip', ?)", (RES_ZIP,))
+        db.execute("INSERT INTO results (hash_id, name, run_id, filename, data) VALUES ('h', 'raw', NULL, 'r.bin', ?)", (NOT_A_ZIP,))
+        # the same archive twice is stored and indexed once
+        db.execute("INSERT INTO results (hash_id, name, run_id, filename, data) VALUES ('h', 'sweep', 'r2', 'r.zip', ?)", (RES_ZIP,))
+    return path
+
+
+@pytest.fixture
+def engine(cfg, baseline):
+    engine = make_engine(cfg.DB_URI, echo=False, cfg=cfg)
+    with engine.begin() as conn:
+        Base.metadata.create_all(bind=conn)
+    upgrade_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+def _rows(engine):
+    with make_session_factory(engine)() as ses:
+        return [(r.sha256, r.size_bytes, r.storage_key) for model in (Calibration, Result)
+                for r in ses.execute(select(model).order_by(model.id)).scalars()]
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_backfill_fills_size_and_hash_of_inline_archives(engine):
+    assert _rows(engine) == [(None, None, None)] * 4
+    assert backfill_metadata(engine) == 4
+    assert _rows(engine) == [(_sha(d), len(d), None) for d in (CAL_ZIP, RES_ZIP, NOT_A_ZIP, RES_ZIP)]
+    assert backfill_metadata(engine) == 0
+
+
+def test_index_reads_inline_archives_after_backfill(engine, cfg):
+    store = LocalBlobStore(cfg.BLOB_ROOT)
+    # rows without a hash are skipped until backfilled
+    assert index_archives(engine, store) == (0, 0)
+    backfill_metadata(engine)
+    assert index_archives(engine, store) == (2, 1)
+    with make_session_factory(engine)() as ses:
+        names = ses.execute(select(ArchiveMember.name).where(ArchiveMember.sha256 == _sha(CAL_ZIP))
+                            .order_by(ArchiveMember.position)).scalars().all()
+    assert names == ["calibration.json", "params/t1.json"]
+    # indexed archives are not read again; the non-ZIP is retried and skipped
+    assert index_archives(engine, store) == (0, 1)
+
+
+def test_blobs_moves_inline_archives_into_the_store(engine, cfg, baseline):
+    store = LocalBlobStore(cfg.BLOB_ROOT)
+    assert migrate_blobs(engine, store, batch_size=2) == 4
+    assert _rows(engine) == [(_sha(d), len(d), blob_key(_sha(d))) for d in (CAL_ZIP, RES_ZIP, NOT_A_ZIP, RES_ZIP)]
+    for data in (CAL_ZIP, RES_ZIP, NOT_A_ZIP):
+        assert store.read_bytes(blob_key(_sha(data))) == data
+    with sqlite3.connect(baseline) as db:
+        assert db.execute("SELECT count(*) FROM results WHERE length(data) > 0").fetchone() == (0,)
+    assert migrate_blobs(engine, store) == 0
+
+
+def test_migrated_database_is_served_by_the_app(engine, cfg, client):
+    store = LocalBlobStore(cfg.BLOB_ROOT)
+    migrate_blobs(engine, store)
+    index_archives(engine, store)
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"})
+    assert r.data == CAL_ZIP and r.headers["X-Qibo-Notes"] == "old"
+    r = client.get("/calibrations/member", query_string={"hashID": "h", "member": "params/t1.json"})
+    assert r.data == b"[1e-5]"
+    r = client.get("/results/download/raw", query_string={"hashID": "h", "name": "sweep", "runID": "r1"})
+    assert r.data == RES_ZIP
+
+
+def test_inline_rows_are_served_before_migrating(engine, client):
+    r = client.get("/results/download/raw", query_string={"hashID": "h", "name": "raw"}, headers={"Range": "bytes=4-"})
+    assert r.status_code == 206 and r.data == NOT_A_ZIP[4:]
+
+
+def test_cli_runs_backfill_index_and_blobs(cfg, baseline, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(config_module, "SERVER_CFG_PATHS", [])
+    for name, value in (("QIBO_DB_URI", cfg.DB_URI), ("QIBO_BLOB_ROOT", cfg.BLOB_ROOT),
+                        ("QIBO_COLD_CACHE_DIR", cfg.COLD_CACHE_DIR), ("QIBO_BLOB_BACKEND", "local")):
+        monkeypatch.setenv(name, value)
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["qibodb-migrate", *args])
+        main_cli()
+        return capsys.readouterr().out
+
+    assert "Backfilled size/checksum for 4 row(s)." in run("backfill")
+    assert "Indexed 2 archive(s); 1 not a ZIP file." in run("index")
+    assert "Migrated 4 archive(s) to the local blob store." in run("blobs", "--vacuum")
+    assert LocalBlobStore(cfg.BLOB_ROOT).read_bytes(blob_key(_sha(CAL_ZIP))) == CAL_ZIP
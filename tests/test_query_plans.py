@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text
+from server.db import make_engine
+from server.migrate import MIGRATIONS, explain_hot_queries, hot_queries, schema_version, upgrade_schema
+from server.models import Base
+
+LEGACY_INDEXES = {
+    "ix_calibrations_hash_id": "calibrations (hash_id)",
+    "ix_results_hash_id": "results (hash_id)",
+    "ix_results_name": "results (name)",
+    "ix_results_run_id": "results (run_id)",
+}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'plans.db'}", echo=False)
+    with engine.begin() as conn:
+        Base.metadata.create_all(bind=conn)
+    upgrade_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+def _downgrade_to_legacy_indexes(engine) -> None:
+    """Replace the composite indexes with the single-column ones of databases created before migration 1."""
+    with engine.begin() as conn:
+        for (name,) in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'")).all():
+            conn.execute(text(f"DROP INDEX {name}"))
+        for name, target in LEGACY_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX {name} ON {target}"))
+        conn.execute(text("DELETE FROM schema_version"))
+
+
+def _assert_index_backed(report) -> None:
+    assert {name for name, _plan, _ok in report} == set(hot_queries())
+    for name, plan, ok in report:
+        assert "USE TEMP B-TREE" not in plan, f"{name} sorts in a temp b-tree:\n{plan}"
+        assert ok, f"{name} is not served by an index:\n{plan}"
+
+
+def test_fresh_database_serves_hot_queries_from_indexes(engine):
+    assert schema_version(engine) == MIGRATIONS[-1][0]
+    _assert_index_backed(explain_hot_queries(engine))
+
+
+def test_upgrade_adds_indexes_to_legacy_database(engine):
+    _downgrade_to_legacy_indexes(engine)
+    assert not all(ok for _name, _plan, ok in explain_hot_queries(engine))
+
+    assert upgrade_schema(engine) == [version for version, _description, _fn in MIGRATIONS]
+    _assert_index_backed(explain_hot_queries(engine))
+    with engine.connect() as conn:
+        names = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert not names & set(LEGACY_INDEXES)
+
+
+def test_upgrade_is_idempotent(engine):
+    assert upgrade_schema(engine) == []
+    _assert_index_backed(explain_hot_queries(engine))
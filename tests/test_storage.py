@@ -0,0 +1,145 @@
+import hashlib, io
+import pytest
+from server import storage
+from server.storage import LocalBlobStore, S3BlobStore, blob_key
+from conftest import make_zip
+
+DATA = bytes(range(256)) * 40
+
+
+class _ClientError(Exception):
+    """Shaped like botocore's ClientError: the HTTP status is in `response`."""
+
+    def __init__(self, status: int, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}
+
+
+class _Body:
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+        self.closed = False
+
+    def iter_chunks(self, chunk_size: int):
+        while chunk := self._stream.read(chunk_size):
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeS3:
+    """In-memory stand-in for the subset of the boto3 S3 client the store uses."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = 0
+
+    def _get(self, Bucket, Key):
+        try:
+            return self.objects[Bucket, Key]
+        except KeyError:
+            raise _ClientError(404, "NoSuchKey") from None
+
+    def upload_fileobj(self, f, bucket, key):
+        self.uploads += 1
+        self.objects[bucket, key] = f.read()
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self._get(Bucket, Key))}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self._get(Bucket, Key)
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            data = data[int(start):int(end) + 1]
+        return {"Body": _Body(data)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+@pytest.fixture
+def s3():
+    return FakeS3()
+
+
+@pytest.fixture(params=["local", "s3", "moto"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LocalBlobStore(str(tmp_path / "blobs"))
+    if request.param == "s3":
+        return S3BlobStore("bucket", prefix="archives/", client=request.getfixturevalue("s3"))
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    mock = moto.mock_aws()
+    mock.start()
+    request.addfinalizer(mock.stop)
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket="bucket")
+    return S3BlobStore("bucket", prefix="archives", client=client)
+
+
+def test_put_get_exists_delete(store):
+    info = store.put_chunks(iter([DATA[:1000], DATA[1000:]]))
+    assert info.sha256 == hashlib.sha256(DATA).hexdigest()
+    assert info.key == blob_key(info.sha256)
+    assert info.size == len(DATA) and info.created
+    assert store.exists(info.key) and store.size(info.key) == len(DATA)
+    assert store.read_bytes(info.key) == DATA
+    assert b"".join(store.iter_chunks(info.key, chunk_size=1000)) == DATA
+
+    again = store.put_bytes(DATA)
+    assert again.key == info.key and not again.created
+
+    store.delete(info.key)
+    assert not store.exists(info.key) and store.size(info.key) is None
+    store.delete(info.key)  # deleting a missing blob is a no-op
+
+
+@pytest.mark.parametrize("start,end", [(0, 10), (100, 5000), (len(DATA) - 7, len(DATA)), (50, 50)])
+def test_range_reads(store, start, end):
+    key = store.put_bytes(DATA).key
+    assert b"".join(store.iter_range(key, start, end, chunk_size=1000)) == DATA[start:end]
+
+
+def test_put_at_a_fixed_key(store):
+    info = store.put_chunks_at("cold/abc.zst", iter([b"compressed"]))
+    assert info.key == "cold/abc.zst" and info.sha256 == hashlib.sha256(b"compressed").hexdigest()
+    assert store.read_bytes("cold/abc.zst") == b"compressed"
+
+
+def test_s3_keys_use_the_prefix_and_skip_stored_content(s3):
+    store = S3BlobStore("bucket", prefix="/archives/", client=s3)
+    key = store.put_bytes(DATA).key
+    assert list(s3.objects) == [("bucket", f"archives/{key}")]
+    store.put_bytes(DATA)
+    assert s3.uploads == 1
+    with pytest.raises(FileNotFoundError):
+        list(store.iter_chunks(blob_key("0" * 64)))
+
+
+def test_s3_other_errors_propagate():
+    class Denied(FakeS3):
+        def head_object(self, Bucket, Key):
+            raise _ClientError(403, "AccessDenied")
+
+    with pytest.raises(_ClientError):
+        S3BlobStore("bucket", client=Denied()).exists("ab/cd/abcd")
+
+
+def test_app_on_the_s3_backend(cfg, s3, monkeypatch):
+    from server.app import create_app
+    monkeypatch.setattr(storage, "S3BlobStore", lambda bucket, prefix, endpoint_url: S3BlobStore(bucket, prefix, endpoint_url, client=s3))
+    cfg.BLOB_BACKEND, cfg.S3_BUCKET, cfg.S3_PREFIX = "s3", "qibo", "blobs"
+    client = create_app(cfg).test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {cfg.API_TOKEN}"
+    archive = make_zip({"c.json": DATA})
+    r = client.post("/calibrations/upload", content_type="multipart/form-data", data={
+        "hashID": "h", "archive": (io.BytesIO(archive), "calibration_bundle.zip"),
+    })
+    assert r.status_code == 200, r.get_json()
+    assert list(s3.objects) == [("qibo", "blobs/" + blob_key(hashlib.sha256(archive).hexdigest()))]
+    r = client.get("/calibrations/download/raw", query_string={"hashID": "h"}, headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206 and r.data == archive[10:20]
+    assert client.get("/calibrations/download/raw", query_string={"hashID": "h"}).data == archive
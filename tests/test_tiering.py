@@ -0,0 +1,114 @@
+import hashlib, io, json, random, sqlite3, zipfile
+import pytest
+from client.zipstream import expand_inputs, iter_zip
+from conftest import make_zip
+from server.db import make_engine
+from server.migrate import compact_archives, tier_report
+from server.storage import blob_key, make_blob_store
+from server.tiering import cold_key
+
+pytest.importorskip("zstandard")
+
+
+def _calibration(seed: int) -> bytes:
+    rnd = random.Random(seed)
+    return json.dumps({"qubits": {str(q): {"frequency": 5e9 + rnd.random() * 1e8, "t1": rnd.random() * 1e-4,
+                                            "readout": {"fidelity": rnd.random()}} for q in range(100)}},
+                      indent=2).encode()
+
+
+@pytest.fixture
+def tiers(cfg, app):
+    engine = make_engine(cfg.DB_URI, echo=False, cfg=cfg)
+    yield engine, make_blob_store(cfg)
+    engine.dispose()
+
+
+def _age_all_rows(cfg, created_at: str = "2020-01-01 00:00:00") -> None:
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        for table in ("calibrations", "results", "bestruns"):
+            db.execute(f"UPDATE {table} SET created_at = ?", (created_at,))
+
+
+def _bundle(seed: int) -> bytes:
+    return make_zip({f"c{j}.json": _calibration(seed * 10 + j) for j in range(3)})
+
+
+def _streamed_zip(tmp_path, seed: int, level: int) -> bytes:
+    """An archive made like the client's uploads (parallel block deflate)."""
+    folder = tmp_path / f"streamed{seed}"
+    folder.mkdir()
+    for i in range(3):
+        (folder / f"calibration{i}.json").write_bytes(_calibration(seed * 10 + i))
+    return b"".join(iter_zip(expand_inputs([str(folder)]), level))
+
+
+def _upload(client, hash_id: str, archive: bytes):
+    r = client.post("/calibrations/upload", content_type="multipart/form-data",
+                    data={"hashID": hash_id, "archive": (io.BytesIO(archive), "calibration_bundle.zip")})
+    assert r.status_code == 200, r.get_json()
+
+
+def _raw(client, hash_id: str, **headers):
+    return client.get("/calibrations/download/raw", query_string={"hashID": hash_id}, headers=headers)
+
+
+def test_cold_archives_read_back_identically(tmp_path, cfg, client, tiers):
+    engine, store = tiers
+    archives = {f"h{i}": _bundle(i) for i in range(6)}
+    archives.update({f"s{level}": _streamed_zip(tmp_path, level, level) for level in (1, 6, 9)})
+    for hash_id, archive in archives.items():
+        _upload(client, hash_id, archive)
+    etags = {hash_id: _raw(client, hash_id).headers["ETag"] for hash_id in archives}
+    _age_all_rows(cfg)
+
+    stats = compact_archives(engine, store, older_than_days=30)
+    assert stats["compacted"] == len(archives)
+    assert stats["copied_members"] == 0
+    assert stats["stored_bytes"] < stats["original_bytes"]
+    report = tier_report(engine)
+    assert report["hot_archives"] == 0 and report["cold_archives"] == len(archives)
+    assert report["saved_bytes"] == stats["original_bytes"] - stats["stored_bytes"]
+
+    for hash_id, archive in archives.items():
+        sha256 = hashlib.sha256(archive).hexdigest()
+        assert store.hot.size(blob_key(sha256)) is None
+        assert store.hot.size(cold_key(blob_key(sha256))) is not None
+        r = _raw(client, hash_id)
+        assert r.data == archive
+        assert r.headers["ETag"] == etags[hash_id]
+        assert _raw(client, hash_id, Range="bytes=100-199").data == archive[100:200]
+        name = zipfile.ZipFile(io.BytesIO(archive)).namelist()[0]
+        member = client.get("/calibrations/member", query_string={"hashID": hash_id, "member": name})
+        assert member.data == zipfile.ZipFile(io.BytesIO(archive)).read(name)
+
+
+def test_recent_and_best_run_archives_stay_hot(cfg, client, tiers):
+    engine, store = tiers
+    _upload(client, "old", _bundle(1))
+    _upload(client, "best", _bundle(2))
+    assert client.post("/bestruns/set", json={"calibrationHashID": "best", "runID": "r"}).status_code == 200
+    _age_all_rows(cfg)
+    _upload(client, "recent", _bundle(3))
+
+    dry = compact_archives(engine, store, older_than_days=30, dry_run=True)
+    assert dry["candidates"] == 1 and dry["compacted"] == 0
+    stats = compact_archives(engine, store, older_than_days=30, use_dictionary=False)
+    assert stats["compacted"] == 1
+    assert tier_report(engine)["hot_archives"] == 2
+
+
+def test_reuploaded_archive_leaves_the_cold_tier(cfg, client, tiers):
+    engine, store = tiers
+    archive = _bundle(1)
+    sha256 = hashlib.sha256(archive).hexdigest()
+    _upload(client, "h", archive)
+    _age_all_rows(cfg)
+    assert compact_archives(engine, store, older_than_days=30)["compacted"] == 1
+
+    _upload(client, "h", archive)
+    assert store.hot.size(blob_key(sha256)) == len(archive)
+    assert compact_archives(engine, store, older_than_days=30)["reheated"] == 1
+    assert store.hot.size(cold_key(blob_key(sha256))) is None
+    assert tier_report(engine)["cold_archives"] == 0
+    assert _raw(client, "h").data == archive
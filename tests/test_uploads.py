@@ -0,0 +1,199 @@
+import hashlib, io, json, random, sqlite3
+from pathlib import Path
+import pytest
+import requests
+from client.client import _needs_archive
+from conftest import make_zip
+
+ARCHIVE = make_zip({"results.json": b'{"fidelity": 0.99}' * 3000, "data.npy": random.Random(0).randbytes(50_000)})
+SHA256 = hashlib.sha256(ARCHIVE).hexdigest()
+FIELDS = {"hashID": "h", "name": "sweep", "runID": "r1", "notes": "resumed"}
+
+
+def _create(client, size=len(ARCHIVE), sha256=SHA256, fields=FIELDS):
+    return client.post("/uploads", json={"kind": "results", "size": size, "sha256": sha256, "fields": fields})
+
+
+def _put(client, upload_id, offset, data):
+    return client.put(f"/uploads/{upload_id}", query_string={"offset": offset}, data=data)
+
+
+def test_resumable_upload_in_any_order(client):
+    r = _create(client)
+    assert r.status_code == 200
+    upload_id = r.get_json()["upload_id"]
+    half = len(ARCHIVE) // 2
+    assert _put(client, upload_id, half, ARCHIVE[half:]).status_code == 200
+    assert client.get(f"/uploads/{upload_id}").get_json()["received"] == [[half, len(ARCHIVE)]]
+
+    r = client.post(f"/uploads/{upload_id}/finalize")
+    assert r.status_code == 409
+    assert r.get_json()["received"] == [[half, len(ARCHIVE)]]
+
+    assert _put(client, upload_id, 0, ARCHIVE[:half]).status_code == 200
+    r = client.post(f"/uploads/{upload_id}/finalize")
+    assert r.status_code == 200, r.get_json()
+    assert client.get(f"/uploads/{upload_id}").status_code == 404
+
+    r = client.get("/results/download/raw", query_string={"hashID": "h", "name": "sweep", "runID": "r1"})
+    assert r.data == ARCHIVE
+    assert r.headers["X-Qibo-Notes"] == "resumed"
+
+
+def test_creating_the_same_upload_again_resumes_it(client):
+    first = _create(client).get_json()
+    _put(client, first["upload_id"], 0, ARCHIVE[:1000])
+    again = _create(client).get_json()
+    assert again["upload_id"] == first["upload_id"]
+    assert again["received"] == [[0, 1000]]
+
+
+def test_checksum_mismatch_discards_the_upload(client):
+    upload_id = _create(client, sha256="0" * 64).get_json()["upload_id"]
+    _put(client, upload_id, 0, ARCHIVE)
+    r = client.post(f"/uploads/{upload_id}/finalize")
+    assert r.status_code == 400
+    assert client.get(f"/uploads/{upload_id}").status_code == 404
+    assert client.get("/results/list", query_string={"hashID": "h"}).get_json()["items"] == []
+
+
+def test_invalid_sessions_and_chunks_are_rejected(client):
+    assert _create(client, fields={**FIELDS, "name": ""}).status_code == 400
+    assert _create(client, sha256="xyz").status_code == 400
+    assert _create(client, size=-1).status_code == 400
+    upload_id = _create(client).get_json()["upload_id"]
+    assert _put(client, upload_id, len(ARCHIVE) - 1, b"too long").status_code == 400
+    assert _put(client, "0" * 32, 0, b"x").status_code == 404
+    assert client.post(f"/uploads/{'0' * 32}/finalize").status_code == 404
+
+
+def _record_requests(db):
+    seen = []
+    db.session.hooks["response"].append(lambda r, *args, **kwargs: seen.append((r.request.method, r.request.path_url)))
+    return seen
+
+
+def test_client_resumes_through_an_upload_session(db, tmp_path):
+    (tmp_path / "results.json").write_bytes(b'{"fidelity": 0.99}')
+    seen = _record_requests(db)
+    out = db.results_upload_resumable("h", "sweep", "", [str(tmp_path / "results.json")], runID="r1", chunk_size=64)
+    assert out["status"] == "ok"
+    assert ("POST", "/uploads") in seen
+    assert db.results_read_member("h", "sweep", "results.json", runID="r1") == b'{"fidelity": 0.99}'
+
+
+def test_client_does_not_open_a_session_for_a_refused_upload(cfg, db, tmp_path):
+    (tmp_path / "results.json").write_bytes(b'{"fidelity": 0.99}')
+    seen = _record_requests(db)
+    with pytest.raises(requests.HTTPError, match="hashID is required"):
+        db.results_upload_resumable("", "sweep", "", [str(tmp_path / "results.json")])
+    assert seen == [("POST", "/results/upload")]
+    assert not any(Path(cfg.UPLOAD_DIR).glob("*"))
+
+
+def _blob_files(cfg):
+    return sorted(p for p in Path(cfg.BLOB_ROOT).glob("??/??/*") if p.is_file())
+
+
+def _post_result(client, name, sha256=None, archive=None):
+    data = {"hashID": "h", "name": name}
+    if sha256 is not None:
+        data["sha256"] = sha256
+    if archive is not None:
+        data["archive"] = (io.BytesIO(archive), "bundle.zip")
+    return client.post("/results/upload", content_type="multipart/form-data", data=data)
+
+
+def test_identical_archives_are_stored_once(cfg, client):
+    assert _post_result(client, "a", archive=ARCHIVE).status_code == 200
+    assert _post_result(client, "b", archive=ARCHIVE).status_code == 200
+    assert [p.name for p in _blob_files(cfg)] == [SHA256]
+
+
+def test_lookup_reports_stored_archives(client):
+    other = "f" * 64
+    r = client.post("/blobs/lookup", json={"sha256": [SHA256, other]})
+    assert r.get_json()["present"] == {}
+    _post_result(client, "a", archive=ARCHIVE)
+    r = client.post("/blobs/lookup", json={"sha256": [SHA256.upper(), other, "not-a-hash"]})
+    assert r.get_json()["present"] == {SHA256: len(ARCHIVE)}
+    assert client.post("/blobs/lookup", json={"sha256": "abc"}).status_code == 400
+
+
+def test_upload_by_reference(client):
+    r = _post_result(client, "a", sha256=SHA256)
+    assert r.status_code == 404
+    assert r.get_json()["error"].startswith("unknown archive sha256")
+
+    _post_result(client, "a", archive=ARCHIVE)
+    r = _post_result(client, "b", sha256=SHA256)
+    assert r.status_code == 200, r.get_json()
+    assert client.get("/results/download/raw", query_string={"hashID": "h", "name": "b"}).data == ARCHIVE
+
+
+def test_archive_must_match_its_declared_hash(client):
+    r = _post_result(client, "a", sha256="0" * 64, archive=ARCHIVE)
+    assert r.status_code == 400
+    assert client.get("/results/list", query_string={"hashID": "h"}).get_json()["items"] == []
+    assert _post_result(client, "a", sha256="zz").status_code == 400
+
+
+class _Response:
+    def __init__(self, status_code, payload):
+        self.status_code, self._payload = status_code, payload
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("no JSON")
+        return self._payload
+
+
+@pytest.mark.parametrize("status, payload, expected", [
+    (404, {"error": "unknown archive sha256; upload the archive itself"}, True),
+    (400, {"error": "archive file is required"}, True),  # server without deduplication
+    (400, {"error": "hashID is required"}, False),
+    (404, {"error": "not found"}, False),
+    (404, None, False),
+    (401, {"error": "Unauthorized"}, False),
+    (200, {"status": "ok"}, False),
+])
+def test_client_resends_the_archive_only_when_the_server_lacks_it(status, payload, expected):
+    assert _needs_archive(_Response(status, payload)) is expected
+
+
+def _upload_many(client, items, archives):
+    data = {"items": json.dumps(items)}
+    data.update({field: (io.BytesIO(archive), f"{field}.zip") for field, archive in archives.items()})
+    return client.post("/results/upload_many", content_type="multipart/form-data", data=data)
+
+
+def test_upload_many_reports_items_individually(client):
+    r = _upload_many(client, [
+        {"hashID": "h", "name": "a", "archive": "f0"},
+        {"hashID": "h", "name": "", "archive": "f1"},
+        {"hashID": "h", "name": "b", "sha256": SHA256},
+    ], {"f0": ARCHIVE, "f1": ARCHIVE})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["status"] == "partial"
+    assert [item["status"] for item in body["items"]] == ["ok", "error", "ok"]
+    names = {i["name"] for i in client.get("/results/list", query_string={"hashID": "h"}).get_json()["items"]}
+    assert names == {"a", "b"}
+
+
+def test_failed_batch_commit_removes_the_archives_it_stored(cfg, client):
+    assert _post_result(client, "kept", archive=ARCHIVE).status_code == 200
+    with sqlite3.connect(cfg.DB_URI.removeprefix("sqlite:///")) as db:
+        db.execute("CREATE TRIGGER fail_batch BEFORE INSERT ON results WHEN NEW.name = 'boom' "
+                   "BEGIN SELECT RAISE(ABORT, 'boom'); END")
+    before = _blob_files(cfg)
+
+    r = _upload_many(client, [
+        {"hashID": "h", "name": "same-content", "archive": "f0"},
+        {"hashID": "h", "name": "boom", "archive": "f1"},
+    ], {"f0": ARCHIVE, "f1": make_zip({"new.json": b"{}"})})
+    assert r.status_code == 400
+    assert {item["status"] for item in r.get_json()["items"]} == {"error"}
+    # the new archive is gone; the one a committed row references stays
+    assert _blob_files(cfg) == before
+    assert client.get("/results/download/raw", query_string={"hashID": "h", "name": "kept"}).data == ARCHIVE
@@ -0,0 +1,92 @@
+import hashlib, io, random, zipfile, zlib
+import pytest
+from client.zipstream import SpooledZip, expand_inputs, iter_zip
+
+BLOCK = 64 * 1024
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    """A directory tree with compressible, incompressible, empty and non-ASCII files."""
+    rng = random.Random(0)
+    files = {
+        "results.json": b'{"fidelity": 0.99, "qubit": 3}\n' * 20_000,
+        "data/raw.bin": rng.randbytes(3 * BLOCK + 123),
+        "data/sub/empty.txt": b"",
+        "data/sub/plot.png": rng.randbytes(5000),
+        "données.csv": "é,ü\n".encode() * 1000,
+    }
+    for name, data in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    paths = [str(tmp_path / "results.json"), str(tmp_path / "data"), str(tmp_path / "donn*.csv")]
+    return paths, files
+
+
+def _zip(paths, level=6, workers=None):
+    return b"".join(iter_zip(expand_inputs(paths), level, workers, block_size=BLOCK))
+
+
+def test_archive_round_trips_through_zipfile(inputs):
+    paths, files = inputs
+    with zipfile.ZipFile(io.BytesIO(_zip(paths))) as z:
+        assert z.testzip() is None
+        assert sorted(z.namelist()) == sorted(files)
+        for name, data in files.items():
+            assert z.read(name) == data
+
+
+def test_crcs_sizes_and_methods(inputs):
+    paths, files = inputs
+    archive = _zip(paths)
+    with zipfile.ZipFile(io.BytesIO(archive)) as z:
+        for info in z.infolist():
+            data = files[info.filename]
+            assert info.CRC == zlib.crc32(data)
+            assert info.file_size == len(data)
+            # .png is already compressed and always stored
+            stored = info.filename.endswith(".png")
+            assert info.compress_type == (zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+            if stored:
+                assert info.compress_size == len(data)
+        assert z.getinfo("results.json").compress_size < len(files["results.json"]) // 10
+
+
+def test_level_zero_stores_every_member(inputs):
+    paths, files = inputs
+    with zipfile.ZipFile(io.BytesIO(_zip(paths, level=0))) as z:
+        assert {i.compress_type for i in z.infolist()} == {zipfile.ZIP_STORED}
+        assert all(z.read(name) == data for name, data in files.items())
+
+
+def test_output_is_identical_across_runs_and_worker_counts(inputs):
+    paths, _ = inputs
+    archives = {_zip(paths, workers=n) for n in (1, 2, 8, 8)}
+    assert len(archives) == 1
+
+
+def test_spooled_zip_matches_the_stream(inputs):
+    paths, _ = inputs
+    streamed = b"".join(iter_zip(expand_inputs(paths)))
+    # a tiny memory budget spills the spool to disk
+    with SpooledZip(expand_inputs(paths), max_memory=1024) as archive:
+        assert archive.size == len(streamed)
+        assert archive.sha256 == hashlib.sha256(streamed).hexdigest()
+        assert archive.getvalue() == streamed
+        assert archive.read_range(100, 200) == streamed[100:200]
+        assert b"".join(archive.iter_chunks(1000)) == streamed
+
+
+def test_invalid_inputs(tmp_path, inputs):
+    paths, _ = inputs
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "results.json").write_bytes(b"{}")
+    with pytest.raises(ValueError, match="Duplicate"):
+        expand_inputs(paths + [str(tmp_path / "other" / "results.json")])
+    # the same file named twice is only added once
+    assert expand_inputs(paths + [str(tmp_path / "results.json")]) == expand_inputs(paths)
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(tmp_path / "missing.json")])
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(tmp_path / "*.h5")])